@@ -4,27 +4,47 @@
 找出每個角度的最適合 PWM 值
 """
 
-import RPi.GPIO as GPIO
 import time
 import json
 from datetime import datetime
+import os
+import sys
+
+# 讓 Motor_Web_Control 裡的程式可以匯入上一層的 rpi_drivers 套件
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rpi_drivers.idle import PROCESS_CPU, IdleDetacher
+from rpi_drivers.kinematics import SG90, ServoTracker
+from rpi_drivers.lazy import LazyDevice
+from rpi_drivers.pin_backends import select_pin_backend
 
 # GPIO 設定
 servoPIN = 13  # 改為 GPIO 13
-GPIO.setmode(GPIO.BCM)
-GPIO.setup(servoPIN, GPIO.OUT)
 
-# PWM 設定
-p = GPIO.PWM(servoPIN, 50)
-p.start(7.5)
+# GPIO 後端 (pigpio / lgpio / RPi.GPIO / mock) 由環境變數 RPI_PIN_BACKEND 選擇 (預設 auto)
+# 後端與 PWM 在第一次使用時才初始化，匯入本模組不會碰到硬體
+pin_backend = LazyDevice(select_pin_backend)
+p = LazyDevice(lambda: pin_backend.start_pwm(servoPIN, 50, 7.5))
 
 # 校準資料儲存
 calibration_data = {}
 
+# 記錄馬達目前的位置，依移動距離決定等待時間
+tracker = ServoTracker(SG90)
+
+# 到位後 2 秒沒有新命令就停止送脈衝 (duty 0)，等待輸入時馬達不會一直抖動
+idle = IdleDetacher(lambda: p.ChangeDutyCycle(0), hold_time=2.0)
+
+def duty_cycle_to_angle(duty_cycle):
+    """以標準範圍 (2.5% = 0度，12.5% = 180度) 估計 duty cycle 對應的角度"""
+    return (duty_cycle - 2.5) / 10 * 180
+
 def set_pwm_duty_cycle(duty_cycle):
     """設定 PWM duty cycle"""
+    idle.before_command()
     p.ChangeDutyCycle(duty_cycle)
-    time.sleep(1.5)  # 給馬達充足時間到達位置
+    tracker.wait_for(duty_cycle_to_angle(duty_cycle))  # 依移動距離等待馬達到達位置
+    idle.after_command()
 
 def interactive_calibration():
     """互動式校準每個角度"""
@@ -212,32 +232,13 @@ def generate_code():
     print("}")
     print()
     
-    # 產生插值函數
+    # 產生查表 (載入時展開成 0.1° 的密集表，不必再複製插值函數)
     print("""
-def get_calibrated_duty_cycle(target_angle):
-    \"\"\"根據校準資料獲取角度對應的 duty cycle\"\"\"
-    if target_angle in SERVO_CALIBRATION:
-        return SERVO_CALIBRATION[target_angle]
-    
-    # 線性插值
-    angles = sorted(SERVO_CALIBRATION.keys())
-    
-    if target_angle <= angles[0]:
-        return SERVO_CALIBRATION[angles[0]]
-    if target_angle >= angles[-1]:
-        return SERVO_CALIBRATION[angles[-1]]
-    
-    # 找到相鄰的兩個校準點
-    for i in range(len(angles) - 1):
-        if angles[i] <= target_angle <= angles[i + 1]:
-            angle1, angle2 = angles[i], angles[i + 1]
-            duty1, duty2 = SERVO_CALIBRATION[angle1], SERVO_CALIBRATION[angle2]
-            
-            # 線性插值
-            ratio = (target_angle - angle1) / (angle2 - angle1)
-            return duty1 + ratio * (duty2 - duty1)
-    
-    return 7.5  # 預設值
+from rpi_drivers.calibration import CalibrationTable
+
+# method='pchip' 可以改用平滑的單調三次插值
+CALIBRATION_TABLE = CalibrationTable(SERVO_CALIBRATION, resolution=0.1, method='linear')
+get_calibrated_duty_cycle = CALIBRATION_TABLE.duty
 
 def set_calibrated_angle(angle):
     \"\"\"使用校準資料設定角度\"\"\"
@@ -299,10 +300,15 @@ def main():
     finally:
         # 清理
         print("\n🧹 清理 GPIO...")
-        set_pwm_duty_cycle(7.5)  # 回到中心
-        time.sleep(1)
-        p.stop()
-        GPIO.cleanup()
+        # 只清理真的初始化過的硬體 (例如還沒開始校準就按 Ctrl+C)
+        if p.acquired:
+            set_pwm_duty_cycle(7.5)  # 回到中心 (會等到馬達到位)
+        idle.close()
+        print(f"📊 {idle.report()}")
+        print(f"📊 {PROCESS_CPU.report()}")
+        if p.acquired:
+            p.stop()
+        pin_backend.close()
         print("✅ 清理完成")
 
 if __name__ == '__main__':
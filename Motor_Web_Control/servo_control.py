@@ -1,20 +1,35 @@
-import RPi.GPIO as GPIO
 import time
+import os
+import sys
+
+# 讓 Motor_Web_Control 裡的程式可以匯入上一層的 rpi_drivers 套件
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rpi_drivers.idle import PROCESS_CPU, IdleDetacher
+from rpi_drivers.kinematics import SG90, ServoTracker
+from rpi_drivers.lazy import LazyDevice
 
 # 伺服馬達設定
 servoPIN = 13  # 改為 GPIO 13
 # LED 設定
 ledPIN = 26
 
-GPIO.setmode(GPIO.BCM)
-GPIO.setup(servoPIN, GPIO.OUT)
-GPIO.setup(ledPIN, GPIO.OUT)
+def _open_gpio():
+    import RPi.GPIO as GPIO
+    GPIO.setmode(GPIO.BCM)
+    GPIO.setup(servoPIN, GPIO.OUT)
+    GPIO.setup(ledPIN, GPIO.OUT)
+    return GPIO
 
-p = GPIO.PWM(servoPIN, 50)  # GPIO 13, 50Hz
+# RPi.GPIO 與 PWM 在第一次使用時才初始化，匯入本模組不會碰到硬體
+GPIO = LazyDevice(_open_gpio)
+p = LazyDevice(lambda: GPIO.PWM(servoPIN, 50))  # GPIO 13, 50Hz
 
-print("硬體初始化完成:")
-print(f"伺服馬達: GPIO {servoPIN}")
-print(f"LED 燈: GPIO {ledPIN}")
+# 記錄馬達目前的角度，依移動距離決定等待時間
+tracker = ServoTracker(SG90)
+
+# 到位後 0.5 秒沒有新命令就停止送脈衝 (duty 0)，省 CPU 也避免馬達抖動
+idle = IdleDetacher(lambda: p.ChangeDutyCycle(0), hold_time=0.5)
 
 # 伺服馬達角度控制函數
 def set_servo_angle(angle):
@@ -22,9 +37,11 @@ def set_servo_angle(angle):
     # 反轉角度：0度在左邊，180度在右邊
     reversed_angle = 180 - angle
     duty_cycle = 2.5 + (reversed_angle / 180.0) * 10
+    idle.before_command()
     p.ChangeDutyCycle(duty_cycle)
     print(f"馬達轉到 {angle}度 (左0°-右180°)")
-    time.sleep(1)
+    tracker.wait_for(angle)
+    idle.after_command()
 
 # LED 控制函數
 def led_on():
@@ -46,42 +63,57 @@ def led_blink(times=3, delay=0.5):
         led_off()
         time.sleep(delay)
 
-# 初始化
-p.start(7.5)  # 90度開始
-print("伺服馬達初始化完成")
-time.sleep(1)
+# 主程式區塊
+if __name__ == '__main__':
+    print("硬體初始化完成:")
+    print(f"伺服馬達: GPIO {servoPIN}")
+    print(f"LED 燈: GPIO {ledPIN}")
+
+    # 初始化
+    idle.before_command()
+    p.start(7.5)  # 90度開始
+    tracker.wait_for(90)  # 開機時角度未知，以完整行程估計
+    idle.after_command()
+    print("伺服馬達初始化完成")
 
-try:
-    print("測試馬達角度和 LED...")
+    try:
+        print("測試馬達角度和 LED...")
     
-    # 先測試 LED
-    print("\n=== LED 測試 ===")
-    led_blink(3)
-    time.sleep(1)
+        # 先測試 LED
+        print("\n=== LED 測試 ===")
+        led_blink(3)
+        time.sleep(1)
     
-    print("\n=== 馬達測試 ===")
-    # 測試各個角度，每次移動時閃爍 LED
-    angles = [0, 45, 90, 135, 180]
+        print("\n=== 馬達測試 ===")
+        # 測試各個角度，每次移動時閃爍 LED
+        angles = [0, 45, 90, 135, 180]
     
-    for angle in angles:
-        led_on()  # 移動時點亮 LED
-        set_servo_angle(angle)
-        led_off()  # 移動完成後關閉 LED
-        time.sleep(1)
+        for angle in angles:
+            led_on()  # 移動時點亮 LED
+            set_servo_angle(angle)
+            led_off()  # 移動完成後關閉 LED
+            time.sleep(1)
     
-    # 回到90度
-    led_on()
-    set_servo_angle(90)
-    led_off()
-    print("測試完成")
+        # 回到90度
+        led_on()
+        set_servo_angle(90)
+        led_off()
+        print("測試完成")
         
-except KeyboardInterrupt:
-    print("\n程式被中斷")
-finally:
-    print("清理中...")
-    led_off()  # 確保 LED 關閉
-    set_servo_angle(90)  # 馬達回到中心位置
-    time.sleep(1)
-    p.stop()
-    GPIO.cleanup()
-    print("清理完成")
\ No newline at end of file
+    except KeyboardInterrupt:
+        print("\n程式被中斷")
+    finally:
+        print("清理中...")
+        # 只清理真的初始化過的硬體，沒用到的不要為了清理而初始化
+        if GPIO.acquired:
+            led_off()  # 確保 LED 關閉
+        if p.acquired:
+            set_servo_angle(90)  # 馬達回到中心位置 (會等到馬達到位)
+        idle.close()
+        print(f"📊 {idle.report()}")
+        print(f"📊 {PROCESS_CPU.report()}")
+        if p.acquired:
+            p.stop()
+        if GPIO.acquired:
+            GPIO.cleanup()
+        print("清理完成")
\ No newline at end of file
@@ -41,6 +41,7 @@ def check_libraries():
     libraries = [
         ('gpiozero', 'GPIO 控制'),
         ('flask', 'Web 伺服器'),
+        ('numpy', '數值運算 (亂數畫面、校準表)'),
         ('time', '時間控制'),
         ('threading', '多執行緒'),
         ('json', 'JSON 處理')
@@ -7,10 +7,21 @@ gpiozero 伺服馬達參數微調測試程式
 from gpiozero import Servo
 import time
 import sys
+import os
+
+# 讓 Motor_Web_Control 裡的程式可以匯入上一層的 rpi_drivers 套件
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rpi_drivers.lazy import LazyDevice
+from rpi_drivers.pin_backends import select_pin_backend
+from rpi_drivers.servo import ServoMapping
 
 # GPIO 設定
 servoPIN = 13
 
+# GPIO 後端由環境變數 RPI_PIN_BACKEND 選擇 (預設 auto)，重新建立伺服物件時共用同一個 pin factory
+pin_backend = LazyDevice(select_pin_backend)
+
 # 測試角度
 TEST_ANGLES = [0, 45, 90, 135, 180]
 
@@ -27,16 +38,25 @@ angle_adjustments = {
     180: 0.0   # 180度的微調值
 }
 
+# 目前設定對應的 ServoMapping，脈衝範圍或微調值改變時才重新建立
+_mapping = None
+_mapping_key = None
+
+def current_mapping():
+    """依目前的脈衝範圍與微調值取得 ServoMapping (不套用校準表，用來找出參數)"""
+    global _mapping, _mapping_key
+    key = (current_min_pulse, current_max_pulse, tuple(sorted(angle_adjustments.items())))
+    if key != _mapping_key:
+        _mapping = ServoMapping(offsets=angle_adjustments, min_pulse_width=current_min_pulse / 1000,
+                                max_pulse_width=current_max_pulse / 1000)
+        _mapping_key = key
+    return _mapping
+
 def angle_to_servo_value(angle):
     """將角度轉換為 gpiozero Servo 的值 - 修正方向並支援個別微調"""
     # 修正方向：0度 -> +1 (右邊), 90度 -> 0 (中間), 180度 -> -1 (左邊)
-    servo_value = 1 - (angle / 180.0) * 2
-    
-    # 套用個別角度的微調
-    if angle in angle_adjustments:
-        servo_value += angle_adjustments[angle]
-    
-    return max(-1, min(1, servo_value))
+    # 微調值在測試角度之間線性內插
+    return current_mapping().value(angle)
 
 def calculate_pulse_width(servo_value, min_pulse, max_pulse):
     """計算給定 servo 值的脈波寬度"""
@@ -268,7 +288,8 @@ def adjust_pulse_width():
 
 def create_servo():
     """創建伺服物件"""
-    return Servo(servoPIN, min_pulse_width=current_min_pulse/1000, max_pulse_width=current_max_pulse/1000)
+    return Servo(servoPIN, min_pulse_width=current_min_pulse/1000, max_pulse_width=current_max_pulse/1000,
+                 pin_factory=pin_backend.pin_factory())
 
 def sweep_test(servo):
     """掃描測試"""
@@ -313,7 +334,7 @@ def main():
         
         # 初始化伺服
         servo = create_servo()
-        print(f"\n✅ 伺服馬達初始化完成 (GPIO {servoPIN})")
+        print(f"\n✅ 伺服馬達初始化完成 (GPIO {servoPIN}，後端 {pin_backend.name})")
         
         # 初始化到中心位置
         print("\n🏠 馬達初始化到中心位置...")
@@ -391,6 +412,7 @@ def main():
             except:
                 pass
             servo.close()
+        pin_backend.close()
         print("✅ 清理完成")
 
 if __name__ == '__main__':
@@ -3,107 +3,116 @@
 Flask 網站控制伺服馬達和 LED 燈
 GPIO 14: 伺服馬達
 GPIO 26: LED 燈
+SERVO_BACKEND=pca9685 時改由 I2C 的 PCA9685 驅動多顆伺服馬達，API 以伺服馬達 ID 指定對象
 """
 
 from flask import Flask, render_template, request, jsonify
-from gpiozero import Servo, PWMLED
+import os
+import sys
 import time
 import threading
 
+# 讓 Motor_Web_Control 裡的程式可以匯入上一層的 rpi_drivers 套件
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rpi_drivers.idle import PROCESS_CPU
+from rpi_drivers.kinematics import SG90
+from rpi_drivers.lazy import LazyDevice
+from rpi_drivers.motion import MotionController
+from rpi_drivers.pin_backends import select_pin_backend
+from rpi_drivers.servo import SERVO_MAPPING
+from rpi_drivers.servo_bank import ServoBank, open_servo_backend, parse_channels
+from rpi_drivers.trajectory import TrajectoryPlanner
+
 app = Flask(__name__)
 
-# 伺服馬達校準表 (根據實際測試結果)
-SERVO_CALIBRATION = {
-    0: 12.60,
-    45: 11.00,
-    90: 7.30,
-    135: 4.50,
-    180: 2.20,
+# GPIO 設定
+servoPIN = 13          # GPIO 13
+ledPIN = 26
+led_brightness = 0  # LED 亮度 (0-100)
+
+# 伺服馬達後端: gpiozero (預設，GPIO 13 一顆 SG90) 或 pca9685 (I2C，每顆晶片 16 個通道)
+SERVO_BACKEND = os.environ.get('SERVO_BACKEND', 'gpiozero')
+# 伺服馬達 ID -> 通道 (gpiozero 為 BCM 腳位，pca9685 為通道編號)，例如 SERVO_CHANNELS=pan:0,tilt:1
+DEFAULT_CHANNELS = {
+    'gpiozero': f'main:{servoPIN}',
+    'pca9685': ','.join(f'{channel}:{channel}' for channel in range(16)),
 }
+SERVO_CHANNELS = parse_channels(os.environ.get('SERVO_CHANNELS')
+                                or DEFAULT_CHANNELS.get(SERVO_BACKEND, f'main:{servoPIN}'))
+DEFAULT_SERVO = next(iter(SERVO_CHANNELS))  # 沒有指定 ID 時控制的伺服馬達
+current_angles = dict.fromkeys(SERVO_CHANNELS, 90)
 
-def get_calibrated_duty_cycle(target_angle):
-    """根據校準資料獲取角度對應的 duty cycle"""
-    if target_angle in SERVO_CALIBRATION:
-        return SERVO_CALIBRATION[target_angle]
+# GPIO 後端 (pigpio / lgpio / RPi.GPIO / mock) 由環境變數 RPI_PIN_BACKEND 選擇 (預設 auto)，
+# 設定 RPI_PIN_BENCH_PIN 時會先對每個可用的後端跑微基準測試再挑最好的
+pin_backend = LazyDevice(select_pin_backend)
 
-    # 線性插值
-    angles = sorted(SERVO_CALIBRATION.keys())
+def _open_led():
+    from gpiozero import PWMLED
+    return PWMLED(ledPIN, pin_factory=pin_backend.pin_factory())
 
-    if target_angle <= angles[0]:
-        return SERVO_CALIBRATION[angles[0]]
-    if target_angle >= angles[-1]:
-        return SERVO_CALIBRATION[angles[-1]]
+def _open_servo_backend():
+    if SERVO_BACKEND == 'gpiozero':
+        return open_servo_backend('gpiozero', pin_factory=pin_backend.pin_factory())
+    return open_servo_backend(SERVO_BACKEND, bus=int(os.environ.get('SERVO_I2C_BUS', 1)))
 
-    # 找到相鄰的兩個校準點
-    for i in range(len(angles) - 1):
-        if angles[i] <= target_angle <= angles[i + 1]:
-            angle1, angle2 = angles[i], angles[i + 1]
-            duty1, duty2 = SERVO_CALIBRATION[angle1], SERVO_CALIBRATION[angle2]
+# 伺服馬達後端與 gpiozero 元件在第一次控制時才建立，匯入本模組不會碰到硬體
+# SG90 伺服馬達規格: 脈衝寬度 1ms-2ms, 週期 20ms
+servo_backend = LazyDevice(_open_servo_backend)
+led_pwm = LazyDevice(_open_led)  # GPIO 26 LED (PWM 控制)
 
-            # 線性插值
-            ratio = (target_angle - angle1) / (angle2 - angle1)
-            return duty1 + ratio * (duty2 - duty1)
+# 控制鎖，防止同時操作 LED
+control_lock = threading.Lock()
 
-    return 7.30  # 預設值 (90度的校準值)
+# 移動規劃成速度 / 加速度受限的 S 曲線軌跡，以 50Hz 每個 frame 寫入一個點
+# 最高速度取 SG90 規格 (0.1 秒 / 60°) 的六成，馬達跟得上指令
+planner = TrajectoryPlanner(v_max=0.6 * SG90.max_speed, a_max=1800, rate=50)
 
-def duty_cycle_to_servo_value(duty_cycle):
-    """將 duty cycle 轉換為 gpiozero Servo 的值 (-1 到 1) - SG90 優化版"""
-    # SG90 規格: 1ms = 0度(-1), 1.5ms = 90度(0), 2ms = 180度(+1)
-    # 我們的校準資料: 12.60% = 0度, 7.30% = 90度, 2.20% = 180度
-    
-    # 校準資料轉換為脈衝寬度 (ms)
-    pulse_width_ms = (duty_cycle / 100) * 20  # 20ms 週期
-    
-    # SG90 脈衝寬度映射到 servo 值
-    if pulse_width_ms >= 2.52:  # 對應 12.60%
-        return -1.0  # 0度
-    elif pulse_width_ms <= 0.44:  # 對應 2.20%
-        return 1.0   # 180度
-    else:
-        # 線性映射到 SG90 的 1ms-2ms 範圍
-        # 將校準的脈衝寬度映射到標準 SG90 範圍
-        normalized = (2.52 - pulse_width_ms) / (2.52 - 0.44)
-        servo_value = -1 + 2 * normalized
-        return max(-1, min(1, servo_value))
+# 所有伺服馬達的脈衝寬度先寫進 ServoBank，每個 frame 一次送出 (PCA9685 為一筆 I2C 交易)
+bank = ServoBank(servo_backend, frame_time=planner.frame_time)
 
-def angle_to_servo_value(angle):
-    """將角度轉換為 gpiozero Servo 的值 - 修正方向映射法"""
-    # 修正方向：0度 -> +1 (右邊), 90度 -> 0 (中間), 180度 -> -1 (左邊)
-    servo_value = 1 - (angle / 180.0) * 2
-    return max(-1, min(1, servo_value))
+def _open_motion(channel):
+    """每顆伺服馬達一個運動控制執行緒，新的目標會取代還沒執行的舊目標
 
-# GPIO 設定
-servoPIN = 13          # GPIO 13
-ledPIN = 26
-current_angle = 90
-led_brightness = 0  # LED 亮度 (0-100)
+    到達時間依 SG90 的速度與每次移動的距離估計；到位 1 秒後沒有新命令就停止送脈衝
+    每條軌跡在播放前以 SERVO_MAPPING (校準表 + 脈衝範圍) 一次換算成脈衝寬度
+    """
+    return MotionController(bank.writer(channel), model=SG90, frame_time=planner.frame_time, planner=planner,
+                            detach=lambda: bank.release(channel), idle_hold=1.0,
+                            transform=SERVO_MAPPING.pulse_width)
 
-# 初始化 gpiozero 元件 (針對 SG90 優化)
-# SG90 伺服馬達規格: 脈衝寬度 1ms-2ms, 週期 20ms
-servo = Servo(servoPIN, min_pulse_width=0.5/1000, max_pulse_width=2.5/1000)  # GPIO 13
-led_pwm = PWMLED(ledPIN)  # GPIO 26 LED (PWM 控制)
+motions = {servo_id: _open_motion(channel) for servo_id, channel in SERVO_CHANNELS.items()}
 
-# 控制鎖，防止同時操作
-control_lock = threading.Lock()
+def servo_ids(selector=None):
+    """把 API 的伺服馬達參數轉成 ID 清單：None 為預設的那顆，'all' 為全部"""
+    if selector is None or selector == '':
+        return [DEFAULT_SERVO]
+    if selector == 'all':
+        return list(motions)
+    selector = str(selector)
+    if selector not in motions:
+        raise KeyError(selector)
+    return [selector]
 
-def set_servo_angle(angle):
-    """設定伺服馬達角度 (0-180度) - SG90 優化版"""
-    global current_angle
+def set_servo_angle(angle, servo_id=DEFAULT_SERVO):
+    """設定伺服馬達角度 (0-180度)，立即返回 MoveTicket (目標角度與預估到達時間)"""
+    ticket = motions[servo_id].move_to(angle)
+    current_angles[servo_id] = angle
     
-    with control_lock:
-        # 使用校準資料轉換為 servo 值
-        servo_value = angle_to_servo_value(angle)
-        
-        # 設定伺服馬達位置
-        servo.value = servo_value
-        current_angle = angle
-        
-        duty_cycle = get_calibrated_duty_cycle(angle)
-        pulse_width = (duty_cycle / 100) * 20
-        print(f"🎯 SG90 設定角度 {angle}° (servo值: {servo_value:.3f}, 脈衝: {pulse_width:.2f}ms)")
-        
-        # SG90 響應較快，稍微減少等待時間
-        time.sleep(0.6)
+    # 使用校準資料計算脈衝寬度
+    pulse_width = SERVO_MAPPING.pulse_width(angle) * 1000
+    print(f"🎯 SG90 [{servo_id}] 設定角度 {angle}° (servo值: {SERVO_MAPPING.value(angle):.3f}, 脈衝: {pulse_width:.2f}ms)")
+    return ticket
+
+def unknown_servo(servo_id):
+    return jsonify({
+        'success': False,
+        'message': f'未知的伺服馬達: {servo_id}，可用: {", ".join(motions)}'
+    }), 400
+
+def eta_ms(ticket):
+    """距離預估到達還有幾毫秒"""
+    return max(0, round((ticket.eta - time.monotonic()) * 1000))
 
 def set_led_brightness(brightness):
     """設定 LED 亮度 (0-100) - 使用 gpiozero"""
@@ -127,28 +136,47 @@ def led_control(state):
 def index():
     """主頁面"""
     return render_template('control.html', 
-                         current_angle=current_angle, 
-                         led_brightness=led_brightness)
+                         current_angle=current_angles[DEFAULT_SERVO], 
+                         led_brightness=led_brightness,
+                         servo_ids=list(motions))
 
 @app.route('/api/servo', methods=['POST'])
 def control_servo():
-    """控制伺服馬達 API"""
+    """控制伺服馬達 API
+
+    {"angle": 90, "servo": "pan"}: 控制一顆 (沒有 servo 時為預設的那顆，"all" 為全部轉到同一個角度)
+    {"angles": {"pan": 30, "tilt": 120}}: 一次控制多顆
+    """
     try:
         data = request.get_json()
-        angle = int(data.get('angle', 90))
-        
-        if 0 <= angle <= 180:
-            set_servo_angle(angle)
-            return jsonify({
-                'success': True,
-                'message': f'馬達已轉到 {angle}度',
-                'angle': current_angle
-            })
+        if 'angles' in data:
+            angles = {str(servo_id): int(angle) for servo_id, angle in data['angles'].items()}
         else:
-            return jsonify({
-                'success': False,
-                'message': '角度必須在 0-180 之間'
-            }), 400
+            angle = int(data.get('angle', 90))
+            angles = {servo_id: angle for servo_id in servo_ids(data.get('servo'))}
+        for servo_id, angle in angles.items():
+            if servo_id not in motions:
+                return unknown_servo(servo_id)
+            if not 0 <= angle <= 180:
+                return jsonify({
+                    'success': False,
+                    'message': '角度必須在 0-180 之間'
+                }), 400
+        
+        tickets = {servo_id: set_servo_angle(angle, servo_id) for servo_id, angle in angles.items()}
+        servo_id, ticket = next(iter(tickets.items()))
+        return jsonify({
+            'success': True,
+            'message': f'馬達正在轉到 {ticket.target}度' if len(tickets) == 1
+                       else f'{len(tickets)} 顆馬達正在轉動',
+            'servo': servo_id,
+            'angle': ticket.target,
+            'angles': {key: t.target for key, t in tickets.items()},
+            'eta_ms': max(eta_ms(t) for t in tickets.values())
+        })
+    
+    except KeyError as e:
+        return unknown_servo(e.args[0])
             
     except Exception as e:
         return jsonify({
@@ -191,9 +219,24 @@ def control_led():
 
 @app.route('/api/status')
 def get_status():
-    """獲取當前狀態"""
+    """獲取當前狀態 (servo_* 為預設的那顆，servos 為全部)"""
+    motion = motions[DEFAULT_SERVO]
     return jsonify({
-        'servo_angle': current_angle,
+        'servo_angle': current_angles[DEFAULT_SERVO],
+        'servo_position': motion.position,
+        'servo_moving': motion.moving,
+        'servo_attached': motion.idle.attached,
+        'servo_backend': SERVO_BACKEND,
+        'servos': {
+            servo_id: {
+                'channel': SERVO_CHANNELS[servo_id],
+                'angle': current_angles[servo_id],
+                'position': motions[servo_id].position,
+                'moving': motions[servo_id].moving,
+                'attached': motions[servo_id].idle.attached,
+            }
+            for servo_id in motions
+        },
         'led_brightness': led_brightness,
         'servo_pin': servoPIN,
         'led_pin': ledPIN
@@ -201,27 +244,34 @@ def get_status():
 
 @app.route('/api/preset/<preset>')
 def preset_action(preset):
-    """預設動作"""
+    """預設動作 (?servo=<ID> 指定伺服馬達，?servo=all 為全部)"""
+    try:
+        targets = servo_ids(request.args.get('servo'))
+    except KeyError as e:
+        return unknown_servo(e.args[0])
     try:
+        tickets = []
         if preset == 'center':
-            set_servo_angle(90)
-            message = '馬達已置中'
+            tickets = [set_servo_angle(90, servo_id) for servo_id in targets]
+            message = '馬達置中'
             
         elif preset == 'left':
-            set_servo_angle(0)
-            message = '馬達已轉到左邊'
+            tickets = [set_servo_angle(0, servo_id) for servo_id in targets]
+            message = '馬達轉到左邊'
             
         elif preset == 'right':
-            set_servo_angle(180)
-            message = '馬達已轉到右邊'
+            tickets = [set_servo_angle(180, servo_id) for servo_id in targets]
+            message = '馬達轉到右邊'
             
         elif preset == 'sweep':
-            # 掃描動作
+            # 掃描動作：整段路徑一次規劃好，每個角度停留 0.2 秒，由運動控制執行緒播放
             angles = [0, 45, 90, 135, 180, 90]
-            for angle in angles:
-                set_servo_angle(angle)
-                time.sleep(0.8)
-            message = '掃描完成'
+            for servo_id in targets:
+                motion = motions[servo_id]
+                path = planner.plan_path(angles, start=motion.position, dwell=0.2)
+                tickets.append(motion.play(path))
+                current_angles[servo_id] = angles[-1]
+            message = '開始掃描'
             
         elif preset == 'led_blink':
             # LED 閃爍
@@ -240,12 +290,16 @@ def preset_action(preset):
                 'message': '未知的預設動作'
             }), 400
         
-        return jsonify({
+        response = {
             'success': True,
             'message': message,
-            'servo_angle': current_angle,
+            'servo': targets[0],
+            'servo_angle': current_angles[targets[0]],
             'led_brightness': led_brightness
-        })
+        }
+        if tickets:
+            response['eta_ms'] = max(eta_ms(ticket) for ticket in tickets)
+        return jsonify(response)
         
     except Exception as e:
         return jsonify({
@@ -256,10 +310,22 @@ def preset_action(preset):
 def cleanup():
     """清理 GPIO"""
     try:
-        set_led_brightness(0)  # 關閉 LED
-        set_servo_angle(90)    # 馬達回中心
-        time.sleep(1)
-        # gpiozero 會自動清理，不需要手動 cleanup
+        # 只清理真的初始化過的硬體，沒用到的不要為了清理而初始化
+        if led_pwm.acquired:
+            set_led_brightness(0)  # 關閉 LED
+        if servo_backend.acquired:
+            for servo_id in motions:
+                set_servo_angle(90, servo_id)  # 馬達回中心
+        for servo_id, motion in motions.items():
+            motion.wait(timeout=2)
+            motion.close()
+            print(f"📊 [{servo_id}] {motion.report()}")
+        bank.close()
+        print(f"📊 ServoBank: {bank.report()}")
+        print(f"📊 {PROCESS_CPU.report()}")
+        servo_backend.close()
+        led_pwm.close()
+        pin_backend.close()
         print("GPIO 清理完成")
     except:
         pass
@@ -268,13 +334,16 @@ if __name__ == '__main__':
     try:
         print("🚀 Flask 伺服馬達和 LED 控制伺服器啟動")
         print("🤖 硬體: Raspberry Pi 4 4GB + Raspbian Buster")
-        print("📍 伺服馬達: SG90 on GPIO 13 (gpiozero)")
+        print(f"📍 伺服馬達: SG90 x {len(motions)} ({SERVO_BACKEND}: "
+              f"{', '.join(f'{servo_id}={channel}' for servo_id, channel in SERVO_CHANNELS.items())})")
         print("💡 LED 燈: GPIO 26 (gpiozero PWMLED)")
+        print(f"🔌 GPIO 後端: {pin_backend.name}")
         print("🌐 網址: http://localhost:5000")
         print("🛑 按 Ctrl+C 停止伺服器")
         
         # 初始化設定
-        set_servo_angle(90)     # 馬達置中
+        for servo_id in motions:
+            set_servo_angle(90, servo_id)  # 馬達置中
         set_led_brightness(0)   # LED 關閉
         
         app.run(host='0.0.0.0', port=5000, debug=False)
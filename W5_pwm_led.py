@@ -1,19 +1,55 @@
+import argparse
 import time
-import RPi.GPIO as GPIO
-GPIO.setmode(GPIO.BOARD)
-GPIO.setup(12, GPIO.OUT)
+from rpi_drivers.fade import CURVES, FadeEngine
+from rpi_drivers.lazy import LazyDevice
 
-p = GPIO.PWM(12, 50)  # channel=12 frequency=50Hz
-p.start(0)
-try:
-    while 1:
-        for dc in range(0, 101, 5):
-            p.ChangeDutyCycle(dc)
-            time.sleep(0.1)
-        for dc in range(100, -1, -5):
-            p.ChangeDutyCycle(dc)
-            time.sleep(0.1)
-except KeyboardInterrupt:
-    pass
-p.stop()
-GPIO.cleanup()
\ No newline at end of file
+PWM_PINS = [12]      # BOARD 編號，可以用 --pins 加入更多 LED
+PWM_FREQUENCY = 200  # Hz，原本的 50Hz 肉眼看得到閃爍
+
+def _open_gpio():
+    import RPi.GPIO as GPIO
+    GPIO.setmode(GPIO.BOARD)
+    return GPIO
+
+# RPi.GPIO 在第一次使用時才初始化，匯入本模組不會碰到硬體
+GPIO = LazyDevice(_open_gpio)
+
+def open_pwm(pin, frequency=PWM_FREQUENCY):
+    GPIO.setup(pin, GPIO.OUT)
+    p = GPIO.PWM(pin, frequency)  # channel=pin frequency=Hz
+    p.start(0)
+    return p
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="PWM LED 漸變")
+    parser.add_argument('--pins', type=int, nargs='+', default=PWM_PINS, help="PWM 腳位 (BOARD 編號，預設 12)")
+    parser.add_argument('--freq', type=float, default=PWM_FREQUENCY, help=f"PWM 頻率 (預設 {PWM_FREQUENCY} Hz)")
+    parser.add_argument('--curve', choices=CURVES, default='gamma', help="亮度曲線 (預設 gamma)")
+    parser.add_argument('--period', type=float, default=4.2, help="一次亮暗循環的秒數 (預設 4.2)")
+    parser.add_argument('--tick-hz', type=float, default=100, help="漸變更新頻率 (預設 100 Hz)")
+    parser.add_argument('--seconds', type=float, default=None, help="執行幾秒後結束 (預設一直執行)")
+    return parser.parse_args()
+
+# 主程式區塊
+if __name__ == '__main__':
+    args = parse_args()
+    pwms = [open_pwm(pin, args.freq) for pin in args.pins]
+    engine = FadeEngine(tick_hz=args.tick_hz)
+    for i, (pin, p) in enumerate(zip(args.pins, pwms)):
+        channel = engine.add_channel(f"pin {pin}", p)
+        # 多個通道時錯開相位，讓亮暗依序傳遞
+        channel.wave(args.period, args.curve, phase=i / len(pwms))
+    engine.start()
+    try:
+        if args.seconds is None:
+            while 1:
+                time.sleep(1)
+        else:
+            time.sleep(args.seconds)
+    except KeyboardInterrupt:
+        pass
+    engine.stop()
+    print(engine.report())
+    for p in pwms:
+        p.stop()
+    GPIO.cleanup()
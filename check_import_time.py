@@ -0,0 +1,130 @@
+"""
+匯入時間預算檢查
+在乾淨的子行程中以 python -X importtime 匯入每個模組，確認：
+  1. 累計匯入時間 (取多次執行的最小值) 不超過預算
+  2. 匯入時沒有載入任何硬體函式庫 (RPi.GPIO、gpiozero 等)，也就是沒有碰到硬體
+
+用法: python check_import_time.py [--runs 3] [--scale 1.0]
+缺少相依套件 (例如沒有安裝 flask) 的模組會略過，不算失敗
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+MOTOR_DIR = os.path.join(ROOT, 'Motor_Web_Control')
+
+DEFAULT_BUDGET_MS = 100
+
+# (模組, 執行目錄, 預算 ms)，預算為 None 時使用 DEFAULT_BUDGET_MS
+TARGETS = [
+    ('rpi_drivers', ROOT, 10),
+    ('rpi_drivers.segment_driver', ROOT, None),
+    ('rpi_drivers.gpio_bank', ROOT, None),
+    ('rpi_drivers.frame_table', ROOT, None),
+    ('rpi_drivers.framebuffer', ROOT, None),
+    ('rpi_drivers.scheduler', ROOT, None),
+    ('rpi_drivers.led_sequencer', ROOT, None),
+    ('rpi_drivers.ticker', ROOT, None),
+    ('rpi_drivers.fade', ROOT, None),
+    ('rpi_drivers.factor_index', ROOT, None),
+    ('rpi_drivers.stream_display', ROOT, None),
+    ('rpi_drivers.segment_mux', ROOT, None),
+    ('rpi_drivers.display_client', ROOT, None),
+    ('rpi_drivers.display_daemon', ROOT, None),
+    ('rpi_drivers.pins', ROOT, None),
+    ('rpi_drivers.calibration', ROOT, None),
+    ('rpi_drivers.servo', ROOT, None),
+    ('rpi_drivers.kinematics', ROOT, None),
+    ('rpi_drivers.idle', ROOT, None),
+    ('rpi_drivers.motion', ROOT, None),
+    ('rpi_drivers.pin_backends', ROOT, None),
+    ('rpi_drivers.fake_pigpiod', ROOT, None),
+    ('rpi_drivers.pca9685', ROOT, None),
+    ('rpi_drivers.servo_bank', ROOT, None),
+    ('rpi_drivers.trajectory', ROOT, 400),     # numpy
+    ('rpi_drivers.random_frames', ROOT, 400),  # numpy
+    ('rpi_drivers.pwm_jitter', ROOT, 400),     # numpy
+    ('hw_task', ROOT, None),
+    ('hw_task_async', ROOT, 250),              # asyncio
+    ('little_game', ROOT, 400),                # numpy
+    ('countdown_clock', ROOT, None),
+    ('show_number_demo', ROOT, None),
+    ('seven_segment', ROOT, None),
+    ('servo_control', ROOT, None),
+    ('W5_pwm_led', ROOT, None),
+    ('web_control', MOTOR_DIR, 800),           # flask
+    ('servo_control', MOTOR_DIR, None),
+    ('servo_control_gpiozero', MOTOR_DIR, None),
+    ('servo_calibration', MOTOR_DIR, None),
+]
+
+# 匯入時不應該被載入的硬體函式庫
+HARDWARE_MODULES = ('RPi', 'gpiozero', 'pigpio', 'lgpio', 'smbus2', 'smbus')
+
+_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$')
+
+
+def measure(module, cwd):
+    """匯入一次，回傳 (累計 µs, 載入的模組名稱集合)；匯入失敗時丟出 ImportError"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=cwd, capture_output=True, text=True)
+    cumulative = None
+    loaded = set()
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        name = match.group(4)
+        loaded.add(name)
+        # 巢狀匯入先列出，目標模組本身是最後一行 (累計時間包含所有子模組)
+        if name == module:
+            cumulative = int(match.group(2))
+    if result.returncode != 0:
+        missing = re.search(r"No module named '([^']+)'", result.stderr)
+        raise ImportError(missing.group(1) if missing else result.stderr.strip().splitlines()[-1])
+    return cumulative, loaded
+
+
+def check(runs=3, scale=1.0):
+    """檢查所有模組，回傳是否全部通過"""
+    ok = True
+    print(f"{'模組':40} {'耗時':>10} {'預算':>8}")
+    print("-" * 64)
+    for module, cwd, budget in TARGETS:
+        budget_ms = (budget or DEFAULT_BUDGET_MS) * scale
+        label = module if cwd == ROOT else f"{os.path.basename(cwd)}/{module}"
+        try:
+            samples = [measure(module, cwd) for _ in range(runs)]
+        except ImportError as e:
+            print(f"{label:40} {'略過':>10} {budget_ms:>6.0f}ms  (缺少 {e})")
+            continue
+
+        elapsed_ms = min(us for us, _ in samples) / 1000
+        hardware = sorted({name for _, loaded in samples for name in loaded
+                           if name.split('.')[0] in HARDWARE_MODULES})
+        status = "✅"
+        if elapsed_ms > budget_ms:
+            status = "❌ 超過預算"
+            ok = False
+        if hardware:
+            status = f"❌ 匯入時載入硬體函式庫: {', '.join(hardware)}"
+            ok = False
+        print(f"{label:40} {elapsed_ms:>8.1f}ms {budget_ms:>6.0f}ms  {status}")
+    return ok
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="匯入時間預算檢查")
+    parser.add_argument('--runs', type=int, default=3, help="每個模組匯入幾次取最小值 (預設 3)")
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help="預算倍率，在較慢的機器上可以放寬 (預設 1.0)")
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    sys.exit(0 if check(args.runs, args.scale) else 1)
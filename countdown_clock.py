@@ -0,0 +1,75 @@
+import time
+from rpi_drivers.display_client import lazy_display
+from rpi_drivers.pins import LED_PIN, SEG_PINS_1, SEG_PINS_2
+from rpi_drivers.frame_table import lookup_display_value
+from rpi_drivers.ticker import Ticker
+
+
+# 第一次顯示時才取得顯示器：有 display daemon 時直接連線，沒有 daemon 時才在本機初始化腳位
+# (本機模式優先透過 /dev/gpiomem 一次寫入整組腳位，無法使用時退回 RPi.GPIO)
+display = lazy_display(SEG_PINS_1, SEG_PINS_2, LED_PIN)
+
+
+def show_two_digits(n, dp=False):
+    """兩位數都顯示 (00~99)，dp 控制左邊顯示器的小數點"""
+    display.show_pair(n // 10, n % 10, dp=dp)
+
+def countdown(seconds):
+    """倒數計時 (最多 99 秒)，時間到 LED 亮起"""
+    seconds = max(0, min(99, seconds))
+    ticker = Ticker(1.0)
+    # 顯示的值由 tick 編號算出，就算中間延遲略過 tick 也會跟牆上時鐘一致
+    for tick in ticker:
+        remaining = seconds - tick
+        if remaining <= 0:
+            break
+        display.show_frame(lookup_display_value(remaining).frame)
+
+    display.show_frame(lookup_display_value(0).frame)
+    display.set_led(1)
+    print("⏰ 時間到!")
+    print(ticker.report())
+
+def seconds_clock():
+    """顯示目前的秒數 (00~59)，小數點每半秒閃爍一次"""
+    ticker = Ticker(0.5)
+    # 第 0 個 tick 對齊到下一個整秒
+    ticker.start(time.monotonic() + (1 - time.time() % 1))
+    try:
+        for tick in ticker:
+            now = time.localtime()
+            show_two_digits(now.tm_sec, dp=(tick % 2 == 0))
+    finally:
+        print(ticker.report())
+
+
+# 主程式區塊
+if __name__ == '__main__':
+    try:
+        print("=" * 50)
+        print("⏱️ 時鐘 / 倒數計時")
+        print("=" * 50)
+        print("1. 倒數計時")
+        print("2. 秒數時鐘")
+
+        choice = input("\n請選擇 (1-2): ").strip()
+        if choice == '1':
+            seconds = int(input("倒數秒數 (1~99): ").strip())
+            countdown(seconds)
+            time.sleep(2)
+        elif choice == '2':
+            print("按 Ctrl+C 停止")
+            seconds_clock()
+        else:
+            print("❌ 請選擇 1-2")
+
+    # 捕捉 Ctrl+C 中斷，做清理
+    except KeyboardInterrupt:
+        print("\n程式被中斷")
+    except ValueError:
+        print("❌ 請輸入有效的數字")
+    finally:
+        display.all_off()  # 關掉所有段位
+        display.set_led(0)
+        display.close()    # 清理 GPIO 狀態 (連線到 daemon 時只關閉連線)
+        print("GPIO清理完成")
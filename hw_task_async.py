@@ -0,0 +1,186 @@
+"""
+hw_task.py 的 asyncio 版本
+單一執行緒：stdin 讀取、顯示更新、自動清空、LED 閃爍都是同一個 event loop 上的 callback / task，
+並量測從按下 Enter 到顯示器更新完成的延遲
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import time
+from rpi_drivers.display_client import lazy_display
+from rpi_drivers.pins import LED_PIN, SEG_PINS_1, SEG_PINS_2
+from rpi_drivers.frame_table import lookup_display_value
+from rpi_drivers.led_sequencer import ERROR_PATTERN, FAULT_PATTERN
+
+AUTO_CLEAR_SECONDS = 5
+
+
+# 第一次顯示時才取得顯示器：有 display daemon 時直接連線，沒有 daemon 時才在本機初始化腳位
+# (本機模式優先透過 /dev/gpiomem 一次寫入整組腳位，無法使用時退回 RPi.GPIO)
+display = lazy_display(SEG_PINS_1, SEG_PINS_2, LED_PIN)
+
+def set_led(level):
+    display.set_led(level)
+
+def prompt():
+    print("請輸入數字: ", end="", flush=True)
+
+
+class AsyncDisplaySystem:
+    """asyncio 版的輸入顯示系統"""
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.lines = asyncio.Queue()
+        self._pending = b''
+        self.clear_handle = None  # 自動清空的 TimerHandle
+        self.led_task = None      # 正在播放的 LED 模式
+        self.latencies_ns = []    # 按下 Enter 到顯示完成的延遲
+
+    # ---- stdin ----
+
+    def _on_stdin(self):
+        """stdin 可讀時由 event loop 呼叫，記錄收到資料的時間"""
+        received_ns = time.perf_counter_ns()
+        # 直接讀 fd，避免 sys.stdin 的緩衝區吃掉多行後 event loop 不再通知
+        data = os.read(sys.stdin.fileno(), 4096)
+        if not data:  # EOF
+            self.loop.remove_reader(sys.stdin)
+            self.lines.put_nowait(None)
+            return
+        self._pending += data
+        while b'\n' in self._pending:
+            line, _, self._pending = self._pending.partition(b'\n')
+            text = line.decode(sys.stdin.encoding or 'utf-8', errors='replace')
+            self.lines.put_nowait((received_ns, text.strip()))
+
+    # ---- 顯示與計時 ----
+
+    def clear_display(self):
+        """自動清空顯示器"""
+        self.clear_handle = None
+        display.all_off()
+        print("\n顯示已自動清空")
+        prompt()
+
+    def restart_auto_clear(self):
+        """取消之前的自動清空並重新計時"""
+        self.cancel_auto_clear()
+        self.clear_handle = self.loop.call_later(AUTO_CLEAR_SECONDS, self.clear_display)
+
+    def cancel_auto_clear(self):
+        if self.clear_handle is not None:
+            self.clear_handle.cancel()
+            self.clear_handle = None
+
+    # ---- LED ----
+
+    async def _play_pattern(self, pattern):
+        """依 event loop 的絕對時間播放 LED 模式，被取消時關閉 LED"""
+        start = self.loop.time()
+        try:
+            for offset, level in pattern.events:
+                delay = start + offset - self.loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                set_led(level)
+        except asyncio.CancelledError:
+            set_led(0)
+            raise
+
+    def play_led(self, pattern):
+        """開始播放 LED 模式 (中斷正在播放的模式)"""
+        self.stop_led()
+        self.led_task = self.loop.create_task(self._play_pattern(pattern))
+
+    def stop_led(self):
+        if self.led_task is not None and not self.led_task.done():
+            self.led_task.cancel()
+        self.led_task = None
+        set_led(0)
+
+    # ---- 主迴圈 ----
+
+    def handle_input(self, received_ns, user_input):
+        """處理一行輸入，回傳從收到輸入到顯示完成的延遲 (ns)，無效輸入回傳 None"""
+        entry = lookup_display_value(user_input)
+        if entry is None:
+            self.cancel_auto_clear()
+            display.all_off()
+            self.play_led(ERROR_PATTERN)  # LED亮2秒，不會卡住輸入
+            print("   請輸入 0~99 的整數或 0.1~9.9 的小數")
+            return None
+
+        self.stop_led()
+        display.show_frame(entry.frame)
+        latency_ns = time.perf_counter_ns() - received_ns
+        self.restart_auto_clear()
+
+        self.latencies_ns.append(latency_ns)
+        print(f"顯示: {entry.text}  ✅ 輸入正確! (延遲 {latency_ns / 1000:.1f} µs，5秒後自動清空...)")
+        return latency_ns
+
+    async def run(self):
+        self.loop.add_reader(sys.stdin, self._on_stdin)
+        prompt()
+        try:
+            while True:
+                item = await self.lines.get()
+                if item is None:
+                    break
+                received_ns, user_input = item
+                try:
+                    self.handle_input(received_ns, user_input)
+                except Exception as e:
+                    print(f"發生錯誤: {e}")
+                    self.play_led(FAULT_PATTERN)
+                prompt()
+        finally:
+            self.loop.remove_reader(sys.stdin)
+            self.cancel_auto_clear()
+            self.stop_led()
+
+    def report(self):
+        """輸出延遲統計"""
+        if not self.latencies_ns:
+            return
+        values = sorted(self.latencies_ns)
+        p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+        print(f"\n📊 按鍵到顯示延遲 ({len(values)} 次): "
+              f"最小 {values[0] / 1000:.1f} µs，中位數 {statistics.median(values) / 1000:.1f} µs，"
+              f"p95 {p95 / 1000:.1f} µs，最大 {values[-1] / 1000:.1f} µs")
+
+
+async def main():
+    print("=" * 50)
+    print("🔢 互動小遊戲 (asyncio)")
+    print("=" * 50)
+    print("請輸入數字，讓它顯示在顯示器上")
+    print("支援範圍:")
+    print("  - 整數: 0~99")
+    print("  - 小數: 0.1~9.9")
+    print("注意: 顯示5秒後會自動清空")
+    print("=" * 50)
+
+    system = AsyncDisplaySystem(asyncio.get_running_loop())
+    try:
+        await system.run()
+    finally:
+        system.report()
+
+
+# 主程式區塊
+if __name__ == '__main__':
+    try:
+        asyncio.run(main())
+
+    # 捕捉 Ctrl+C 中斷，做清理
+    except KeyboardInterrupt:
+        print("\n程式被中斷")
+    finally:
+        display.all_off()  # 關掉所有段位
+        set_led(0)         # 關閉LED
+        display.close()    # 清理 GPIO 狀態 (連線到 daemon 時只關閉連線)
+        print("GPIO清理完成")
@@ -1,183 +1,123 @@
 
+import argparse
 import time
-import random
 import threading
-import RPi.GPIO as GPIO
-GPIO.setmode(GPIO.BCM)
-
-# 定義第一個七段顯示器 a~g 對應到的 GPIO 腳位 (左邊那個)
-SEG_PINS_1 = {
-    'a': 11,   # 紅色線
-    'b': 0,    # 綠色線
-    'c': 5,    # 咖啡色線
-    'd': 6,    # 紫色線
-    'e': 13,   # 黃色線
-    'f': 19,   # 白色線
-    'g': 26,   # 橘色線
-    'dp': 21,  # 灰色線，控制小數點
-}
-
-# 定義第二個七段顯示器 a~g 對應到的 GPIO 腳位 (右邊那個)
-SEG_PINS_2 = {
-    'a': 25,   # 藍色線
-    'b': 8,   # 綠色線
-    'c': 7,   # 咖啡色線
-    'd': 1,   # 紫色線
-    'e': 12,  # 黃色線
-    'f': 16,  # 白色線
-    'g': 20,  # 橘色線
-}
-
-# 定義LED的GPIO腳位
-LED_PIN = 14  # LED接在GPIO14
-
-
-# 初始化所有段位腳為輸出模式，預設 LOW（共陰極：LOW=熄滅）
-for pin in SEG_PINS_1.values():
-    GPIO.setup(pin, GPIO.OUT, initial=GPIO.LOW)
-
-for pin in SEG_PINS_2.values():
-    GPIO.setup(pin, GPIO.OUT, initial=GPIO.LOW)
-
-# 初始化LED為輸出模式，預設 LOW（熄滅）
-GPIO.setup(LED_PIN, GPIO.OUT, initial=GPIO.LOW) 
-
-
-# 定義 0~9 的段碼資料，每個元組代表 a~g 七段的亮滅狀態
-# True/1 = 點亮，False/0 = 熄滅
-DIGITS = {
-    0: (1,1,1,1,1,1,0),  # 顯示 0
-    1: (0,1,1,0,0,0,0),  # 顯示 1
-    2: (1,1,0,1,1,0,1),  # 顯示 2
-    3: (1,1,1,1,0,0,1),  # 顯示 3
-    4: (0,1,1,0,0,1,1),  # 顯示 4
-    5: (1,0,1,1,0,1,1),  # 顯示 5
-    6: (1,0,1,1,1,1,1),  # 顯示 6
-    7: (1,1,1,0,0,0,0),  # 顯示 7
-    8: (1,1,1,1,1,1,1),  # 顯示 8
-    9: (1,1,1,1,0,1,1),  # 顯示 9
-}
+from collections import namedtuple
+from rpi_drivers.display_client import lazy_display
+from rpi_drivers.pins import LED_PIN, SEG_PINS_1, SEG_PINS_2
+from rpi_drivers.framebuffer import FrameBuffer
+from rpi_drivers.random_frames import FramePlayer, RandomFrameSource
+from rpi_drivers.factor_index import (FactorRangeError, check_answer, format_tenths, hint,
+                                      is_solvable, parse_factor)
+from rpi_drivers.scheduler import DeadlineScheduler
+from rpi_drivers.led_sequencer import CORRECT_PATTERN, WRONG_PATTERN, LedSequencer
 
-# 控制七顯示器每一段 a~g 是否要點亮
-def set_segments(monitor_number,a,b,c,d,e,f,g,dp):
-    # 建立一個 dict 將每段對應到狀態
-    states_1 = {'a':a,'b':b,'c':c,'d':d,'e':e,'f':f,'g':g, 'dp':dp}
-    states_2 = {'a':a,'b':b,'c':c,'d':d,'e':e,'f':f,'g':g}
-
-    # 對每一段的腳位設定 HIGH（亮）或 LOW（滅）
 
-    # 左邊的顯示器
-    if monitor_number == 1: 
-        for seg, val in states_1.items():
-            GPIO.output(SEG_PINS_1[seg], GPIO.HIGH if val else GPIO.LOW)
+# 第一次顯示時才取得顯示器：有 display daemon 時直接連線，沒有 daemon 時才在本機初始化腳位
+# (本機模式優先透過 /dev/gpiomem 一次寫入整組腳位，無法使用時退回 RPi.GPIO)
+display = lazy_display(SEG_PINS_1, SEG_PINS_2, LED_PIN)
 
-    # 右邊的顯示器
-    if monitor_number == 2: 
-        for seg, val in states_2.items():
-            GPIO.output(SEG_PINS_2[seg], GPIO.HIGH if val else GPIO.LOW)
+# 控制七顯示器每一段 a~g 是否要點亮
+def set_segments(monitor_number,a,b,c,d,e,f,g,dp):
+    display.set_segments(monitor_number, a, b, c, d, e, f, g, dp)
 
-# 顯示某個數字 (0~9)
+# 顯示某個數字 (0~9)，monitor 2 沒有 dp 腳位
 def show_digit(monitor_number, n, dp=False):
-    pattern = DIGITS.get(n, (0,0,0,0,0,0,0))  # 取出對應段碼，預設全部熄滅
-    if monitor_number == 1:
-        set_segments(1, *pattern, dp)  # 為monitor 1添加dp參數
-    elif monitor_number == 2:
-        set_segments(2, *pattern, False)  # monitor 2沒有dp，固定為False 
+    display.show_digit(monitor_number, n, dp)
 
 # 熄滅所有段位（全部 LOW）
 def all_off():
-    set_segments(1, 0, 0, 0, 0, 0, 0, 0, False)  # monitor 1，包含dp
-    set_segments(2, 0, 0, 0, 0, 0, 0, 0, False)  # monitor 2，dp參數會被忽略
+    display.all_off()
 
 
 # LED控制函數
 def led_on():
-    GPIO.output(LED_PIN, GPIO.HIGH)
+    display.set_led(1)
 
 def led_off():
-    GPIO.output(LED_PIN, GPIO.LOW)
+    display.set_led(0)
 
 def led_toggle():
-    current_state = GPIO.input(LED_PIN)
-    GPIO.output(LED_PIN, not current_state)
+    display.set_led(not display.led_level)
+
+def set_led(level):
+    display.set_led(level)
 
 # 遊戲相關函數
 
-# 全域變數控制遊戲狀態
-game_running = False
-current_digit1 = 0
-current_digit2 = 0
-current_dp1 = False
-current_dp2 = False
+SPIN_FPS = 200  # 亂數變化的幀率 (每秒幾幀)，可用 --fps 調整
 
-def random_display():
-    """持續隨機顯示數字和小數點"""
-    global game_running, current_digit1, current_digit2, current_dp1, current_dp2
-    while game_running:
-        current_digit1 = random.randint(0, 9)
-        current_digit2 = random.randint(0, 9)
-        current_dp1 = random.choice([True, False])  # 只有第一個顯示器有小數點
-        current_dp2 = False  # 第二個顯示器沒有小數點
-        
-        show_digit(1, current_digit1, current_dp1)  
-        show_digit(2, current_digit2, current_dp2)  
-        time.sleep(0.1)  # 快速變化
+# 設定後亂數執行緒立即醒來結束，不用等到下一幀
+stop_event = threading.Event()
+
+# 雙緩衝 framebuffer：亂數執行緒寫入並 flip，主執行緒只讀已顯示的 front frame
+framebuffer = FrameBuffer(display)
 
-def get_displayed_number():
-    """取得當前顯示的數字（考慮小數點位置）"""
+# 預先產生的亂數畫面，跨回合共用同一個來源
+frame_source = RandomFrameSource()
+player = None  # 目前這一回合的 FramePlayer
+
+# 每一回合的紀錄 (時間皆為 ns)
+# stop_latency: 按下 Enter 到畫面凍結，reaction: 開始變化到按下 Enter，
+# frame_age: 按下 Enter 時這個數字已經顯示多久，correct: None 表示題目無解而跳過
+RoundRecord = namedtuple('RoundRecord', ['target', 'frame_seq', 'stop_latency_ns',
+                                         'reaction_ns', 'frame_age_ns', 'correct'])
+round_history = []
+
+def random_display():
+    """以固定幀率播放預先產生的亂數畫面 (數字和小數點)，直到 stop_event 被設定"""
+    player.run(stop_event)
+
+def get_displayed_number(frame=None):
+    """取得當前顯示的數字（考慮小數點位置），以十分位整數表示 (4.5 → 45、45 → 450)
+
+    有顯示器熄滅或顯示的不是數字時回傳 None
+    """
+    if frame is None:
+        frame = framebuffer.front  # 最後一次 flip 的完整畫面，不需上鎖
+    if frame.digit1 is None or frame.digit2 is None:
+        return None
     # 由於只有第一個顯示器有小數點功能
-    if current_dp1:  # 第一個數字後有小數點: X.Y
-        return current_digit1 + current_digit2 * 0.1
+    if frame.dp:  # 第一個數字後有小數點: X.Y
+        return frame.digit1 * 10 + frame.digit2
     else:  # 沒有小數點: XY
-        return current_digit1 * 10 + current_digit2
+        return (frame.digit1 * 10 + frame.digit2) * 10
+
+def read_factor(prompt, target):
+    """讀取一個因數 (精確的 Decimal)，輸入 ? 顯示提示後重新輸入"""
+    text = input(prompt).strip()
+    while text == '?':
+        print(f"💡 提示: {hint(target)}")
+        text = input(prompt).strip()
+    value = parse_factor(text)
+    if value is None:
+        raise ValueError(text)
+    return value
+
+# LED 閃爍序列：模式編譯成事件列表，由排程執行緒依絕對時間播放，不會卡住遊戲
+scheduler = DeadlineScheduler()
+led_sequencer = LedSequencer(set_led, scheduler)
 
 def led_correct_pattern():
-    """答對時的LED閃爍模式：短-長-短-長快速閃"""
-    for _ in range(3):  # 重複3次
-        # 短閃
-        led_on()
-        time.sleep(0.2)
-        led_off()
-        time.sleep(0.1)
-        # 長閃
-        led_on()
-        time.sleep(0.5)
-        led_off()
-        time.sleep(0.1)
-        # 短閃
-        led_on()
-        time.sleep(0.2)
-        led_off()
-        time.sleep(0.1)
-        # 長閃
-        led_on()
-        time.sleep(0.5)
-        led_off()
-        time.sleep(0.2)
+    """答對時的LED閃爍模式：短-長-短-長快速閃 (立即返回)"""
+    led_sequencer.play(CORRECT_PATTERN)
 
 def led_wrong_pattern():
-    """答錯時的LED閃爍模式：長-長"""
-    for _ in range(3):  # 重複3次
-        led_on()
-        time.sleep(0.8)
-        led_off()
-        time.sleep(0.2)
-        led_on()
-        time.sleep(0.8)
-        led_off()
-        time.sleep(0.3)
+    """答錯時的LED閃爍模式：長-長 (立即返回)"""
+    led_sequencer.play(WRONG_PATTERN)
 
 def wait_for_enter():
-    """等待 Enter 鍵按下"""
+    """等待 Enter 鍵按下，回傳按下的時間 (perf_counter_ns)"""
     print("按下 Enter 繼續...")
     try:
         input()
     except:
         pass
+    return time.perf_counter_ns()
 
 def multiplication_game():
     """主要的乘法遊戲"""
-    global game_running
+    global player
     
     print("=" * 50)
     print("🎮 數字乘法遊戲 🎮")
@@ -189,83 +129,150 @@ def multiplication_game():
     
     wait_for_enter()
     
-    # 開始隨機顯示
-    game_running = True
+    # 開始隨機顯示 (上一回合的 LED 提示還在閃的話直接中斷)
+    led_sequencer.stop()
+    display.reset_stats()
+    framebuffer.unfreeze()
+    stop_event.clear()
+    player = FramePlayer(framebuffer, fps=SPIN_FPS, source=frame_source)
     display_thread = threading.Thread(target=random_display)
     display_thread.daemon = True
+    spin_start_ns = time.perf_counter_ns()
     display_thread.start()
     
     print("🎲 數字正在隨機變化中...")
     print("再按一次 Enter 停止!")
     
-    wait_for_enter()
+    press_ns = wait_for_enter()
     
-    # 停止隨機顯示
-    game_running = False
-    time.sleep(0.2)  # 確保顯示停止
+    # 停止隨機顯示：先凍結 framebuffer 再喚醒亂數執行緒，
+    # 凍結的畫面就是按下 Enter 那一刻實際顯示的那一幀
+    frame = framebuffer.freeze(at_ns=press_ns)
+    frozen_ns = time.perf_counter_ns()
+    stop_event.set()
+    display_thread.join()
+    stop_latency_ns = frozen_ns - press_ns
+    reaction_ns = press_ns - spin_start_ns
+    frame_age_ns = max(0, press_ns - frame.shown_ns)
+    print(f"⏱️ 停止延遲 {stop_latency_ns / 1000:.1f} µs，反應時間 {reaction_ns / 1e9:.3f} 秒 "
+          f"(第 {frame.seq} 幀，已顯示 {frame_age_ns / 1e6:.1f} ms)")
+    print(f"📊 平均每幀 GPIO 寫入: {display.average_writes_per_frame():.1f} 腳位 (全部重寫需 15 次)，"
+          f"耗時 {display.average_write_us_per_frame():.1f} µs")
+    print(f"📊 {player.report()}")
     
     # 顯示最終結果
-    target_number = get_displayed_number()
+    target = get_displayed_number(frame)
+    if target is None:
+        # 還沒顯示任何數字就停下來 (例如第一幀之前就按了 Enter)
+        print("=" * 30)
+        print("⏭️ 停止時還沒有顯示數字，這回合跳過")
+        round_history.append(RoundRecord("--", frame.seq, stop_latency_ns,
+                                         reaction_ns, frame_age_ns, None))
+        print("\n" + "=" * 50)
+        return
+    target_number = format_tenths(target)
     
     # 顯示當前數字的詳細資訊
-    display_str = f"{current_digit1}"
-    if current_dp1:
+    display_str = f"{frame.digit1}"
+    if frame.dp:
         display_str += "."
-    display_str += f"{current_digit2}"
+    display_str += f"{frame.digit2}"
     # 第二個顯示器沒有小數點功能
     
     print("=" * 30)
-    print("請輸入兩個數字相乘等於此數(可以是小數點):")
+    if not is_solvable(target):
+        # 0 或只能寫成 1 × 自己的數 (例如 97)，沒有出題的意義
+        print(f"⏭️ {target_number} 找不到不含 1 的兩個數字相乘，這回合跳過")
+        round_history.append(RoundRecord(target_number, frame.seq, stop_latency_ns,
+                                         reaction_ns, frame_age_ns, None))
+        print("\n" + "=" * 50)
+        return
+    print("請輸入兩個數字相乘等於此數(可以是小數點)，輸入 ? 取得提示:")
     
+    correct = False
     try:
-        num1 = float(input("第一個數字: "))
-        num2 = float(input("第二個數字: "))
+        num1 = read_factor("第一個數字: ", target)
+        num2 = read_factor("第二個數字: ", target)
         result = num1 * num2
         
         print(f"\n你的答案: {num1} × {num2} = {result}")
         print(f"目標數字: {target_number}")
         
-        # 檢查答案 (允許小誤差)
-        if abs(result - target_number) < 0.01:
+        # 檢查答案 (精確的十進位運算，查因數對索引)
+        if check_answer(target, num1, num2):
+            correct = True
             print("🎉 答對了! 太棒了!")
             led_correct_pattern()
         else:
             print("❌ 答錯了，再接再厲!")
             led_wrong_pattern()
             
-    except ValueError:
+    except FactorRangeError as e:
+        # 合法的數字，只是太大或太小，不可能是答案
+        print(f"❌ {e} 超出因數的範圍 (0.1 ~ 99)，答錯了!")
+        led_wrong_pattern()
+    except (ValueError, ArithmeticError):
         print("❌ 輸入格式錯誤!")
         led_wrong_pattern()
     
+    round_history.append(RoundRecord(target_number, frame.seq, stop_latency_ns,
+                                     reaction_ns, frame_age_ns, correct))
     print("\n" + "=" * 50)
 
+def print_round_summary():
+    """輸出每一回合的停止延遲與反應時間"""
+    if not round_history:
+        return
+    print("=" * 50)
+    print("📋 回合紀錄")
+    for i, record in enumerate(round_history, 1):
+        result = "⏭️" if record.correct is None else "✅" if record.correct else "❌"
+        print(f"  第 {i} 回合 {result} 目標 {record.target}，反應時間 {record.reaction_ns / 1e9:.3f} 秒，"
+              f"停止延遲 {record.stop_latency_ns / 1000:.1f} µs")
+    worst = max(record.stop_latency_ns for record in round_history)
+    average = sum(record.reaction_ns for record in round_history) / len(round_history)
+    print(f"  平均反應時間 {average / 1e9:.3f} 秒，最大停止延遲 {worst / 1000:.1f} µs")
+    print("=" * 50)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="數字乘法遊戲")
+    parser.add_argument('--fps', type=float, default=SPIN_FPS,
+                        help=f"亂數變化的幀率 (預設 {SPIN_FPS})")
+    return parser.parse_args()
+
 # 主程式區塊
-try:
+if __name__ == '__main__':
+    SPIN_FPS = parse_args().fps
+    try:
 
-    led_on()
-    time.sleep(1)
-    led_off()
-    time.sleep(1)
+        led_on()
+        time.sleep(1)
+        led_off()
+        time.sleep(1)
 
-    # 開始遊戲循環
-    while True:
-        try:
-            multiplication_game()
+        # 開始遊戲循環
+        while True:
+            try:
+                multiplication_game()
             
-            # 詢問是否繼續遊戲
-            print("是否繼續遊戲? (按 Enter 繼續，輸入 'q' 退出)")
-            choice = input().strip().lower()
-            if choice == 'q':
-                break
+                # 詢問是否繼續遊戲
+                print("是否繼續遊戲? (按 Enter 繼續，輸入 'q' 退出)")
+                choice = input().strip().lower()
+                if choice == 'q':
+                    break
                 
-        except KeyboardInterrupt:
-            break
-
-# 捕捉 Ctrl+C 中斷，做清理
-except KeyboardInterrupt:
-    print("\n程式被中斷")
-finally:
-    all_off()        # 關掉所有段位
-    led_off()        # 關閉LED
-    GPIO.cleanup()   # 清理 GPIO 狀態
-    print("GPIO清理完成")
+            except KeyboardInterrupt:
+                break
+
+    # 捕捉 Ctrl+C 中斷，做清理
+    except KeyboardInterrupt:
+        print("\n程式被中斷")
+    finally:
+        stop_event.set()      # 亂數執行緒若還在跑，立即結束
+        print_round_summary()
+        led_sequencer.stop()  # 中斷還在播放的 LED 模式
+        scheduler.stop()
+        all_off()        # 關掉所有段位
+        led_off()        # 關閉LED
+        display.close()  # 清理 GPIO 狀態 (連線到 daemon 時只關閉連線)
+        print("GPIO清理完成")
@@ -0,0 +1,66 @@
+"""
+樹莓派七段顯示器、LED 與伺服馬達的驅動套件
+
+匯入本套件或任何子模組都不會初始化 GPIO；硬體一律在第一次使用時才取得
+(見 lazy.LazyDevice 與 display_client.open_display)。
+常用的名稱可以直接從套件匯入，對應的子模組在第一次存取時才載入。
+"""
+
+import importlib
+
+# 名稱 -> 子模組
+_EXPORTS = {
+    'LazyDevice': 'lazy',
+    'DualSegmentDriver': 'segment_driver',
+    'SegmentDisplay': 'segment_driver',
+    'DIGIT_MASKS': 'segment_driver',
+    'SEGMENT_BITS': 'segment_driver',
+    'open_backend': 'gpio_bank',
+    'MockGpioBackend': 'gpio_bank',
+    'FRAME_TABLE': 'frame_table',
+    'lookup_display_value': 'frame_table',
+    'FrameBuffer': 'framebuffer',
+    'DeadlineScheduler': 'scheduler',
+    'LedSequencer': 'led_sequencer',
+    'Ticker': 'ticker',
+    'FadeEngine': 'fade',
+    'FadeChannel': 'fade',
+    'DisplayClient': 'display_client',
+    'open_display': 'display_client',
+    'lazy_display': 'display_client',
+    'SEG_PINS_1': 'pins',
+    'SEG_PINS_2': 'pins',
+    'LED_PIN': 'pins',
+    'MultiplexedDisplay': 'segment_mux',
+    'CalibrationTable': 'calibration',
+    'ServoModel': 'kinematics',
+    'ServoTracker': 'kinematics',
+    'SG90': 'kinematics',
+    'MotionController': 'motion',
+    'IdleDetacher': 'idle',
+    'TrajectoryPlanner': 'trajectory',
+    'open_pin_backend': 'pin_backends',
+    'select_pin_backend': 'pin_backends',
+    'FakePigpiod': 'fake_pigpiod',
+    'PCA9685': 'pca9685',
+    'FakeI2CBus': 'pca9685',
+    'ServoBank': 'servo_bank',
+    'open_servo_backend': 'servo_bank',
+    'SERVO_CALIBRATION': 'servo',
+    'CALIBRATION_TABLE': 'servo',
+    'ServoMapping': 'servo',
+    'SERVO_MAPPING': 'servo',
+    'angle_to_servo_value': 'servo',
+    'get_calibrated_duty_cycle': 'servo',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module_name}', __name__), name)
+    globals()[name] = value  # 之後直接從模組屬性取得
+    return value
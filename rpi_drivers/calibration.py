@@ -0,0 +1,146 @@
+"""
+校準表編譯
+把少數幾個實測的 (角度, duty cycle) 校準點，在載入時一次展開成固定解析度 (預設 0.1°) 的密集查表：
+  格點上的角度 (例如 45、45.3) 直接以索引查表，O(1)
+  不在格點上的角度以 bisect 找到所在區間，再用同一條插值曲線計算
+插值方式可以選 linear (分段線性，和原本的 get_calibrated_duty_cycle 結果相同)
+或 pchip (Fritsch–Carlson 單調三次插值，曲線平滑且不會超出相鄰校準點的範圍)
+duty_array() 可以一次換算整個 NumPy 角度陣列 (NumPy 在第一次呼叫時才匯入)
+"""
+
+from array import array
+from bisect import bisect_right
+
+METHODS = ('linear', 'pchip')
+
+
+def pchip_slopes(xs, ys):
+    """Fritsch–Carlson 單調三次插值在每個節點的斜率"""
+    n = len(xs)
+    if n < 2:
+        return [0.0] * n
+    h = [xs[k + 1] - xs[k] for k in range(n - 1)]
+    delta = [(ys[k + 1] - ys[k]) / h[k] for k in range(n - 1)]
+    if n == 2:
+        return [delta[0], delta[0]]
+
+    slopes = [0.0] * n
+    for k in range(1, n - 1):
+        # 兩側斜率異號 (或有一側為 0) 時設為 0，才能保持單調
+        if delta[k - 1] * delta[k] <= 0:
+            continue
+        w1 = 2 * h[k] + h[k - 1]
+        w2 = h[k] + 2 * h[k - 1]
+        slopes[k] = (w1 + w2) / (w1 / delta[k - 1] + w2 / delta[k])
+    slopes[0] = _end_slope(h[0], h[1], delta[0], delta[1])
+    slopes[-1] = _end_slope(h[-1], h[-2], delta[-1], delta[-2])
+    return slopes
+
+
+def _end_slope(h0, h1, delta0, delta1):
+    """端點斜率：三點公式，再限制在不破壞單調的範圍內"""
+    slope = ((2 * h0 + h1) * delta0 - h0 * delta1) / (h0 + h1)
+    if slope * delta0 <= 0:
+        return 0.0
+    if delta0 * delta1 < 0 and abs(slope) > 3 * abs(delta0):
+        return 3 * delta0
+    return slope
+
+
+class CalibrationTable:
+    """角度 -> duty cycle 的密集查表
+
+    points: {角度: duty cycle} 校準點
+    resolution: 查表的角度間隔 (度)
+    method: 'linear' 或 'pchip'
+    超出校準範圍的角度固定在最接近的端點
+    """
+
+    def __init__(self, points, resolution=0.1, method='linear'):
+        if not points:
+            raise ValueError("至少需要一個校準點")
+        if method not in METHODS:
+            raise ValueError(f"method 必須是 {', '.join(METHODS)} 其中之一")
+        self.method = method
+        self.resolution = resolution
+        self.angles = tuple(float(a) for a in sorted(points))
+        self.duties = tuple(float(points[a]) for a in sorted(points))
+        self.slopes = tuple(pchip_slopes(self.angles, self.duties)) if method == 'pchip' else None
+
+        self.start = self.angles[0]
+        self.stop = self.angles[-1]
+        self._scale = 1.0 / resolution
+        size = int(round((self.stop - self.start) * self._scale)) + 1
+        self.table = array('d', (self._evaluate(self.start + i * resolution) for i in range(size)))
+        self._np_table = None
+
+    def __len__(self):
+        return len(self.table)
+
+    def duty(self, angle):
+        """角度對應的 duty cycle"""
+        if angle <= self.start:
+            return self.duties[0]
+        if angle >= self.stop:
+            return self.duties[-1]
+        position = (angle - self.start) * self._scale
+        index = int(position + 0.5)
+        if abs(position - index) < 1e-6:
+            return self.table[index]
+        return self._evaluate(angle)
+
+    __call__ = duty
+
+    def _evaluate(self, angle):
+        """以 bisect 找到 angle 所在的校準區間再插值"""
+        angles = self.angles
+        if angle <= angles[0]:
+            return self.duties[0]
+        if angle >= angles[-1]:
+            return self.duties[-1]
+        k = bisect_right(angles, angle) - 1
+        x0, x1 = angles[k], angles[k + 1]
+        y0, y1 = self.duties[k], self.duties[k + 1]
+        h = x1 - x0
+        t = (angle - x0) / h
+        if self.slopes is None:
+            return y0 + t * (y1 - y0)
+        # 三次 Hermite 基底
+        t2 = t * t
+        t3 = t2 * t
+        return ((2 * t3 - 3 * t2 + 1) * y0 + (t3 - 2 * t2 + t) * h * self.slopes[k]
+                + (-2 * t3 + 3 * t2) * y1 + (t3 - t2) * h * self.slopes[k + 1])
+
+    def duty_array(self, angles):
+        """一次換算整個角度陣列，回傳 float64 NumPy 陣列
+
+        格點上的角度查表，其他角度以 searchsorted 向量化計算同一條插值曲線
+        """
+        import numpy as np
+
+        if self._np_table is None:
+            self._np_table = np.frombuffer(self.table, dtype=np.float64)
+        angles = np.clip(np.asarray(angles, dtype=np.float64), self.start, self.stop)
+        position = (angles - self.start) * self._scale
+        index = np.rint(position).astype(np.intp)
+        result = self._np_table[index]
+
+        off_grid = np.abs(position - index) >= 1e-6
+        if off_grid.any():
+            result[off_grid] = self._evaluate_array(np, angles[off_grid])
+        return result
+
+    def _evaluate_array(self, np, angles):
+        knots = np.array(self.angles)
+        duties = np.array(self.duties)
+        if self.slopes is None:
+            return np.interp(angles, knots, duties)
+        k = np.clip(np.searchsorted(knots, angles, side='right') - 1, 0, len(knots) - 2)
+        slopes = np.array(self.slopes)
+        x0 = knots[k]
+        h = knots[k + 1] - x0
+        t = (angles - x0) / h
+        t2 = t * t
+        t3 = t2 * t
+        return ((2 * t3 - 3 * t2 + 1) * duties[k] + (t3 - 2 * t2 + t) * h * slopes[k]
+                + (-2 * t3 + 3 * t2) * duties[k + 1] + (t3 - t2) * h * slopes[k + 1])
@@ -0,0 +1,253 @@
+"""
+display daemon 的 client
+DisplayClient 與 DualSegmentDriver 有相同的顯示介面，指令先放在緩衝區，
+預設每次呼叫就送出 (不等待回應)；在 batch() 區塊中則累積起來一次送出
+
+open_display() 會先嘗試連線到 daemon，沒有 daemon 時才在本機初始化 GPIO (lazy_display() 則延到第一次顯示)，
+所以有 daemon 時程式完全不需要載入 RPi.GPIO；連線後會向 daemon 查詢接線，與程式指定的腳位不符時拒絕使用
+"""
+
+import socket
+import threading
+from contextlib import contextmanager
+
+from .display_protocol import (DEFAULT_SOCKET, LED_ACTION_CODES, OP_CLEAR, OP_FRAME, OP_LED,
+                               OP_MASK, OP_PIN, OP_SYNC, PIN_NONE, PIN_QUERIES, RECORD,
+                               decode_number, encode, encode_number)
+from .frame_table import FRAME_TABLE
+from .gpio_bank import open_backend
+from .lazy import LazyDevice
+from .pins import wiring_mismatches
+from .segment_driver import DualSegmentDriver, SegmentDisplay, pack_frame, unpack_frame
+
+
+class DisplayClient(SegmentDisplay):
+    """透過 Unix socket 控制 display daemon"""
+
+    def __init__(self, sock):
+        super().__init__()
+        self.sock = sock
+        self.led_level = 0
+        self._frame = 0      # 最後送出的畫面，用來統計改變的段位數
+        self._buffer = bytearray()
+        self._send_lock = threading.RLock()  # LED 排程執行緒與顯示執行緒可能同時送出指令
+        self._batch_depth = 0
+        self._sync_token = 0
+        self.sent_bytes = 0
+        self.sends = 0
+
+    @classmethod
+    def connect(cls, path=DEFAULT_SOCKET, timeout=5.0):
+        """連線到 daemon，daemon 沒有在執行時回傳 None"""
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        try:
+            sock.connect(path)
+        except OSError:
+            sock.close()
+            return None
+        return cls(sock)
+
+    # ---- 送出指令 ----
+
+    def _send(self, record):
+        with self._send_lock:
+            self._buffer += record
+            if self._batch_depth == 0:
+                self.flush()
+
+    def flush(self):
+        """把緩衝區的指令一次送出"""
+        with self._send_lock:
+            if self._buffer:
+                self.sock.sendall(self._buffer)
+                self.sent_bytes += len(self._buffer)
+                self.sends += 1
+                self._buffer.clear()
+
+    @contextmanager
+    def batch(self):
+        """區塊內的指令累積起來，離開區塊時一次送出 (其他執行緒這段期間的指令也會一起累積)"""
+        with self._send_lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._send_lock:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self.flush()
+
+    def _receive(self, count):
+        """讀取 count 筆回應 (呼叫端需持有 _send_lock)"""
+        size = RECORD.size * count
+        reply = b''
+        while len(reply) < size:
+            chunk = self.sock.recv(size - len(reply))
+            if not chunk:
+                raise ConnectionError("display daemon 已關閉連線")
+            reply += chunk
+        return list(RECORD.iter_unpack(reply))
+
+    def sync(self):
+        """等待前面的指令都執行完，回傳這段期間 daemon 拒絕的指令數"""
+        with self._send_lock:
+            self._sync_token = (self._sync_token + 1) & 0xFFFF
+            self._buffer += encode(OP_SYNC, 0, self._sync_token)
+            self.flush()
+            [(op, errors, token)] = self._receive(1)
+        if op != OP_SYNC or token != self._sync_token:
+            raise ConnectionError("display daemon 回應的序號不符")
+        return errors
+
+    def wiring(self):
+        """查詢 daemon 的接線，回傳 (seg_pins_1, seg_pins_2, led_pin)"""
+        with self._send_lock:
+            for code in range(len(PIN_QUERIES)):
+                self._buffer += encode(OP_PIN, code)
+            self.flush()
+            replies = self._receive(len(PIN_QUERIES))
+        pins = {1: {}, 2: {}, None: {}}
+        for code, (op, arg, pin) in enumerate(replies):
+            if op != OP_PIN or arg != code:
+                raise ConnectionError("display daemon 回應的腳位查詢不符")
+            monitor, seg = PIN_QUERIES[code]
+            if pin != PIN_NONE:
+                pins[monitor][seg] = pin
+        return pins[1], pins[2], pins[None].get('led')
+
+    # ---- 顯示介面 ----
+
+    def _apply(self, mask1, mask2):
+        frame = pack_frame(mask1, mask2)
+        self._send(encode(OP_FRAME, 0, frame))
+        changed = frame ^ self._frame
+        self._frame = frame
+        return bin(changed).count('1')
+
+    def show_mask(self, monitor_number, mask):
+        """只更新某一個顯示器 (OP_MASK)，不會覆蓋其他 client 在另一個顯示器上的畫面"""
+        if monitor_number not in (1, 2):
+            return 0
+        mask &= 0xFF
+        with self._lock:
+            self.masks[monitor_number] = mask
+            frame = pack_frame(self.masks[1], self.masks[2])
+            changed = bin(frame ^ self._frame).count('1')
+            self.pin_writes += changed
+            self._frame = frame
+            self._send(encode(OP_MASK, monitor_number, mask))
+        return changed
+
+    def show_number(self, value):
+        """由 daemon 查表顯示數字 (0~99 整數或 "X.Y" 字串)
+
+        影子遮罩以 daemon 使用的同一張 FRAME_TABLE 更新，之後的 show_mask() 才不會以舊畫面為基準
+        """
+        record = encode_number(value)
+        _, arg, number = RECORD.unpack(record)
+        entry = FRAME_TABLE.get(decode_number(arg, number))
+        with self._lock:
+            if entry is not None:  # 查不到的值 daemon 會拒絕，畫面不變
+                self.masks[1], self.masks[2] = unpack_frame(entry.frame)
+                self.pin_writes += bin(entry.frame ^ self._frame).count('1')
+                self._frame = entry.frame
+            self._send(record)
+
+    def set_led(self, level):
+        self.led_level = 1 if level else 0
+        self._send(encode(OP_LED, LED_ACTION_CODES['on' if level else 'off']))
+
+    def play_led(self, name):
+        """由 daemon 播放 LED 閃爍模式 ('correct'、'wrong'、'error'、'fault')"""
+        self.led_level = 0
+        self._send(encode(OP_LED, LED_ACTION_CODES[name]))
+
+    def clear(self):
+        """熄滅所有段位並關閉 LED"""
+        with self._lock:
+            self.masks[1] = self.masks[2] = 0
+            self._frame = 0
+        self.led_level = 0
+        self._send(encode(OP_CLEAR))
+
+    def close(self):
+        """送出剩下的指令並關閉連線 (顯示器由 daemon 繼續管理)"""
+        try:
+            self.flush()
+        finally:
+            self.sock.close()
+
+
+class LocalDisplay(DualSegmentDriver):
+    """沒有 daemon 時直接控制本機 GPIO，介面與 DisplayClient 相同"""
+
+    def __init__(self, gpio, seg_pins_1, seg_pins_2, led_pin=None):
+        self.gpio = gpio
+        self.led_pin = led_pin
+        # 優先透過 /dev/gpiomem 一次寫入整組腳位，無法使用時退回 RPi.GPIO
+        super().__init__(open_backend(gpio), seg_pins_1, seg_pins_2)
+
+    @property
+    def led_level(self):
+        if self.led_pin is None:
+            return 0
+        return self.gpio.input(self.led_pin)
+
+    def set_led(self, level):
+        if self.led_pin is not None:
+            self.gpio.output(self.led_pin, self.gpio.HIGH if level else self.gpio.LOW)
+
+    def clear(self):
+        self.all_off()
+        self.set_led(0)
+
+    def flush(self):
+        pass
+
+    @contextmanager
+    def batch(self):
+        yield self
+
+    def sync(self):
+        return 0
+
+    def close(self):
+        try:
+            self.backend.close()  # 解除 /dev/gpiomem 的映射
+        finally:
+            self.gpio.cleanup()   # 清理 GPIO 狀態
+
+
+def open_display(seg_pins_1, seg_pins_2, led_pin=None, path=DEFAULT_SOCKET):
+    """有 display daemon 時連線到 daemon，否則在本機初始化 GPIO
+
+    daemon 的接線與指定的腳位不符時丟出 RuntimeError (腳位由 daemon 獨佔，指定的腳位不會生效)
+    """
+    client = DisplayClient.connect(path)
+    if client is not None:
+        try:
+            mismatches = wiring_mismatches((seg_pins_1, seg_pins_2, led_pin), client.wiring())
+        except BaseException:
+            client.close()
+            raise
+        if mismatches:
+            client.close()
+            raise RuntimeError(f"display daemon ({path}) 的接線與程式指定的腳位不符: "
+                               + "；".join(mismatches))
+        return client
+
+    import RPi.GPIO as GPIO
+    GPIO.setmode(GPIO.BCM)
+    # 初始化所有段位腳為輸出模式，預設 LOW（共陰極：LOW=熄滅）
+    for pin in list(seg_pins_1.values()) + list(seg_pins_2.values()):
+        GPIO.setup(pin, GPIO.OUT, initial=GPIO.LOW)
+    # 初始化LED為輸出模式
+    if led_pin is not None:
+        GPIO.setup(led_pin, GPIO.OUT, initial=GPIO.LOW)
+    return LocalDisplay(GPIO, seg_pins_1, seg_pins_2, led_pin)
+
+
+def lazy_display(seg_pins_1, seg_pins_2, led_pin=None, path=DEFAULT_SOCKET):
+    """與 open_display() 相同，但等到第一次顯示時才連線或初始化 GPIO"""
+    return LazyDevice(lambda: open_display(seg_pins_1, seg_pins_2, led_pin, path))
@@ -0,0 +1,226 @@
+"""
+七段顯示器 display daemon
+長駐執行並獨佔段位腳與 LED 腳，透過 Unix domain socket 接收 display_protocol 的二進位指令，
+多個程式可以同時連線共用同一組顯示器，client 端不需要初始化 GPIO
+
+用法:
+  python -m rpi_drivers.display_daemon          # 在樹莓派上控制實際的 GPIO
+  python -m rpi_drivers.display_daemon --mock   # 不接硬體，只在記憶體中模擬腳位電位
+"""
+
+import argparse
+import os
+import socketserver
+import threading
+
+from .display_protocol import (DEFAULT_SOCKET, LED_ACTIONS, OP_CLEAR, OP_FRAME, OP_LED,
+                               OP_MASK, OP_NUMBER, OP_PIN, OP_SYNC, PIN_NONE, PIN_QUERIES,
+                               decode_number, encode, iter_records)
+from .frame_table import FRAME_TABLE
+from .gpio_bank import MockGpioBackend, open_backend
+from .led_sequencer import CORRECT_PATTERN, ERROR_PATTERN, FAULT_PATTERN, WRONG_PATTERN, LedSequencer
+from .pins import LED_PIN, SEG_PINS_1, SEG_PINS_2
+from .scheduler import DeadlineScheduler
+from .segment_driver import DualSegmentDriver
+
+LED_PATTERNS = {
+    'correct': CORRECT_PATTERN,
+    'wrong': WRONG_PATTERN,
+    'error': ERROR_PATTERN,
+    'fault': FAULT_PATTERN,
+}
+
+
+class DisplayDaemon:
+    """執行指令的部分，與 socket 無關 (接線預設為 pins.py 的定義)"""
+
+    def __init__(self, backend, seg_pins_1=SEG_PINS_1, seg_pins_2=SEG_PINS_2, led_pin=LED_PIN):
+        self.backend = backend
+        self.wiring = {1: seg_pins_1, 2: seg_pins_2, None: {'led': led_pin}}
+        self.led_pin = led_pin
+        self.display = DualSegmentDriver(backend, seg_pins_1, seg_pins_2)
+        self.scheduler = DeadlineScheduler()
+        self.led = LedSequencer(self.set_led, self.scheduler)
+
+        # 統計
+        self._stats_lock = threading.Lock()
+        self.clients = 0
+        self.batches = 0   # 收到幾次資料 (一次可能包含多個指令)
+        self.commands = 0
+        self.errors = 0
+        self.backend_errors = 0  # 其中寫入硬體失敗 (例如 OSError) 的指令數
+
+    def set_led(self, level):
+        bit = 1 << self.led_pin
+        if level:
+            self.backend.write(bit, 0)
+        else:
+            self.backend.write(0, bit)
+
+    def execute(self, op, arg, value):
+        """執行一個指令，格式錯誤時丟出 ValueError"""
+        if op == OP_FRAME:
+            self.display.show_frame(value)
+        elif op == OP_NUMBER:
+            entry = FRAME_TABLE.get(decode_number(arg, value))
+            if entry is None:
+                raise ValueError(f"無法顯示的數字 (參數 {arg}，值 {value})")
+            self.display.show_frame(entry.frame)
+        elif op == OP_MASK:
+            if arg not in (1, 2) or value > 0xFF:
+                raise ValueError(f"無法顯示的段位遮罩 (顯示器 {arg}，值 {value:#x})")
+            self.display.show_mask(arg, value)
+        elif op == OP_LED:
+            self.led_action(arg)
+        elif op == OP_CLEAR:
+            self.led.stop()
+            self.display.all_off()
+        else:
+            raise ValueError(f"未知的指令 {op:#04x}")
+
+    def pin(self, code):
+        """OP_PIN 查詢：回傳某個段位 (或 LED) 接的 BCM 腳位，沒有接線時回傳 PIN_NONE"""
+        if code >= len(PIN_QUERIES):
+            raise ValueError(f"未知的腳位編號 {code}")
+        monitor, seg = PIN_QUERIES[code]
+        pin = self.wiring[monitor].get(seg)
+        return PIN_NONE if pin is None else pin
+
+    def led_action(self, code):
+        if code >= len(LED_ACTIONS):
+            raise ValueError(f"未知的 LED 動作 {code}")
+        name = LED_ACTIONS[code]
+        if name == 'off':
+            self.led.stop(0)
+        elif name == 'on':
+            self.led.stop(1)
+        else:
+            self.led.play(LED_PATTERNS[name])  # 由排程器播放，不會卡住其他 client
+
+    def count(self, commands, errors, backend_errors=0):
+        with self._stats_lock:
+            self.batches += 1
+            self.commands += commands
+            self.errors += errors
+            self.backend_errors += backend_errors
+
+    def close(self):
+        self.led.stop()
+        self.scheduler.stop()
+        self.display.all_off()
+
+    def report(self):
+        """統計摘要"""
+        per_batch = self.commands / self.batches if self.batches else 0.0
+        return (f"client {self.clients} 個，收到 {self.commands} 個指令 ({self.batches} 批，"
+                f"平均每批 {per_batch:.1f} 個)，錯誤 {self.errors} 個 (硬體 {self.backend_errors} 個)，"
+                f"GPIO 寫入 {self.display.pin_writes} 腳位")
+
+
+class _ClientHandler(socketserver.BaseRequestHandler):
+    """一個 client 連線：收到多少完整指令就依序執行多少，只有 SYNC 與 PIN 需要回應"""
+
+    def handle(self):
+        daemon = self.server.display_daemon
+        with daemon._stats_lock:
+            daemon.clients += 1
+        pending = b''
+        errors = 0
+        while True:
+            data = self.request.recv(4096)
+            if not data:
+                break
+            records, pending = iter_records(pending + data)
+            replies = bytearray()
+            batch_errors = 0
+            backend_errors = 0
+            for op, arg, value in records:
+                if op == OP_SYNC:
+                    # 前面的指令都已經執行完，回報這段期間的錯誤數
+                    replies += encode(OP_SYNC, min(errors, 255), value)
+                    errors = 0
+                    continue
+                if op == OP_PIN:
+                    try:
+                        replies += encode(OP_PIN, arg, daemon.pin(arg))
+                    except ValueError:
+                        replies += encode(OP_PIN, arg, PIN_NONE)
+                    continue
+                try:
+                    daemon.execute(op, arg, value)
+                except ValueError as e:
+                    errors += 1
+                    batch_errors += 1
+                    if self.server.verbose:
+                        print(f"⚠️ {e}")
+                except Exception as e:
+                    # 後端寫入失敗也只算這個指令失敗，連線繼續處理，錯誤數在下一次 SYNC 回報
+                    errors += 1
+                    batch_errors += 1
+                    backend_errors += 1
+                    print(f"❌ 指令 {op:#04x} 執行失敗: {e!r}")
+            daemon.count(len(records), batch_errors, backend_errors)
+            if replies:
+                self.request.sendall(replies)
+
+
+class DisplayServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path, display_daemon, verbose=False):
+        self.display_daemon = display_daemon
+        self.verbose = verbose
+        super().__init__(path, _ClientHandler)
+
+
+def serve(display_daemon, path=DEFAULT_SOCKET, verbose=False):
+    """開始接受連線直到被中斷"""
+    # 上次沒有正常結束時會留下 socket 檔
+    if os.path.exists(path):
+        os.unlink(path)
+    server = DisplayServer(path, display_daemon, verbose)
+    try:
+        print(f"🖥️ display daemon 已啟動: {path}")
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="七段顯示器 display daemon")
+    parser.add_argument('--socket', default=DEFAULT_SOCKET, help=f"Unix socket 路徑 (預設 {DEFAULT_SOCKET})")
+    parser.add_argument('--mock', action='store_true', help="不接硬體，使用模擬的 GPIO 後端")
+    parser.add_argument('--verbose', action='store_true', help="顯示錯誤的指令")
+    return parser.parse_args()
+
+
+# 主程式區塊
+if __name__ == '__main__':
+    args = parse_args()
+    GPIO = None
+    if args.mock:
+        backend = MockGpioBackend()
+    else:
+        import RPi.GPIO as GPIO
+        GPIO.setmode(GPIO.BCM)
+        # 初始化所有段位腳與 LED 為輸出模式，預設 LOW（共陰極：LOW=熄滅）
+        for pin in list(SEG_PINS_1.values()) + list(SEG_PINS_2.values()) + [LED_PIN]:
+            GPIO.setup(pin, GPIO.OUT, initial=GPIO.LOW)
+        backend = open_backend(GPIO)
+
+    display_daemon = DisplayDaemon(backend)
+    try:
+        serve(display_daemon, args.socket, args.verbose)
+
+    # 捕捉 Ctrl+C 中斷，做清理
+    except KeyboardInterrupt:
+        print("\n程式被中斷")
+    finally:
+        display_daemon.close()
+        display_daemon.set_led(0)
+        print(f"📊 {display_daemon.report()}")
+        if GPIO is not None:
+            GPIO.cleanup()   # 清理 GPIO 狀態
+            print("GPIO清理完成")
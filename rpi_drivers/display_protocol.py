@@ -0,0 +1,62 @@
+"""
+display daemon 的二進位協定
+每個指令固定 4 bytes：opcode (1 byte)、參數 (1 byte)、值 (2 bytes, little-endian)
+client 可以把多個指令串在一起一次送出 (batch)，也不需要等待回應 (pipeline)，
+只有 SYNC 與 PIN 會在前面的指令都執行完後回傳一筆同樣格式的回應
+"""
+
+import os
+import struct
+
+from .segment_driver import SEGMENTS
+
+DEFAULT_SOCKET = os.environ.get('SEGMENT_DISPLAY_SOCKET', '/tmp/segment_display.sock')
+
+RECORD = struct.Struct('<BBH')
+
+OP_FRAME = 0x01   # 值：打包好的 16-bit 畫面
+OP_NUMBER = 0x02  # 參數 0：值為整數 0~99；參數 1：值為十分位 (45 → 4.5)
+OP_LED = 0x03     # 參數：LED 動作 (見 LED_ACTIONS)
+OP_CLEAR = 0x04   # 熄滅所有段位並關閉 LED
+OP_SYNC = 0x05    # 值：序號；回應 (OP_SYNC, 上次 SYNC 之後的錯誤數, 序號)
+OP_PIN = 0x06     # 參數：腳位編號 (見 PIN_QUERIES)；回應 (OP_PIN, 參數, BCM 腳位或 PIN_NONE)
+OP_MASK = 0x07    # 參數：顯示器 (1 或 2)；值：段位遮罩，只改變這一個顯示器
+
+NUMBER_INT = 0
+NUMBER_TENTHS = 1
+
+# LED 動作編號，2 之後為 led_sequencer 中的閃爍模式
+LED_ACTIONS = ('off', 'on', 'correct', 'wrong', 'error', 'fault')
+LED_ACTION_CODES = {name: code for code, name in enumerate(LED_ACTIONS)}
+
+# OP_PIN 的參數：0~7 為顯示器 1 的 a~dp，8~15 為顯示器 2 的 a~dp，16 為 LED
+PIN_QUERIES = ([(1, seg) for seg in SEGMENTS] + [(2, seg) for seg in SEGMENTS]
+               + [(None, 'led')])
+PIN_NONE = 0xFFFF  # 沒有接線
+
+
+def encode(op, arg=0, value=0):
+    """編碼一個指令"""
+    return RECORD.pack(op, arg, value)
+
+
+def encode_number(value):
+    """把顯示值 (0~99 整數或 "X.Y" 字串) 編成 OP_NUMBER 指令"""
+    if isinstance(value, int):
+        return encode(OP_NUMBER, NUMBER_INT, value)
+    whole, _, tenth = value.partition('.')
+    return encode(OP_NUMBER, NUMBER_TENTHS, int(whole) * 10 + int(tenth or 0))
+
+
+def decode_number(arg, value):
+    """OP_NUMBER 的參數與值還原成 frame_table 的 key"""
+    if arg == NUMBER_TENTHS:
+        return f"{value // 10}.{value % 10}"
+    return value
+
+
+def iter_records(buffer):
+    """從緩衝區取出所有完整的指令，回傳 (指令列表, 剩下不完整的 bytes)"""
+    size = RECORD.size
+    end = len(buffer) - len(buffer) % size
+    return list(RECORD.iter_unpack(buffer[:end])), buffer[end:]
@@ -0,0 +1,106 @@
+"""
+乘法遊戲的因數對索引
+啟動時一次算好每個可能出現的目標 (整數 00~99、小數 0.0~9.9) 可以由哪些數字相乘得到，
+所有數值都以「十分位整數」表示 (4.5 → 45、12 → 120)，完全不經過浮點數
+
+因數的範圍是顯示器本身能顯示的值：0.1~9.9 與 10~99
+"""
+
+from collections import namedtuple
+from decimal import Decimal, InvalidOperation
+from fractions import Fraction
+import random
+
+# 可以當作因數的值 (十分位)：0.1~9.9 與整數 10~99
+FACTOR_TENTHS = frozenset(range(1, 100)) | frozenset(range(100, 1000, 10))
+
+# 可能出現的目標 (十分位)：小數 0.0~9.9 與整數 00~99 (5.0 與 05 是同一個值)
+TARGET_TENTHS = frozenset(range(0, 100)) | frozenset(range(0, 1000, 10))
+
+# 輸入因數的十進位指數範圍：目標最大 99，太大或太小的因數不可能答對，
+# 也避免 1e999999 這種輸入在乘法時造成 decimal.Overflow
+MAX_EXPONENT = 6
+
+class FactorRangeError(ValueError):
+    """輸入是合法的數字，但超出 10^±MAX_EXPONENT (不可能是答案)"""
+
+
+# pairs: 所有 (a, b) 且 a <= b 的十分位因數對，hints: 不含 1 的因數對 (由小到大)
+FactorEntry = namedtuple('FactorEntry', ['target', 'pairs', 'hints'])
+
+
+def _build_factor_index():
+    """建立目標到因數對的索引"""
+    factors = sorted(FACTOR_TENTHS)
+    index = {}
+    for target in sorted(TARGET_TENTHS):
+        # a/10 × b/10 = target/10  →  a × b = target × 10
+        product = target * 10
+        pairs = []
+        for a in factors:
+            if a * a > product:
+                break
+            if product % a == 0 and product // a in FACTOR_TENTHS:
+                pairs.append((a, product // a))
+        hints = tuple(pair for pair in pairs if 10 not in pair)
+        index[target] = FactorEntry(target, frozenset(pairs), hints)
+    return index
+
+FACTOR_INDEX = _build_factor_index()
+
+
+def format_tenths(tenths):
+    """十分位整數轉成顯示用的文字 (45 → "4.5"、120 → "12")"""
+    if tenths % 10 == 0:
+        return str(tenths // 10)
+    return f"{tenths // 10}.{tenths % 10}"
+
+
+def parse_factor(text):
+    """把輸入的文字轉成精確的 Decimal，不是有限的數字時回傳 None
+
+    數字本身合法但超出 10^±MAX_EXPONENT (例如 1e-7、1e999999) 時丟出 FactorRangeError，
+    與格式錯誤分開回報
+    """
+    try:
+        value = Decimal(text.strip())
+    except InvalidOperation:
+        return None
+    if not value.is_finite():
+        return None
+    if abs(value.adjusted()) > MAX_EXPONENT:
+        raise FactorRangeError(text.strip())
+    return value
+
+
+def _to_tenths(value):
+    """Decimal 剛好是十分位時回傳十分位整數，否則回傳 None"""
+    scaled = value * 10
+    if scaled != scaled.to_integral_value():
+        return None
+    return int(scaled)
+
+
+def is_solvable(target):
+    """目標是否有不含 1 的因數對 (0 任何數乘 0 都成立，視為沒有意義的題目)"""
+    entry = FACTOR_INDEX.get(target)
+    return entry is not None and target != 0 and bool(entry.hints)
+
+
+def check_answer(target, a, b):
+    """a × b 是否剛好等於目標 (target 為十分位整數，a、b 為 Decimal)"""
+    ta, tb = _to_tenths(a), _to_tenths(b)
+    if ta in FACTOR_TENTHS and tb in FACTOR_TENTHS:
+        # 兩個因數都在索引範圍內：查表
+        return (min(ta, tb), max(ta, tb)) in FACTOR_INDEX[target].pairs
+    # 其他寫法 (例如 0.25 × 4) 用分數做精確乘法
+    return Fraction(a) * Fraction(b) * 10 == target
+
+
+def hint(target, rng=random):
+    """隨機挑一組因數對當作提示，沒有時回傳 None"""
+    entry = FACTOR_INDEX.get(target)
+    if entry is None or not entry.hints:
+        return None
+    a, b = rng.choice(entry.hints)
+    return f"{format_tenths(a)} × {format_tenths(b)}"
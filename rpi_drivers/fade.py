@@ -0,0 +1,206 @@
+"""
+PWM LED 漸變引擎
+亮度以「感知亮度」0~1 表示，經過預先算好的查表 (LUT) 轉成 duty cycle：
+  linear:  duty 與亮度成正比 (肉眼看起來低亮度變化太快)
+  gamma:   duty = 亮度 ** 2.2，肉眼看起來是均勻的漸變
+  breathe: 以 sine 週期變化亮度 (呼吸燈)，再經過 gamma 查表
+每個 tick 依 time.monotonic() 經過的時間插值，而不是固定步數，
+所以 tick 延遲不會讓漸變變慢；所有通道共用同一個計時執行緒
+"""
+
+import math
+import threading
+import time
+
+from .ticker import Ticker
+
+CURVES = ('linear', 'gamma', 'breathe')
+
+LUT_SIZE = 1024
+GAMMA = 2.2
+
+
+def build_gamma_lut(gamma=GAMMA, size=LUT_SIZE, max_duty=100.0):
+    """感知亮度 (索引 0 ~ size-1) 對應的 duty cycle (0 ~ max_duty)"""
+    return tuple(max_duty * (i / (size - 1)) ** gamma for i in range(size))
+
+
+def build_breathe_lut(gamma=GAMMA, size=LUT_SIZE, max_duty=100.0):
+    """一個呼吸週期 (相位 0 ~ size-1) 對應的 duty cycle，亮度 (1 - cos) / 2 再經過 gamma"""
+    return tuple(max_duty * ((1 - math.cos(2 * math.pi * i / size)) / 2) ** gamma
+                 for i in range(size))
+
+# 啟動時算好，tick 中只需要查表
+LUTS = {
+    'linear': build_gamma_lut(1.0),
+    'gamma': build_gamma_lut(GAMMA),
+}
+BREATHE_LUT = build_breathe_lut()
+
+
+class FadeChannel:
+    """一個 PWM 通道，pwm 需要提供 ChangeDutyCycle(duty) (RPi.GPIO 的 PWM 物件)"""
+
+    def __init__(self, name, pwm):
+        self.name = name
+        self.pwm = pwm
+        self.level = 0.0      # 目前的感知亮度
+        self.duty = None      # 最後寫入的 duty cycle
+        self._mode = 'hold'
+        self._curve = 'gamma'
+        self._start = 0.0
+        self._from = 0.0
+        self._to = 0.0
+        self._duration = 0.0
+        # fade_to / wave / set 與計時執行緒的 update 以這把鎖交換參數，
+        # 每次切換模式 _generation 加一，update 只在參數沒被換掉時才把 fade 結束為 hold
+        self._lock = threading.Lock()
+        self._generation = 0
+
+        # 統計
+        self.updates = 0
+        self.writes = 0       # 實際呼叫 ChangeDutyCycle 的次數 (duty 沒變就不寫)
+        self.cpu_ns = 0
+
+    def fade_to(self, level, duration, curve='gamma'):
+        """在 duration 秒內從目前亮度漸變到 level"""
+        self._set_mode('fade', curve, duration, self.level, min(1.0, max(0.0, level)))
+
+    def wave(self, period, curve='breathe', phase=0.0):
+        """週期性明暗變化：breathe 為 sine，linear / gamma 為三角波；phase (0~1) 為起始相位"""
+        self._set_mode('wave', curve, period, 0.0, 1.0, offset=phase * period)
+
+    def set(self, level, curve='gamma'):
+        """立即設定亮度"""
+        self._set_mode('hold', curve, 0.0, level, min(1.0, max(0.0, level)))
+
+    def _set_mode(self, mode, curve, duration, start_level, target, offset=0.0):
+        if curve not in CURVES:
+            raise ValueError(f"curve 必須是 {', '.join(CURVES)} 其中之一")
+        with self._lock:
+            self._curve = curve
+            self._from = start_level
+            self._to = target
+            self._duration = duration
+            self._start = time.monotonic() - offset
+            self._mode = mode
+            self._generation += 1
+
+    @property
+    def idle(self):
+        """漸變是否已經完成 (wave 永遠不會完成)"""
+        return self._mode == 'hold'
+
+    def update(self, now):
+        """依經過的時間計算亮度並寫入 PWM"""
+        with self._lock:
+            mode, curve, generation = self._mode, self._curve, self._generation
+            start, duration, level_from, level_to = self._start, self._duration, self._from, self._to
+        elapsed = now - start
+        if mode == 'wave':
+            phase = (elapsed / duration) % 1.0 if duration > 0 else 0.0
+            if curve == 'breathe':
+                self.level = (1 - math.cos(2 * math.pi * phase)) / 2
+                self._write(BREATHE_LUT[int(phase * LUT_SIZE) % LUT_SIZE])
+                return
+            level = 1 - abs(2 * phase - 1)  # 三角波 0 → 1 → 0
+        elif mode == 'fade':
+            progress = elapsed / duration if duration > 0 else 1.0
+            if progress >= 1.0:
+                progress = 1.0
+                with self._lock:
+                    # 計算期間有新的 fade_to / wave 時不能把它蓋掉
+                    if self._generation == generation:
+                        self._mode = 'hold'
+            level = level_from + (level_to - level_from) * progress
+        else:
+            level = level_to
+
+        self.level = level
+        lut = LUTS['linear'] if curve == 'linear' else LUTS['gamma']
+        self._write(lut[int(level * (LUT_SIZE - 1) + 0.5)])
+
+    def _write(self, duty):
+        self.updates += 1
+        if duty != self.duty:
+            self.pwm.ChangeDutyCycle(duty)
+            self.duty = duty
+            self.writes += 1
+
+
+class FadeEngine:
+    """以單一執行緒、固定 tick 頻率更新所有通道"""
+
+    def __init__(self, tick_hz=100):
+        self.tick_hz = tick_hz
+        self.channels = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.ticker = None
+        self.started = None
+        self.stopped = None
+        self.cpu_start = None
+        self.cpu_end = None
+
+    def add_channel(self, name, pwm):
+        """加入一個 PWM 通道，回傳 FadeChannel"""
+        channel = FadeChannel(name, pwm)
+        with self._lock:
+            self.channels = self.channels + [channel]  # 計時執行緒讀到的列表不會被修改
+        return channel
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def wait_idle(self, timeout=None):
+        """等待所有漸變完成，stop 或逾時回傳 False"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not all(channel.idle for channel in self.channels):
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            if self._stop.wait(1.0 / self.tick_hz):
+                return False
+        return True
+
+    def _run(self):
+        self.ticker = Ticker(1.0 / self.tick_hz)
+        self.started = time.monotonic()
+        self.cpu_start = time.process_time()
+        while self.ticker.wait(stop_event=self._stop) is not None:
+            now = time.monotonic()
+            for channel in self.channels:
+                cpu = time.thread_time_ns()
+                channel.update(now)
+                channel.cpu_ns += time.thread_time_ns() - cpu
+        self.stopped = time.monotonic()
+        self.cpu_end = time.process_time()
+
+    def report(self):
+        """每個通道的更新次數與 CPU 成本
+
+        計時執行緒的 CPU 以 thread_time 分別記在每個通道上；
+        行程 CPU (process_time) 另外包含 RPi.GPIO 軟體 PWM 的執行緒，會隨 PWM 頻率增加
+        """
+        elapsed = (self.stopped or time.monotonic()) - (self.started or time.monotonic())
+        lines = [f"tick {self.tick_hz:g} Hz，{self.ticker.report() if self.ticker else '尚未開始'}"]
+        for channel in self.channels:
+            per_update = channel.cpu_ns / channel.updates / 1000 if channel.updates else 0.0
+            share = channel.cpu_ns / 1e9 / elapsed * 100 if elapsed > 0 else 0.0
+            lines.append(f"  {channel.name}: 更新 {channel.updates} 次，寫入 {channel.writes} 次，"
+                         f"每次更新 {per_update:.1f} µs CPU ({share:.3f}% CPU)")
+        if self.cpu_start is not None and elapsed > 0 and self.channels:
+            process_cpu = (self.cpu_end or time.process_time()) - self.cpu_start
+            percent = process_cpu / elapsed * 100
+            lines.append(f"  行程 CPU {percent:.1f}% (含軟體 PWM)，平均每通道 {percent / len(self.channels):.1f}%")
+        return "\n".join(lines)
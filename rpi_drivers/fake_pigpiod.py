@@ -0,0 +1,345 @@
+"""
+pigpiod 的本機替身
+以 pigpio 的 socket 協定 (每個命令 16 bytes: cmd, p1, p2, p3，回應 16 bytes 最後 4 bytes 為結果)
+回應 pigpio.pi() 與 gpiozero PiGPIOFactory 用到的命令，沒有 Pi 也能測試 pigpio 後端：
+  HWVER 回傳真實的板子版本 (預設 0xc03111 = Pi 4B 4GB)，gpiozero 才查得到腳位資訊
+  SERVO / PWM / HP 設定的輸出由產生器執行緒依理想時間 (tick) 切換電位，模擬 DMA 硬體計時
+  loopback={輸出腳: 輸入腳} 把輸出接回輸入，透過通知 socket 送出 12 bytes 的電位變化報告
+
+用法: python -m rpi_drivers.fake_pigpiod --port 8888 --loopback 18:23
+"""
+
+import argparse
+import heapq
+import socketserver
+import struct
+import threading
+import time
+
+DEFAULT_HW_REVISION = 0xC03111
+PIGPIO_VERSION = 79
+
+COMMAND = struct.Struct('IIII')
+REPORT = struct.Struct('HHII')  # seqno, flags, tick, level (bank 1 電位)
+
+# pigpio 命令編號
+CMD_MODES = 0
+CMD_MODEG = 1
+CMD_PUD = 2
+CMD_READ = 3
+CMD_WRITE = 4
+CMD_PWM = 5
+CMD_PRS = 6
+CMD_PFS = 7
+CMD_SERVO = 8
+CMD_BR1 = 10
+CMD_TICK = 16
+CMD_HWVER = 17
+CMD_NB = 19
+CMD_NP = 20
+CMD_NC = 21
+CMD_PRG = 22
+CMD_PFG = 23
+CMD_PRRG = 24
+CMD_PIGPV = 26
+CMD_GDC = 83
+CMD_GPW = 84
+CMD_HP = 86
+CMD_NOIB = 99
+
+PI_BAD_GPIO = -3
+OUTPUT = 1
+DEFAULT_RANGE = 255
+DEFAULT_FREQUENCY = 800
+SERVO_FREQUENCY = 50
+HARDWARE_PWM_RANGE = 1_000_000
+
+
+class FakePigpiod:
+    """在本機 TCP port 上假裝自己是 pigpiod"""
+
+    def __init__(self, host='127.0.0.1', port=0, hw_revision=DEFAULT_HW_REVISION, loopback=None):
+        self.host = host
+        self.port = port
+        self.hw_revision = hw_revision
+        self.loopback = dict(loopback or {})
+        self.levels = 0
+        self.modes = {}
+        self.servo = {}       # 腳位 -> 脈衝寬度 µs
+        self.pwm = {}         # 腳位 -> [duty, range, frequency]
+        self.hardware = {}    # 腳位 -> (frequency, duty 0~1000000)
+        self.commands = 0
+        self._start = time.monotonic()
+        self._lock = threading.RLock()
+        self._wake = threading.Condition(self._lock)
+        self._notifiers = {}  # handle -> [socket, 監看的 bits, seqno]
+        self._next_handle = 0
+        self._server = None
+        self._threads = []
+        self._running = False
+        self._generation = 0  # 每次輸出設定改變都會遞增，讓產生器重新排程
+
+    # 伺服器
+    def start(self):
+        """開始接受連線，回傳實際的 port"""
+        daemon = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                daemon._serve(self.request)
+
+        class Server(socketserver.ThreadingTCPServer):
+            allow_reuse_address = True
+            daemon_threads = True
+
+        self._server = Server((self.host, self.port), Handler)
+        self.port = self._server.server_address[1]
+        self._running = True
+        self._threads = [threading.Thread(target=self._server.serve_forever, daemon=True),
+                         threading.Thread(target=self._generate, daemon=True)]
+        for thread in self._threads:
+            thread.start()
+        return self.port
+
+    def stop(self):
+        with self._lock:
+            self._running = False
+            self._wake.notify_all()
+            for notifier in self._notifiers.values():
+                try:
+                    notifier[0].close()
+                except OSError:
+                    pass
+            self._notifiers.clear()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        for thread in self._threads:
+            thread.join(1)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def tick(self):
+        """pigpio 的 tick：開機後的微秒數，32-bit 循環"""
+        return int((time.monotonic() - self._start) * 1e6) & 0xFFFFFFFF
+
+    def _serve(self, sock):
+        buffer = b''
+        while self._running:
+            try:
+                data = sock.recv(4096)
+            except OSError:
+                return
+            if not data:
+                return
+            buffer += data
+            while len(buffer) >= COMMAND.size:
+                cmd, p1, p2, p3 = COMMAND.unpack_from(buffer)
+                if len(buffer) < COMMAND.size + p3:
+                    break
+                extension = buffer[COMMAND.size:COMMAND.size + p3]
+                buffer = buffer[COMMAND.size + p3:]
+                result = self.execute(cmd, p1, p2, extension, sock)
+                try:
+                    sock.sendall(COMMAND.pack(cmd, p1, p2, result & 0xFFFFFFFF))
+                except OSError:
+                    return
+
+    # 命令
+    def execute(self, cmd, p1, p2, extension=b'', sock=None):
+        """執行一個命令，回傳結果 (負數為錯誤碼)"""
+        with self._lock:
+            self.commands += 1
+            if cmd == CMD_HWVER:
+                return self.hw_revision
+            if cmd == CMD_PIGPV:
+                return PIGPIO_VERSION
+            if cmd == CMD_TICK:
+                return self.tick()
+            if cmd == CMD_BR1:
+                return self.levels
+            if cmd == CMD_NOIB:
+                self._next_handle += 1
+                self._notifiers[self._next_handle] = [sock, 0, 0]
+                return self._next_handle
+            if cmd == CMD_NB:
+                if p1 in self._notifiers:
+                    self._notifiers[p1][1] = p2
+                return 0
+            if cmd in (CMD_NC, CMD_NP):
+                self._notifiers.pop(p1, None)
+                return 0
+            if p1 > 53:
+                return PI_BAD_GPIO
+            if cmd == CMD_MODES:
+                self.modes[p1] = p2
+                return 0
+            if cmd == CMD_MODEG:
+                return self.modes.get(p1, 0)
+            if cmd == CMD_READ:
+                return (self.levels >> p1) & 1
+            if cmd == CMD_WRITE:
+                self.modes[p1] = OUTPUT
+                self._stop_output(p1)
+                self._set_level(p1, p2, self.tick())
+                return 0
+            if cmd == CMD_SERVO:
+                self.modes[p1] = OUTPUT
+                self._stop_output(p1)
+                if p2:
+                    self.servo[p1] = p2
+                else:
+                    self._set_level(p1, 0, self.tick())
+                self._reschedule()
+                return 0
+            if cmd == CMD_PWM:
+                self.modes[p1] = OUTPUT
+                self.servo.pop(p1, None)
+                self.hardware.pop(p1, None)
+                self._pwm(p1)[0] = p2
+                if not p2:
+                    self._set_level(p1, 0, self.tick())
+                self._reschedule()
+                return 0
+            if cmd == CMD_PRS:
+                self._pwm(p1)[1] = p2
+                self._reschedule()
+                return p2
+            if cmd == CMD_PFS:
+                self._pwm(p1)[2] = p2
+                self._reschedule()
+                return p2
+            if cmd in (CMD_PRG, CMD_PRRG):
+                return self._pwm(p1)[1]
+            if cmd == CMD_PFG:
+                if p1 in self.servo:
+                    return SERVO_FREQUENCY
+                return self._pwm(p1)[2]
+            if cmd == CMD_GDC:
+                return self._pwm(p1)[0]
+            if cmd == CMD_GPW:
+                return self.servo.get(p1, 0)
+            if cmd == CMD_HP:
+                duty = struct.unpack('I', extension[:4])[0] if len(extension) >= 4 else 0
+                self.modes[p1] = OUTPUT
+                self._stop_output(p1)
+                if p2 and duty:
+                    self.hardware[p1] = (p2, duty)
+                else:
+                    self._set_level(p1, 0, self.tick())
+                self._reschedule()
+                return 0
+            # 其他命令 (glitch filter、pull up/down 等) 接受但不模擬
+            return 0
+
+    def _pwm(self, gpio):
+        return self.pwm.setdefault(gpio, [0, DEFAULT_RANGE, DEFAULT_FREQUENCY])
+
+    def _stop_output(self, gpio):
+        self.servo.pop(gpio, None)
+        self.hardware.pop(gpio, None)
+        if gpio in self.pwm:
+            self.pwm[gpio][0] = 0
+
+    # 電位與通知
+    def _set_level(self, gpio, level, tick):
+        mask = 1 << gpio
+        target = self.loopback.get(gpio)
+        if target is not None:
+            mask |= 1 << target
+        levels = (self.levels | mask) if level else (self.levels & ~mask)
+        if levels == self.levels:
+            return
+        changed = levels ^ self.levels
+        self.levels = levels
+        for handle, notifier in list(self._notifiers.items()):
+            sock, bits, seqno = notifier
+            if sock is None or not bits & changed:
+                continue
+            notifier[2] = (seqno + 1) & 0xFFFF
+            try:
+                sock.sendall(REPORT.pack(seqno, 0, tick & 0xFFFFFFFF, levels & 0xFFFFFFFF))
+            except OSError:
+                self._notifiers.pop(handle, None)
+
+    def _reschedule(self):
+        self._generation += 1
+        self._wake.notify_all()
+
+    def _waveforms(self):
+        """目前有輸出的腳位：[(腳位, 週期 µs, 高電位 µs)]"""
+        waves = []
+        for gpio, width in self.servo.items():
+            waves.append((gpio, 1e6 / SERVO_FREQUENCY, width))
+        for gpio, (duty, range_, frequency) in self.pwm.items():
+            if duty and frequency:
+                waves.append((gpio, 1e6 / frequency, 1e6 / frequency * min(duty, range_) / range_))
+        for gpio, (frequency, duty) in self.hardware.items():
+            waves.append((gpio, 1e6 / frequency, 1e6 / frequency * duty / HARDWARE_PWM_RANGE))
+        return waves
+
+    def _generate(self):
+        """依理想時間切換所有輸出的電位；回報的 tick 是排程時間，不受執行緒延遲影響"""
+        with self._lock:
+            while self._running:
+                generation = self._generation
+                now_us = (time.monotonic() - self._start) * 1e6
+                events = []
+                for gpio, period, high in self._waveforms():
+                    if 0 < high < period:
+                        heapq.heappush(events, (now_us, gpio, 1, period, high))
+                    else:
+                        self._set_level(gpio, int(high >= period), int(now_us))  # 0% 或 100%
+                if not events:
+                    self._wake.wait()
+                    continue
+                while self._running and generation == self._generation:
+                    at_us, gpio, level, period, high = events[0]
+                    delay = self._start + at_us / 1e6 - time.monotonic()
+                    if delay > 0:
+                        self._wake.wait(delay)
+                        continue
+                    heapq.heapreplace(events, (at_us + (high if level else period - high),
+                                               gpio, 1 - level, period, high))
+                    self._set_level(gpio, level, int(at_us))
+
+
+def parse_loopback(text):
+    """把 '18:23,12:24' 轉成 {18: 23, 12: 24}"""
+    pairs = {}
+    for item in filter(None, text.split(',')):
+        out_pin, in_pin = item.split(':')
+        pairs[int(out_pin)] = int(in_pin)
+    return pairs
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="pigpiod 的本機替身")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8888, help="監聽的 port (預設 8888，和 pigpiod 相同)")
+    parser.add_argument('--hw-revision', type=lambda s: int(s, 0), default=DEFAULT_HW_REVISION,
+                        help="HWVER 回傳的板子版本 (預設 0xc03111)")
+    parser.add_argument('--loopback', type=parse_loopback, default={}, help="輸出接回輸入，例如 18:23")
+    return parser.parse_args()
+
+
+# 主程式區塊
+if __name__ == '__main__':
+    args = parse_args()
+    fake = FakePigpiod(args.host, args.port, args.hw_revision, args.loopback)
+    port = fake.start()
+    print(f"🧪 假 pigpiod 在 {args.host}:{port} (HWVER {args.hw_revision:#x})，按 Ctrl+C 停止")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("\n程式被中斷")
+    finally:
+        fake.stop()
+        print(f"📊 共處理 {fake.commands} 個命令")
@@ -0,0 +1,104 @@
+"""
+預先編譯好的兩位數顯示畫面表
+啟動時一次算好每個可顯示的值 (0~99 整數、"0.1"~"9.9" 小數) 對應的 16-bit 畫面，
+顯示數字只需要一次查表加一次畫面寫入；範圍外的格式 (負數、十六進位等) 走 LRU 快取
+"""
+
+from collections import namedtuple
+from decimal import Decimal
+from functools import lru_cache
+
+from .segment_driver import CHAR_MASKS, DIGIT_MASKS, DP_BIT, pack_frame
+
+# value: 標準化後的值 (整數或 "X.Y" 字串)，frame: 打包好的畫面，text: 顯示的文字
+DisplayEntry = namedtuple('DisplayEntry', ['value', 'frame', 'text'])
+
+
+def _build_frame_table():
+    """建立所有合法輸入到畫面的對照表"""
+    table = {}
+
+    # 整數 0~99：個位數只在右邊顯示器顯示，左邊保持關閉
+    for n in range(100):
+        mask1 = DIGIT_MASKS[n // 10] if n >= 10 else 0
+        entry = DisplayEntry(n, pack_frame(mask1, DIGIT_MASKS[n % 10]), str(n))
+        table[n] = entry
+        table[str(n)] = entry
+
+    # 小數 0.1~9.9：左邊顯示整數部分並點亮小數點，右邊顯示小數第一位
+    for tenths in range(1, 100):
+        text = f"{tenths // 10}.{tenths % 10}"
+        frame = pack_frame(DIGIT_MASKS[tenths // 10] | DP_BIT, DIGIT_MASKS[tenths % 10])
+        table[text] = DisplayEntry(text, frame, text)
+
+    return table
+
+FRAME_TABLE = _build_frame_table()
+
+
+def _normalize(user_input):
+    """表中查不到的寫法 (例如 "07"、"+5"、"3.50") 換算成標準的表格 key"""
+    if not isinstance(user_input, str):
+        return None
+    try:
+        if '.' in user_input:
+            # 小數只取到第一位，與原本的顯示方式相同
+            num = Decimal(user_input)
+            if not Decimal('0.1') <= num <= Decimal('9.9'):
+                return None
+            tenths = int(num * 10)
+            return f"{tenths // 10}.{tenths % 10}"
+        num = int(user_input)
+        return num if 0 <= num <= 99 else None
+    except (ValueError, ArithmeticError):
+        return None
+
+
+def lookup_display_value(user_input):
+    """查表取得 DisplayEntry，不是合法的顯示值時回傳 None"""
+    try:
+        entry = FRAME_TABLE.get(user_input)
+    except TypeError:  # 無法雜湊的型別
+        return None
+    if entry is not None:
+        return entry
+    key = _normalize(user_input)
+    if key is None:
+        return None
+    return FRAME_TABLE[key]
+
+
+@lru_cache(maxsize=256)
+def render_text(text):
+    """把最多兩個字元的文字 (左邊可帶小數點) 轉成畫面，例如 "-5"、"Ab"、"E." """
+    masks = []
+    for ch in text:
+        if ch == '.':
+            # 只有左邊顯示器有小數點
+            if len(masks) != 1 or masks[0] & DP_BIT:
+                raise ValueError(f"{text!r} 無法在兩位數顯示器上顯示")
+            masks[0] |= DP_BIT
+        elif ch in CHAR_MASKS:
+            masks.append(CHAR_MASKS[ch])
+        else:
+            raise ValueError(f"無法顯示的字元: {ch!r}")
+
+    if not masks or len(masks) > 2:
+        raise ValueError(f"{text!r} 無法在兩位數顯示器上顯示")
+    if len(masks) == 1:
+        masks.insert(0, 0)  # 一個字元靠右顯示
+    return pack_frame(masks[0], masks[1])
+
+
+@lru_cache(maxsize=256)
+def format_frame(value, fmt=''):
+    """範圍外的值先格式化再轉成畫面，例如 format_frame(-5)、format_frame(171, 'X')"""
+    return render_text(format(value, fmt))
+
+
+def frame_for(value):
+    """任意值的畫面：先查預先編譯的表，查不到再走 LRU 快取"""
+    entry = lookup_display_value(value)
+    if entry is not None:
+        return entry.frame
+    return format_frame(value)
@@ -0,0 +1,98 @@
+"""
+兩位數七段顯示器的雙緩衝 framebuffer
+寫入端先填 back buffer，flip() 把完整的一幀寫到硬體後再發佈為 front frame
+讀取端只讀 front 這一個屬性 (單一參考的讀取是原子的)，不需要上鎖
+"""
+
+import threading
+import time
+from collections import namedtuple
+
+from .segment_driver import DIGIT_MASKS, DP_BIT, unpack_frame
+
+# 段位遮罩反查數字 (flip_frame 用)，不是數字的遮罩查不到就當作 None
+MASK_DIGITS = {mask: n for n, mask in DIGIT_MASKS.items()}
+
+# 已經顯示在硬體上的一幀 (不可變)
+# seq: 第幾幀，shown_ns: 寫入硬體完成的 perf_counter_ns
+Frame = namedtuple('Frame', ['seq', 'digit1', 'digit2', 'dp', 'mask1', 'mask2', 'shown_ns'])
+
+
+class FrameBuffer:
+    """雙緩衝 framebuffer，driver 為 DualSegmentDriver"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self._back = [None, None, False]  # digit1, digit2, dp (只有第一個顯示器有小數點)
+        self._front = Frame(0, None, None, False, 0, 0, time.perf_counter_ns())
+        self._previous = None  # 上一個 front frame，freeze(at_ns) 回溯用
+        # 只有寫入端 (flip / freeze) 會用到這把鎖，確保硬體與 front frame 一致
+        self._write_lock = threading.Lock()
+        self.frozen = False
+
+    @property
+    def front(self):
+        """最後一次 flip 的完整畫面，也就是目前實際顯示的內容"""
+        return self._front
+
+    def draw(self, digit1, digit2, dp=False):
+        """填入 back buffer，digit 為 None 表示該顯示器熄滅"""
+        self._back[0] = digit1
+        self._back[1] = digit2
+        self._back[2] = dp
+
+    def draw_digit(self, monitor_number, n, dp=False):
+        """只更新 back buffer 中某一個顯示器"""
+        if monitor_number == 1:
+            self._back[0] = n
+            self._back[2] = dp
+        elif monitor_number == 2:
+            self._back[1] = n
+
+    def flip(self):
+        """把 back buffer 一次寫到硬體並發佈，凍結時不更新並回傳 None"""
+        digit1, digit2, dp = self._back
+        mask1 = DIGIT_MASKS.get(digit1, 0) | (DP_BIT if dp else 0)
+        mask2 = DIGIT_MASKS.get(digit2, 0)
+        return self._publish(digit1, digit2, dp, mask1, mask2)
+
+    def flip_frame(self, frame):
+        """直接顯示打包好的 16-bit 畫面 (略過 back buffer)，凍結時回傳 None"""
+        mask1, mask2 = unpack_frame(frame)
+        return self._publish(MASK_DIGITS.get(mask1 & ~DP_BIT), MASK_DIGITS.get(mask2),
+                             mask1 & DP_BIT, mask1, mask2)
+
+    def _publish(self, digit1, digit2, dp, mask1, mask2):
+        with self._write_lock:
+            if self.frozen:
+                return None
+            self.driver.write_masks(mask1, mask2)
+            frame = Frame(self._front.seq + 1, digit1, digit2, bool(dp),
+                          mask1, mask2, time.perf_counter_ns())
+            self._previous = self._front
+            self._front = frame
+        return frame
+
+    def freeze(self, at_ns=None):
+        """停止接受新的 flip，回傳凍結當下正在顯示的畫面
+
+        at_ns: 觸發凍結的事件時間 (perf_counter_ns)。如果事件發生之後、凍結之前剛好又 flip 了一幀，
+        就把硬體恢復成事件當時顯示的上一幀，確保凍結的畫面就是使用者按下時看到的畫面
+        (上一幀是還沒 flip 過的初始空白畫面時不回溯，使用者按下時看到的就是這一幀)
+        """
+        with self._write_lock:
+            self.frozen = True
+            frame = self._front
+            previous = self._previous
+            if (at_ns is not None and frame.shown_ns > at_ns
+                    and previous is not None and previous.seq > 0):
+                self.driver.write_masks(previous.mask1, previous.mask2)
+                self._front = previous
+                self._previous = None
+            return self._front
+
+    def unfreeze(self):
+        """恢復接受 flip"""
+        with self._write_lock:
+            self.frozen = False
+            self._previous = None
@@ -0,0 +1,153 @@
+"""
+GPIO 批次寫入後端
+遮罩以 BCM 腳位編號為 bit (bit n = GPIO n)，write() 一律先清除再設定
+
+GpioMemBank:     透過 /dev/gpiomem 直接寫 GPSET0 / GPCLR0，一次操作整組腳位
+FakeGpioMemBank: 以一般檔案模擬暫存器映射，沒有 Pi 也能測試
+RPiGPIOBackend:  備援方案，逐一呼叫 RPi.GPIO 的 GPIO.output
+MockGpioBackend: 不接任何硬體，只在記憶體中記錄電位
+"""
+
+import mmap
+import os
+import threading
+
+GPIO_BLOCK_SIZE = 4096
+
+# BCM2835 / BCM2711 GPIO 暫存器位移 (bytes)
+GPFSEL0 = 0x00  # 功能選擇，每個腳位 3 bits，每個暫存器 10 個腳位
+GPSET0 = 0x1C   # 寫 1 的腳位設為 HIGH
+GPCLR0 = 0x28   # 寫 1 的腳位設為 LOW
+GPLEV0 = 0x34   # 目前腳位電位 (唯讀)
+
+FSEL_OUTPUT = 0b001
+
+
+def iter_pins(mask):
+    """依序取出遮罩中為 1 的腳位編號"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class GpioMemBank:
+    """透過記憶體映射的 /dev/gpiomem 直接存取 GPIO 暫存器"""
+
+    def __init__(self, path='/dev/gpiomem'):
+        self.path = path
+        self._fd = os.open(path, os.O_RDWR | os.O_SYNC)
+        try:
+            self._mem = mmap.mmap(self._fd, GPIO_BLOCK_SIZE, mmap.MAP_SHARED,
+                                  mmap.PROT_READ | mmap.PROT_WRITE)
+        except OSError:
+            os.close(self._fd)
+            raise
+        # 以 32-bit 為單位存取，每次寫入都是一次完整的暫存器寫入
+        self._regs = memoryview(self._mem).cast('I')
+        self.writes = 0
+
+    def read_register(self, offset):
+        """讀取暫存器"""
+        return self._regs[offset // 4]
+
+    def write_register(self, offset, value):
+        """寫入暫存器"""
+        self._regs[offset // 4] = value & 0xFFFFFFFF
+
+    def setup_outputs(self, pins):
+        """把腳位設成輸出模式 (沒有 RPi.GPIO 時使用)"""
+        for pin in pins:
+            offset = GPFSEL0 + 4 * (pin // 10)
+            shift = 3 * (pin % 10)
+            value = self.read_register(offset) & ~(0b111 << shift)
+            self.write_register(offset, value | (FSEL_OUTPUT << shift))
+
+    def write(self, set_mask, clear_mask):
+        """一次清除 / 設定整組腳位，最多兩次暫存器寫入"""
+        if clear_mask:
+            self.write_register(GPCLR0, clear_mask)
+            self.writes += 1
+        if set_mask:
+            self.write_register(GPSET0, set_mask)
+            self.writes += 1
+
+    def read_levels(self):
+        """讀取 GPIO 0~31 目前的電位"""
+        return self.read_register(GPLEV0)
+
+    def close(self):
+        """解除映射"""
+        if self._mem is None:
+            return
+        self._regs.release()
+        self._mem.close()
+        os.close(self._fd)
+        self._mem = None
+
+
+class FakeGpioMemBank(GpioMemBank):
+    """以檔案模擬的暫存器映射，寫入 GPSET0 / GPCLR0 時同步更新 GPLEV0"""
+
+    def __init__(self, path):
+        # 確保檔案大小足夠映射一整個暫存器區塊
+        with open(path, 'ab') as f:
+            if f.tell() < GPIO_BLOCK_SIZE:
+                f.truncate(GPIO_BLOCK_SIZE)
+        super().__init__(path)
+
+    def write(self, set_mask, clear_mask):
+        super().write(set_mask, clear_mask)
+        levels = self.read_register(GPLEV0)
+        self.write_register(GPLEV0, (levels & ~clear_mask) | set_mask)
+
+
+class RPiGPIOBackend:
+    """備援後端：逐一呼叫 GPIO.output"""
+
+    def __init__(self, gpio):
+        self.gpio = gpio
+        self.writes = 0
+
+    def write(self, set_mask, clear_mask):
+        for pin in iter_pins(clear_mask):
+            self.gpio.output(pin, self.gpio.LOW)
+            self.writes += 1
+        for pin in iter_pins(set_mask):
+            self.gpio.output(pin, self.gpio.HIGH)
+            self.writes += 1
+
+    def close(self):
+        pass
+
+
+class MockGpioBackend:
+    """模擬後端：只記錄電位與寫入次數，離開樹莓派也能執行 display daemon"""
+
+    def __init__(self):
+        self.levels = 0
+        self.writes = 0
+        self._lock = threading.Lock()  # 段位與 LED 可能由不同執行緒寫入
+
+    def setup_outputs(self, pins):
+        pass
+
+    def write(self, set_mask, clear_mask):
+        with self._lock:
+            self.levels = (self.levels & ~clear_mask) | set_mask
+            self.writes += 1
+
+    def read_levels(self):
+        return self.levels
+
+    def close(self):
+        pass
+
+
+def open_backend(gpio, path='/dev/gpiomem'):
+    """優先使用 /dev/gpiomem 批次寫入，無法開啟時改用 RPi.GPIO"""
+    try:
+        return GpioMemBank(path)
+    except OSError as e:
+        print(f"⚠️ 無法開啟 {path} ({e})，改用 RPi.GPIO 逐腳位寫入")
+        return RPiGPIOBackend(gpio)
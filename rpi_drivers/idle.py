@@ -0,0 +1,157 @@
+"""
+伺服馬達閒置時停止送脈衝
+到達位置後，軟體 PWM 還是一直在產生脈衝：持續耗用 CPU，SG90 也會在原地嗡嗡抖動
+IdleDetacher 在最後一個命令之後 hold_time 秒沒有新命令時呼叫 detach()
+(gpiozero: servo.value = None，RPi.GPIO: ChangeDutyCycle(0))，
+下一個命令來時先呼叫 attach() 再繼續；閒置計時都排在同一個 DeadlineScheduler 上
+CpuMeter 分別統計「有伺服馬達在送脈衝」與「全部停止」時整個行程的 CPU 使用率
+"""
+
+import threading
+import time
+
+from .scheduler import DeadlineScheduler
+
+
+class CpuMeter:
+    """整個行程的 CPU 使用率，分成「有伺服馬達在送脈衝」與「全部停止」兩種狀態累計
+
+    process_time() 是整個行程 (包含 PWM 執行緒) 的 CPU 時間，不能分到個別的伺服馬達，
+    所以每個行程只用一個 (PROCESS_CPU)，由所有 IdleDetacher 共用
+    """
+
+    def __init__(self):
+        self.active = 0   # 目前在送脈衝的伺服馬達數
+        self.seconds = {}
+        self.cpu = {}
+        self._since = time.monotonic()
+        self._cpu_since = time.process_time()
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        return 'attached' if self.active else 'detached'
+
+    def attach(self):
+        """一顆伺服馬達開始送脈衝"""
+        with self._lock:
+            self._accumulate()
+            self.active += 1
+
+    def detach(self):
+        """一顆伺服馬達停止送脈衝"""
+        with self._lock:
+            self._accumulate()
+            self.active = max(0, self.active - 1)
+
+    def _accumulate(self):
+        now = time.monotonic()
+        cpu = time.process_time()
+        state = self.state
+        self.seconds[state] = self.seconds.get(state, 0.0) + now - self._since
+        self.cpu[state] = self.cpu.get(state, 0.0) + cpu - self._cpu_since
+        self._since = now
+        self._cpu_since = cpu
+
+    def report(self):
+        """每種狀態的時間與整個行程的 CPU 使用率"""
+        labels = {'attached': '有伺服馬達送脈衝', 'detached': '全部停止'}
+        with self._lock:
+            self._accumulate()
+            parts = []
+            for state, seconds in self.seconds.items():
+                percent = self.cpu[state] / seconds * 100 if seconds > 0 else 0.0
+                parts.append(f"{labels[state]} {seconds:.1f} 秒 CPU {percent:.1f}%")
+            return "行程 CPU: " + "，".join(parts)
+
+
+# 整個行程共用的 CPU 統計
+PROCESS_CPU = CpuMeter()
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def _default_scheduler():
+    """所有 IdleDetacher 共用的排程器 (第一次排入計時時才啟動執行緒)"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = DeadlineScheduler()
+        return _scheduler
+
+
+class IdleDetacher:
+    """閒置一段時間後停止送脈衝
+
+    detach(): 停止送脈衝
+    attach(): 恢復送脈衝 (None 表示下一個命令本身就會恢復)
+    hold_time: 最後一個命令結束後保持多久才 detach (秒)，None 表示永遠不 detach
+    scheduler: scheduler.DeadlineScheduler，None 時使用模組共用的排程器；
+               每個 IdleDetacher 只有一個計時，重新計時只是 reschedule，不會建立新執行緒
+    meter: CpuMeter，預設為整個行程共用的 PROCESS_CPU
+    """
+
+    def __init__(self, detach, attach=None, hold_time=1.0, scheduler=None, meter=None):
+        self.detach = detach
+        self.attach = attach
+        self.hold_time = hold_time
+        self.attached = False
+        self.scheduler = scheduler
+        self.meter = meter if meter is not None else PROCESS_CPU
+        self._lock = threading.Lock()
+        self._timer = None
+        self._generation = 0  # 每次命令都會遞增，讓已經觸發但還沒執行的計時失效
+        self._armed = None    # 目前的計時屬於哪一個 generation
+
+        # 統計
+        self.detaches = 0
+        self.attaches = 0
+
+    def before_command(self):
+        """送出新命令前呼叫：取消計時，已經 detach 的話先 attach"""
+        with self._lock:
+            self._generation += 1
+            if self._timer is not None:
+                self._timer.cancel()
+            if self.attached:
+                return
+            if self.attach is not None:
+                self.attach()
+            if self.detaches:
+                self.attaches += 1  # 第一次送脈衝不算恢復
+            self.attached = True
+            self.meter.attach()
+
+    def after_command(self, delay=0.0):
+        """命令完成 (馬達預估 delay 秒後到位) 後呼叫：開始閒置計時"""
+        if self.hold_time is None:
+            return
+        with self._lock:
+            self._armed = self._generation
+            if self._timer is None:
+                if self.scheduler is None:
+                    self.scheduler = _default_scheduler()
+                self._timer = self.scheduler.call_later(delay + self.hold_time, self._expire)
+            else:
+                self._timer.reschedule(delay + self.hold_time)
+
+    def _expire(self):
+        with self._lock:
+            if self._armed != self._generation or not self.attached:
+                return
+            self.detach()
+            self.attached = False
+            self.detaches += 1
+            self.meter.detach()
+
+    def close(self):
+        """取消計時 (不呼叫 detach)"""
+        with self._lock:
+            self._generation += 1
+            if self._timer is not None:
+                self._timer.cancel()
+
+    def report(self):
+        """統計摘要 (CPU 使用率是整個行程的，另外由 meter.report() 取得)"""
+        return f"detach {self.detaches} 次，attach {self.attaches} 次"
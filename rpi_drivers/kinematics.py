@@ -0,0 +1,71 @@
+"""
+伺服馬達運動時間模型
+依照目前角度與目標角度計算馬達需要多久才能到位，取代固定的 time.sleep：
+  等待時間 = dead_time (收到新脈衝前的延遲) + 移動距離 / 速度 + settle (到位後的擺動)
+轉 5° 只需要等幾十毫秒，轉 180° 才需要等整段時間
+角度不知道時 (例如剛開機) 以完整行程估計
+"""
+
+import time
+
+
+class ServoModel:
+    """一種伺服馬達的速度與穩定時間
+
+    seconds_per_60: 無負載轉 60° 需要的秒數 (規格書上的 speed)
+    dead_time: 最長要等一個 PWM 週期 (50Hz 為 20ms) 馬達才會讀到新的脈衝
+    settle: 到位後停止擺動需要的時間
+    """
+
+    def __init__(self, name, seconds_per_60, dead_time=0.02, settle=0.03, full_range=180):
+        self.name = name
+        self.seconds_per_60 = seconds_per_60
+        self.dead_time = dead_time
+        self.settle = settle
+        self.full_range = full_range
+
+    @property
+    def max_speed(self):
+        """最高角速度 (度/秒)"""
+        return 60.0 / self.seconds_per_60
+
+    @property
+    def settle_time(self):
+        """不需要移動時的等待時間"""
+        return self.dead_time + self.settle
+
+    def travel_time(self, start, end):
+        """從 start 轉到 end 需要等待的秒數，start 為 None 時以完整行程計算"""
+        distance = self.full_range if start is None else abs(end - start)
+        return self.dead_time + distance * self.seconds_per_60 / 60.0 + self.settle
+
+    def __repr__(self):
+        return f"ServoModel({self.name!r}, {self.seconds_per_60} s/60°)"
+
+
+# 常見伺服馬達 (4.8V 規格)
+SG90 = ServoModel('SG90', 0.1)
+MG90S = ServoModel('MG90S', 0.1)
+MG996R = ServoModel('MG996R', 0.17, settle=0.05)
+
+SERVO_MODELS = {model.name: model for model in (SG90, MG90S, MG996R)}
+
+
+class ServoTracker:
+    """記錄一個伺服馬達最後指令的角度，依移動距離計算每次需要等待的時間"""
+
+    def __init__(self, model=SG90, position=None):
+        self.model = model
+        self.position = position
+
+    def move(self, angle):
+        """記錄新的目標角度，回傳需要等待的秒數"""
+        wait = self.model.travel_time(self.position, angle)
+        self.position = angle
+        return wait
+
+    def wait_for(self, angle):
+        """記錄新的目標角度並等待馬達到位，回傳等待的秒數"""
+        wait = self.move(angle)
+        time.sleep(wait)
+        return wait
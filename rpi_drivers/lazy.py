@@ -0,0 +1,45 @@
+"""
+延遲取得硬體
+模組載入時只建立 LazyDevice，第一次用到 (讀寫屬性、呼叫方法) 時才真正初始化 GPIO / 建立 gpiozero 元件，
+匯入模組不會碰到硬體，也不需要先安裝 RPi.GPIO、gpiozero
+"""
+
+import threading
+
+
+class LazyDevice:
+    """第一次使用時才呼叫 factory() 建立硬體物件，之後所有屬性存取都轉給該物件"""
+
+    __slots__ = ('_factory', '_device', '_lock')
+
+    def __init__(self, factory):
+        object.__setattr__(self, '_factory', factory)
+        object.__setattr__(self, '_device', None)
+        object.__setattr__(self, '_lock', threading.Lock())
+
+    @property
+    def acquired(self):
+        """硬體是否已經初始化"""
+        return self._device is not None
+
+    def get(self):
+        """取得硬體物件 (必要時初始化)"""
+        device = self._device
+        if device is None:
+            with self._lock:
+                device = self._device
+                if device is None:
+                    device = self._factory()
+                    object.__setattr__(self, '_device', device)
+        return device
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self.get(), name, value)
+
+    def close(self):
+        """已經初始化過才關閉，從來沒用到的硬體不需要為了關閉而初始化"""
+        if self._device is not None:
+            self._device.close()
@@ -0,0 +1,98 @@
+"""
+非阻塞 LED 閃爍序列
+閃爍模式先編譯成 (offset 秒數, 電位) 事件列表，再交給 DeadlineScheduler 依絕對時間播放，
+每個事件都以開始時間 + offset 計算，不會因為 sleep 誤差而累積漂移
+"""
+
+import threading
+import time
+from collections import namedtuple
+
+# events: ((offset, level), ...)，duration: 整個模式的長度 (秒)
+LedPattern = namedtuple('LedPattern', ['events', 'duration'])
+
+
+def compile_pattern(steps, repeat=1):
+    """把 [(亮秒數, 暗秒數), ...] 編譯成事件列表"""
+    events = []
+    t = 0.0
+    for _ in range(repeat):
+        for on_time, off_time in steps:
+            events.append((t, 1))
+            t += on_time
+            events.append((t, 0))
+            t += off_time
+    return LedPattern(tuple(events), t)
+
+# 答對：短-長-短-長，重複 3 次
+CORRECT_PATTERN = compile_pattern([(0.2, 0.1), (0.5, 0.1), (0.2, 0.1), (0.5, 0.2)], repeat=3)
+# 答錯：長-長，重複 3 次
+WRONG_PATTERN = compile_pattern([(0.8, 0.2), (0.8, 0.3)], repeat=3)
+# 輸入錯誤：亮 2 秒
+ERROR_PATTERN = compile_pattern([(2.0, 0)])
+# 發生例外：亮 1 秒
+FAULT_PATTERN = compile_pattern([(1.0, 0)])
+
+
+class LedSequencer:
+    """在排程器上播放 LED 模式，play() 立即返回，新的模式會中斷正在播放的模式"""
+
+    def __init__(self, set_level, scheduler):
+        # set_level(level)：level 為 1 點亮、0 熄滅
+        self.set_level = set_level
+        self.scheduler = scheduler
+        self._lock = threading.Lock()
+        self._timer = None
+        self._generation = 0  # 每次 play / stop 都會遞增，讓舊模式的事件失效
+        self._done = threading.Event()
+        self._done.set()
+
+    @property
+    def playing(self):
+        """是否正在播放"""
+        return not self._done.is_set()
+
+    def play(self, pattern):
+        """開始播放模式 (中斷目前的模式)"""
+        with self._lock:
+            generation = self._preempt()
+            if not pattern.events:
+                return
+            self._done.clear()
+            start = time.monotonic()
+            self._schedule(generation, pattern, 0, start)
+
+    def stop(self, level=0):
+        """停止播放並把 LED 設為 level"""
+        with self._lock:
+            self._preempt()
+            self.set_level(level)
+
+    def wait(self, timeout=None):
+        """等待目前的模式播放完畢"""
+        return self._done.wait(timeout)
+
+    def _preempt(self):
+        self._generation += 1
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._done.set()
+        return self._generation
+
+    def _schedule(self, generation, pattern, index, start):
+        offset = pattern.events[index][0]
+        self._timer = self.scheduler.call_at(start + offset, self._fire,
+                                             generation, pattern, index, start)
+
+    def _fire(self, generation, pattern, index, start):
+        with self._lock:
+            # 已經被新的模式中斷 (排程器可能已經取出這個事件)
+            if generation != self._generation:
+                return
+            self.set_level(pattern.events[index][1])
+            if index + 1 < len(pattern.events):
+                self._schedule(generation, pattern, index + 1, start)
+            else:
+                self._timer = None
+                self._done.set()
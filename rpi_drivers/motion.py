@@ -0,0 +1,226 @@
+"""
+非阻塞伺服馬達運動控制
+一條控制執行緒獨佔伺服馬達，目標角度透過單一格的信箱 (mailbox) 傳入：
+還沒被執行的目標會直接被更新的目標取代 (latest wins)，拖動滑桿時不會排隊執行過時的角度
+move_to() 立即返回接受的目標與預估到達時間，呼叫端不需要等馬達轉完
+
+設定 planner (trajectory.TrajectoryPlanner) 時，每次移動會規劃成速度 / 加速度受限的軌跡，
+每個 frame 寫入一個點；軌跡播放中收到新目標時，從目前位置重新規劃
+
+設定 detach 時，到位後閒置 idle_hold 秒就停止送脈衝 (idle.IdleDetacher)，
+下一個命令先在最後的位置恢復脈衝再開始移動，馬達不會跳動
+
+設定 transform (例如 servo.ServoMapping.value) 時，整條路徑在播放前一次換算成硬體值，
+apply() 收到的是換算後的值而不是角度
+"""
+
+import threading
+import time
+from collections import namedtuple
+
+from .idle import IdleDetacher
+from .kinematics import SG90
+
+# target: 接受的目標角度，seq: 命令序號，eta: 預估到達的 time.monotonic() 時間
+MoveTicket = namedtuple('MoveTicket', ['target', 'seq', 'eta'])
+
+
+class MotionController:
+    """伺服馬達運動控制執行緒
+
+    apply(angle): 實際把角度寫到硬體 (只在控制執行緒中呼叫)
+    transform(angles): 把整條路徑的角度一次換算成 apply() 的參數 (回傳同長度的序列)，
+                       None 表示直接傳角度
+    model: kinematics.ServoModel，依每次寫入的移動距離估計到達時間
+    frame_time: 兩次寫入的最小間隔，SG90 每 20ms (50Hz) 才讀一次脈衝，更快寫入沒有意義
+    planner: 有 plan(start, end) 與 duration(start, end) 的軌跡規劃器，None 時直接跳到目標
+    detach(): 停止送脈衝，None 表示一直保持；idle_hold: 到位後保持幾秒才 detach
+    控制執行緒在第一次 move_to() / play() 時才啟動
+    """
+
+    def __init__(self, apply, model=SG90, frame_time=0.02, position=None, planner=None,
+                 detach=None, idle_hold=1.0, transform=None):
+        self.apply = apply
+        self.transform = transform
+        self.model = model
+        self.frame_time = frame_time
+        self.planner = planner
+        self.idle = IdleDetacher(detach, self._reattach, idle_hold) if detach is not None else None
+        self.position = position   # 最後寫入硬體的角度 (None 表示還沒寫過)
+        self._output = None        # 最後一次傳給 apply() 的值
+        self.target = position     # 最新接受的目標角度
+        self._cond = threading.Condition()
+        self._pending = None       # 信箱：(目標角度, 路徑或 None, 序號)，只保留最新的一個
+        self._seq = 0
+        self._streaming = False    # 是否正在播放路徑
+        self._last_write = 0.0
+        self._arrive_at = 0.0      # 最後一次寫入的預估到達時間
+        self._stopping = False
+        self._thread = None
+
+        # 統計
+        self.accepted = 0
+        self.applied = 0
+        self.coalesced = 0         # 還沒執行就被新目標取代的命令數
+        self.preempted = 0         # 播放到一半被新目標中斷的路徑數
+        self.errors = 0            # 執行失敗的命令數
+        self.last_error = None     # (序號, 例外)：最後一個失敗的命令
+
+    def move_to(self, angle):
+        """送出新的目標角度，立即回傳 MoveTicket"""
+        with self._cond:
+            start = self.position
+            if self.planner is not None and start is not None:
+                # 軌跡最後一個 frame 的移動距離很小，結束後只需要等待穩定時間
+                travel = self.planner.duration(start, angle) + self.model.settle_time
+            else:
+                travel = self.model.travel_time(start, angle)
+            return self._post(angle, None, travel)
+
+    def play(self, path):
+        """播放預先規劃好的路徑 (每個 frame 一個角度)，立即回傳 MoveTicket"""
+        path = [float(angle) for angle in path]
+        if not path:
+            raise ValueError("路徑不能是空的")
+        with self._cond:
+            return self._post(path[-1], path, len(path) * self.frame_time + self.model.settle_time)
+
+    def _post(self, target, path, travel):
+        if self._stopping:
+            raise RuntimeError("MotionController 已經關閉")
+        self._seq += 1
+        if self._pending is not None:
+            self.coalesced += 1
+        self._pending = (target, path, self._seq)
+        self.target = target
+        self.accepted += 1
+        self._ensure_thread()
+        self._cond.notify_all()
+        # 控制執行緒在距離上次寫入滿一個 frame 時開始寫入
+        eta = max(time.monotonic(), self._last_write + self.frame_time) + travel
+        return MoveTicket(target, self._seq, eta)
+
+    @property
+    def moving(self):
+        """是否還有沒執行的目標，或馬達還在移動中"""
+        with self._cond:
+            return (self._pending is not None or self._streaming
+                    or time.monotonic() < self._arrive_at)
+
+    def failed(self, ticket):
+        """ticket 的命令是否執行失敗 (apply / transform / 規劃時發生例外)"""
+        with self._cond:
+            return self.last_error is not None and self.last_error[0] == ticket.seq
+
+    def wait(self, timeout=None):
+        """等到最新的目標已寫入且預估已到位，逾時或最新的命令失敗時回傳 False"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._pending is not None or self._streaming:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            if self.last_error is not None and self.last_error[0] == self._seq:
+                return False
+            arrive_at = self._arrive_at
+        if deadline is not None and arrive_at > deadline:
+            time.sleep(max(0.0, deadline - time.monotonic()))
+            return False
+        time.sleep(max(0.0, arrive_at - time.monotonic()))
+        return True
+
+    def close(self, timeout=None):
+        """停止控制執行緒 (已經在信箱中的目標會先執行完)"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        if self.idle is not None:
+            self.idle.close()
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._stopping:
+                    self._cond.wait()
+                if self._pending is None:
+                    return
+                target, path, seq = self._pending
+                self._pending = None
+                self._streaming = True
+                start = self.position
+
+            # 一個命令失敗 (硬體錯誤、換算錯誤) 只記錄下來，執行緒繼續處理下一個命令
+            try:
+                self._execute(target, path, start)
+            except Exception as e:
+                with self._cond:
+                    self.errors += 1
+                    self.last_error = (seq, e)
+                print(f"❌ 伺服馬達命令 #{seq} (目標 {target}°) 失敗: {e}")
+            finally:
+                with self._cond:
+                    self._streaming = False
+                    self._cond.notify_all()
+                    idle_after = self._arrive_at - time.monotonic()
+            if self.idle is not None:
+                self.idle.after_command(max(0.0, idle_after))
+
+    def _execute(self, target, path, start):
+        if self.idle is not None:
+            self.idle.before_command()
+        if path is None:
+            if self.planner is None or start is None:
+                path = [target]
+            else:
+                path = self.planner.plan(start, target).tolist()
+        outputs = self.transform(path) if self.transform is not None else path
+        self._stream(path, outputs)
+
+    def _reattach(self):
+        """detach 之後在最後寫入的位置恢復送脈衝"""
+        if self._output is not None:
+            self.apply(self._output)
+            with self._cond:
+                self._last_write = time.monotonic()
+
+    def _stream(self, path, outputs):
+        """每個 frame 寫入一個點；有新目標時中斷，回到 _run 從目前位置重新規劃"""
+        for i, (angle, output) in enumerate(zip(path, outputs)):
+            with self._cond:
+                while self._pending is None:
+                    wait = self._last_write + self.frame_time - time.monotonic()
+                    if wait <= 0:
+                        break
+                    self._cond.wait(wait)
+                if self._pending is not None:
+                    if i:
+                        self.preempted += 1
+                    return
+
+            output = float(output)
+            self.apply(output)
+            with self._cond:
+                self._last_write = time.monotonic()
+                self._arrive_at = self._last_write + self.model.travel_time(self.position, angle)
+                self.position = angle
+                self._output = output
+                self.applied += 1
+
+    def report(self):
+        """統計摘要"""
+        summary = (f"接受 {self.accepted} 個目標，寫入 {self.applied} 次，"
+                   f"合併 {self.coalesced} 個過時目標，中斷 {self.preempted} 條路徑")
+        if self.errors:
+            summary += f"，失敗 {self.errors} 個命令"
+        if self.idle is not None:
+            summary += f"\n閒置: {self.idle.report()}"
+        return summary
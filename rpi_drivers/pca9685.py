@@ -0,0 +1,166 @@
+"""
+PCA9685 16 通道 I2C PWM 控制器
+PWM 由晶片自己的振盪器產生，Pi 只在角度改變時寫暫存器，通道數再多也不耗 CPU
+MODE1 開啟 auto-increment 後，一筆 I2C 交易就能從 LED0_ON_L 開始連續寫入多個通道
+(每個通道 4 bytes：ON_L, ON_H, OFF_L, OFF_H)，16 個通道一次 65 bytes
+
+SMBus 的 block write 最多 32 bytes，所以 I2CBus 用 smbus2 的 i2c_rdwr 送出整筆資料
+FakeI2CBus 在記憶體中記錄每一筆交易並模擬 PCA9685 的暫存器，不接硬體也能驗證
+"""
+
+import time
+from collections import namedtuple
+
+# 暫存器
+MODE1 = 0x00
+MODE2 = 0x01
+LED0_ON_L = 0x06
+PRESCALE = 0xFE
+
+# MODE1 / MODE2 的位元
+RESTART = 0x80
+AUTO_INCREMENT = 0x20
+SLEEP = 0x10
+OUTDRV = 0x04     # 推挽輸出
+FULL_OFF = 0x10   # OFF_H 的第 4 位元：通道完全不輸出
+
+CHANNELS = 16
+STEPS = 4096      # 每個週期 12 位元的計數
+DEFAULT_ADDRESS = 0x40
+OSCILLATOR = 25_000_000
+
+# kind: 'write' 或 'read'，data: 寫入的 bytes (第一個 byte 是暫存器) 或讀取的結果
+Transaction = namedtuple('Transaction', ['kind', 'address', 'data'])
+
+
+class I2CBus:
+    """smbus2 的包裝，每次 write() 是一筆 I2C 交易 (smbus2 在第一次建立時才匯入)"""
+
+    def __init__(self, bus=1):
+        from smbus2 import SMBus, i2c_msg
+        self._bus = SMBus(bus)
+        self._msg = i2c_msg
+
+    def write(self, address, data):
+        self._bus.i2c_rdwr(self._msg.write(address, bytes(data)))
+
+    def read(self, address, register, length=1):
+        write = self._msg.write(address, [register])
+        read = self._msg.read(address, length)
+        self._bus.i2c_rdwr(write, read)
+        return bytes(read)
+
+    def close(self):
+        self._bus.close()
+
+
+class FakeI2CBus:
+    """記憶體中的 I2C bus：記錄每一筆交易，每個位址模擬一組 PCA9685 暫存器
+
+    MODE1 的 auto-increment 位元沒有開啟時，同一筆交易的資料都寫到同一個暫存器 (和真的晶片一樣)
+    """
+
+    def __init__(self):
+        self.transactions = []
+        self.registers = {}   # 位址 -> bytearray(256)
+
+    def _device(self, address):
+        if address not in self.registers:
+            registers = bytearray(256)
+            registers[MODE1] = SLEEP | 0x01   # 上電預設值
+            self.registers[address] = registers
+        return self.registers[address]
+
+    def write(self, address, data):
+        data = bytes(data)
+        self.transactions.append(Transaction('write', address, data))
+        registers = self._device(address)
+        register = data[0]
+        step = 1 if registers[MODE1] & AUTO_INCREMENT else 0
+        for value in data[1:]:
+            registers[register] = value
+            register = (register + step) & 0xFF
+        registers[MODE1] &= ~RESTART & 0xFF
+
+    def read(self, address, register, length=1):
+        registers = self._device(address)
+        data = bytes(registers[(register + i) & 0xFF] for i in range(length))
+        self.transactions.append(Transaction('read', address, data))
+        return data
+
+    def writes(self, address=None):
+        """寫入交易 (可以只看某個位址)"""
+        return [t for t in self.transactions
+                if t.kind == 'write' and (address is None or t.address == address)]
+
+    def channel(self, address, channel):
+        """通道目前的 (on, off, 是否 full off)"""
+        registers = self._device(address)
+        base = LED0_ON_L + 4 * channel
+        on = registers[base] | (registers[base + 1] & 0x0F) << 8
+        off = registers[base + 2] | (registers[base + 3] & 0x0F) << 8
+        return on, off, bool(registers[base + 3] & FULL_OFF)
+
+    def close(self):
+        pass
+
+
+class PCA9685:
+    """一顆 PCA9685
+
+    bus: 有 write(address, data) 的 I2C bus (I2CBus 或 FakeI2CBus)
+    frequency: PWM 頻率 (Hz)，實際頻率受 prescale 整數限制，記在 self.frequency
+    stagger: 各通道的脈衝起點錯開，16 顆馬達不會在同一瞬間一起拉電流
+    """
+
+    def __init__(self, bus, address=DEFAULT_ADDRESS, frequency=50, oscillator=OSCILLATOR, stagger=True):
+        self.bus = bus
+        self.address = address
+        self.oscillator = oscillator
+        self.prescale = max(3, min(255, round(oscillator / (STEPS * frequency)) - 1))
+        self.frequency = oscillator / (STEPS * (self.prescale + 1))
+        self.stagger = stagger
+        self.transfers = 0
+        self._configure()
+
+    def _configure(self):
+        # prescale 只能在睡眠時寫入；醒來後等振盪器穩定 (500µs) 再 restart
+        self._write(bytes([MODE1, SLEEP | AUTO_INCREMENT]))
+        self._write(bytes([PRESCALE, self.prescale]))
+        self._write(bytes([MODE2, OUTDRV]))
+        self._write(bytes([MODE1, AUTO_INCREMENT]))
+        time.sleep(0.0005)
+        self._write(bytes([MODE1, RESTART | AUTO_INCREMENT]))
+
+    def _write(self, data):
+        self.bus.write(self.address, data)
+        self.transfers += 1
+
+    def counts(self, pulse_width):
+        """脈衝寬度 (秒) -> 高電位的計數 (0 ~ 4095)"""
+        return max(0, min(STEPS - 1, round(pulse_width * self.frequency * STEPS)))
+
+    def phase(self, channel):
+        """通道脈衝起點的計數"""
+        return channel * (STEPS // CHANNELS) if self.stagger else 0
+
+    def write_channels(self, first, pulse_widths):
+        """從 first 通道開始連續寫入，一筆 auto-increment 交易
+
+        pulse_widths: 每個通道的脈衝寬度 (秒)，None 表示停止輸出 (full off)
+        """
+        if first < 0 or first + len(pulse_widths) > CHANNELS:
+            raise ValueError(f"通道必須在 0-{CHANNELS - 1} 之間")
+        data = bytearray([LED0_ON_L + 4 * first])
+        for channel, pulse_width in enumerate(pulse_widths, first):
+            if pulse_width is None:
+                data += bytes((0, 0, 0, FULL_OFF))
+                continue
+            on = self.phase(channel)
+            off = (on + self.counts(pulse_width)) % STEPS
+            data += bytes((on & 0xFF, on >> 8, off & 0xFF, off >> 8))
+        self._write(data)
+
+    def sleep(self):
+        """停止振盪器 (所有通道停止輸出)"""
+        self._write(bytes([MODE1, SLEEP | AUTO_INCREMENT]))
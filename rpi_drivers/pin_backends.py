@@ -0,0 +1,448 @@
+"""
+可切換的 GPIO / PWM 後端
+同一組介面包裝 pigpio (DMA 硬體計時 PWM)、lgpio、RPi.GPIO (軟體 PWM) 與不接硬體的 mock：
+  setup_output / write / read      一般 GPIO
+  start_pwm(pin, 頻率, duty)        回傳有 ChangeDutyCycle / stop 的物件 (和 RPi.GPIO PWM 相同)
+  capture(pin, buffer)             把輸入腳的邊緣時間記錄到 pwm_jitter.EdgeBuffer，回傳停止函數
+  pin_factory()                    對應的 gpiozero pin factory，給 Servo / PWMLED 使用
+
+select_pin_backend() 依名稱 (或環境變數 RPI_PIN_BACKEND) 開啟後端；'auto' 時依優先順序
+(硬體計時的在前) 開啟第一個可用的，有指定 bench_pin 時先跑微基準測試再挑最好的
+匯入本模組不會載入任何硬體函式庫
+
+用法: python -m rpi_drivers.pin_backends --bench-pin 21 --loopback-pin 20
+      python -m rpi_drivers.pin_backends --fake-pigpiod   (用本機的假 pigpiod 測試 pigpio 後端)
+"""
+
+import argparse
+import os
+import time
+from collections import namedtuple
+
+# auto 選擇時的優先順序
+BACKENDS = ('pigpio', 'lgpio', 'rpigpio', 'mock')
+HARDWARE_PWM_PINS = (12, 13, 18, 19)
+
+# toggles_per_second: 每秒可切換幾次電位，jitter: pwm_jitter.analyze() 的結果 (沒有量測時為 None)
+BenchmarkResult = namedtuple('BenchmarkResult', ['name', 'toggles_per_second', 'jitter', 'error'])
+
+
+class PwmHandle:
+    """讓各種後端的 PWM 都有 RPi.GPIO PWM 物件的 ChangeDutyCycle / stop 介面"""
+
+    def __init__(self, change, stop):
+        self._change = change
+        self._stop = stop
+
+    def ChangeDutyCycle(self, duty):
+        self._change(duty)
+
+    def stop(self):
+        self._stop()
+
+
+class PinBackend:
+    """後端介面，腳位一律使用 BCM 編號"""
+
+    name = None
+    hardware_timed = False  # PWM 是否由硬體 (DMA / PWM 週邊) 計時
+    _factory = None
+
+    def setup_output(self, pin):
+        raise NotImplementedError
+
+    def write(self, pin, level):
+        raise NotImplementedError
+
+    def read(self, pin):
+        raise NotImplementedError
+
+    def start_pwm(self, pin, frequency, duty):
+        raise NotImplementedError
+
+    def capture(self, pin, buffer):
+        raise NotImplementedError
+
+    def pin_factory(self):
+        """gpiozero pin factory (第一次呼叫時建立，之後共用同一個)"""
+        if self._factory is None:
+            self._factory = self._create_pin_factory()
+        return self._factory
+
+    def _create_pin_factory(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.name}>"
+
+
+class RPiGPIOPinBackend(PinBackend):
+    """RPi.GPIO：PWM 由 C 執行緒以 sleep 計時 (軟體 PWM)"""
+
+    name = 'rpigpio'
+
+    def __init__(self):
+        import RPi.GPIO as GPIO
+        GPIO.setmode(GPIO.BCM)
+        GPIO.setwarnings(False)
+        self.GPIO = GPIO
+        self._pins = set()
+
+    def setup_output(self, pin):
+        self.GPIO.setup(pin, self.GPIO.OUT)
+        self._pins.add(pin)
+
+    def write(self, pin, level):
+        self.GPIO.output(pin, level)
+
+    def read(self, pin):
+        return self.GPIO.input(pin)
+
+    def start_pwm(self, pin, frequency, duty):
+        self.setup_output(pin)
+        pwm = self.GPIO.PWM(pin, frequency)
+        pwm.start(duty)
+        return pwm
+
+    def capture(self, pin, buffer):
+        from .pwm_jitter import LoopbackCapture
+        self._pins.add(pin)
+        return LoopbackCapture(self.GPIO, pin, buffer).close
+
+    def _create_pin_factory(self):
+        from gpiozero.pins.rpigpio import RPiGPIOFactory
+        return RPiGPIOFactory()
+
+    def close(self):
+        if self._pins:
+            self.GPIO.cleanup(list(self._pins))
+            self._pins.clear()
+
+
+class LgpioPinBackend(PinBackend):
+    """lgpio：PWM 由 lgpio 的背景執行緒計時，邊緣事件帶有核心記錄的 ns 時間"""
+
+    name = 'lgpio'
+
+    def __init__(self, chip=0):
+        import lgpio
+        self.lgpio = lgpio
+        self.chip = chip
+        self.handle = lgpio.gpiochip_open(chip)
+
+    def setup_output(self, pin):
+        self.lgpio.gpio_claim_output(self.handle, pin)
+
+    def write(self, pin, level):
+        self.lgpio.gpio_write(self.handle, pin, level)
+
+    def read(self, pin):
+        return self.lgpio.gpio_read(self.handle, pin)
+
+    def start_pwm(self, pin, frequency, duty):
+        lgpio = self.lgpio
+        self.setup_output(pin)
+        lgpio.tx_pwm(self.handle, pin, frequency, duty)
+        return PwmHandle(lambda d: lgpio.tx_pwm(self.handle, pin, frequency, d),
+                         lambda: lgpio.tx_pwm(self.handle, pin, 0, 0))
+
+    def capture(self, pin, buffer):
+        lgpio = self.lgpio
+        lgpio.gpio_claim_alert(self.handle, pin, lgpio.BOTH_EDGES)
+        callback = lgpio.callback(self.handle, pin, lgpio.BOTH_EDGES,
+                                  lambda chip, gpio, level, timestamp: buffer.record(level, timestamp))
+        return callback.cancel
+
+    def _create_pin_factory(self):
+        from gpiozero.pins.lgpio import LGPIOFactory
+        return LGPIOFactory(chip=self.chip)
+
+    def close(self):
+        self.lgpio.gpiochip_close(self.handle)
+
+
+class PigpioPinBackend(PinBackend):
+    """pigpio：透過 pigpiod 以 DMA 計時 PWM，GPIO 12/13/18/19 可以用硬體 PWM 週邊
+
+    host / port 預設讀取環境變數 PIGPIO_ADDR / PIGPIO_PORT (和 pigpio 相同)，
+    測試時可以指向 fake_pigpiod.FakePigpiod
+    """
+
+    name = 'pigpio'
+    hardware_timed = True
+
+    def __init__(self, host=None, port=None):
+        import pigpio
+        self.pigpio = pigpio
+        host = host or os.environ.get('PIGPIO_ADDR', 'localhost')
+        port = int(port or os.environ.get('PIGPIO_PORT', 8888))
+        self.host, self.port = host, port
+        self.pi = pigpio.pi(host, port, show_errors=False)
+        if not self.pi.connected:
+            raise OSError(f"無法連線到 pigpiod ({host}:{port})")
+
+    def setup_output(self, pin):
+        self.pi.set_mode(pin, self.pigpio.OUTPUT)
+
+    def write(self, pin, level):
+        self.pi.write(pin, level)
+
+    def read(self, pin):
+        return self.pi.read(pin)
+
+    def start_pwm(self, pin, frequency, duty):
+        pi = self.pi
+        self.setup_output(pin)
+        if pin in HARDWARE_PWM_PINS:
+            # 硬體 PWM 週邊，duty 範圍 0 ~ 1000000
+            pi.hardware_PWM(pin, int(frequency), int(duty * 10000))
+            return PwmHandle(lambda d: pi.hardware_PWM(pin, int(frequency), int(d * 10000)),
+                             lambda: pi.hardware_PWM(pin, 0, 0))
+        # 其他腳位使用 DMA 計時的 PWM，range 設為 10000 讓 duty 有 0.01% 的解析度
+        pi.set_PWM_frequency(pin, int(frequency))
+        pi.set_PWM_range(pin, 10000)
+        pi.set_PWM_dutycycle(pin, int(duty * 100))
+        return PwmHandle(lambda d: pi.set_PWM_dutycycle(pin, int(d * 100)),
+                         lambda: pi.set_PWM_dutycycle(pin, 0))
+
+    def capture(self, pin, buffer):
+        pigpio = self.pigpio
+        self.pi.set_mode(pin, pigpio.INPUT)
+        last = [None, 0]  # 上一個 tick 與 32-bit 循環的累計位移
+
+        def edge(gpio, level, tick):
+            # pigpio 的 tick 是 32-bit 微秒，約 72 分鐘循環一次
+            if last[0] is not None and tick < last[0]:
+                last[1] += 1 << 32
+            last[0] = tick
+            buffer.record(level, (tick + last[1]) * 1000)
+
+        return self.pi.callback(pin, pigpio.EITHER_EDGE, edge).cancel
+
+    def _create_pin_factory(self):
+        from gpiozero.pins.pigpio import PiGPIOFactory
+        return PiGPIOFactory(host=self.host, port=self.port)
+
+    def close(self):
+        self.pi.stop()
+
+
+class MockPinBackend(PinBackend):
+    """不接硬體：電位記在記憶體中，PWM 由 pwm_jitter.MockPwm 的執行緒產生
+
+    loopback={輸出腳: 輸入腳} 讓輸出的每次變化都記錄到 capture 的輸入腳
+    """
+
+    name = 'mock'
+
+    def __init__(self, loopback=None):
+        self.loopback = dict(loopback or {})
+        self.levels = {}
+        self._captures = {}  # 輸入腳 -> EdgeBuffer
+
+    def setup_output(self, pin):
+        self.levels.setdefault(pin, 0)
+
+    def write(self, pin, level, t_ns=None):
+        self.levels[pin] = level
+        buffer = self._captures.get(self.loopback.get(pin))
+        if buffer is not None:
+            buffer.record(level, t_ns)
+
+    def read(self, pin):
+        return self.levels.get(pin, 0)
+
+    def start_pwm(self, pin, frequency, duty):
+        from .pwm_jitter import MockPwm
+        self.setup_output(pin)
+        pwm = MockPwm(lambda level, t_ns: self.write(pin, level, t_ns), frequency)
+        pwm.start(duty)
+        return pwm
+
+    def capture(self, pin, buffer):
+        self._captures[pin] = buffer
+        return lambda: self._captures.pop(pin, None)
+
+    def _create_pin_factory(self):
+        from gpiozero.pins.mock import MockFactory, MockPWMPin
+        return MockFactory(pin_class=MockPWMPin)
+
+
+def open_pin_backend(name, **options):
+    """依名稱開啟後端，函式庫不存在時丟出 ImportError，連不到 daemon 時丟出 OSError"""
+    if name == 'pigpio':
+        return PigpioPinBackend(options.get('host'), options.get('port'))
+    if name == 'lgpio':
+        return LgpioPinBackend(options.get('chip', 0))
+    if name == 'rpigpio':
+        return RPiGPIOPinBackend()
+    if name == 'mock':
+        return MockPinBackend(options.get('loopback'))
+    raise ValueError(f"後端必須是 {', '.join(BACKENDS)} 其中之一")
+
+
+def benchmark(backend, pin, loopback_pin=None, toggles=2000, frequency=50, duty=7.5, seconds=1.0):
+    """量測切換速率與 PWM 抖動 (需要把 pin 接到 loopback_pin，mock 後端不需要接線)"""
+    from .pwm_jitter import EdgeBuffer, analyze
+
+    backend.setup_output(pin)
+    start = time.perf_counter()
+    for i in range(toggles):
+        backend.write(pin, i & 1)
+    rate = toggles / (time.perf_counter() - start)
+    backend.write(pin, 0)
+
+    jitter = None
+    if loopback_pin is not None:
+        buffer = EdgeBuffer()
+        stop_capture = backend.capture(loopback_pin, buffer)
+        pwm = backend.start_pwm(pin, frequency, duty)
+        time.sleep(seconds)
+        stop_capture()  # 先停止記錄，停止 PWM 時被截斷的最後一個脈衝不列入
+        pwm.stop()
+        jitter = analyze(buffer, frequency, duty)
+    return BenchmarkResult(backend.name, rate, jitter, None)
+
+
+def _score(result):
+    """越小越好：有量到抖動時以脈寬誤差 p99 為準，否則以切換速率為準"""
+    if result.jitter is not None and result.jitter['width'] is not None:
+        return (0, result.jitter['width']['percentiles'][99])
+    return (1, -result.toggles_per_second)
+
+
+def format_benchmark(result):
+    if result.error is not None:
+        return f"{result.name:8} 無法使用: {result.error}"
+    line = f"{result.name:8} 切換 {result.toggles_per_second:>10,.0f} 次/秒"
+    width = result.jitter and result.jitter['width']
+    if width:
+        p = width['percentiles']
+        line += f"，脈寬誤差 p50 {p[50]:.1f} µs / p99 {p[99]:.1f} µs / max {width['max']:.1f} µs"
+    return line
+
+
+def benchmark_backends(candidates, bench_pin, loopback_pin=None, **options):
+    """逐一開啟並測試後端，回傳 [(BenchmarkResult, 後端或 None)]，呼叫端負責關閉後端"""
+    pairs = []
+    for candidate in candidates:
+        try:
+            backend = open_pin_backend(candidate, **options)
+        except (ImportError, OSError, RuntimeError) as e:
+            pairs.append((BenchmarkResult(candidate, 0.0, None, e), None))
+            continue
+        try:
+            pairs.append((benchmark(backend, bench_pin, loopback_pin), backend))
+        except Exception as e:
+            # 例如輸入腳不支援邊緣事件，這個後端就不列入比較
+            backend.close()
+            pairs.append((BenchmarkResult(candidate, 0.0, None, e), None))
+    return pairs
+
+
+def report_benchmark(pairs, report=print):
+    """印出每個後端的結果並標出最好的，回傳最好的後端名稱 (都不能用時為 None)"""
+    measured = [result for result, backend in pairs if backend is not None]
+    best_name = min(measured, key=_score).name if measured else None
+    for result, _ in pairs:
+        mark = "👉" if result.name == best_name else "  "
+        report(f"{mark} {format_benchmark(result)}")
+    return best_name
+
+
+def select_pin_backend(name=None, bench_pin=None, loopback_pin=None, candidates=BACKENDS,
+                       report=print, **options):
+    """開啟後端
+
+    name: 後端名稱，None 時讀取環境變數 RPI_PIN_BACKEND (預設 auto)
+    auto 時沒有 bench_pin 就依優先順序開啟第一個可用的後端；
+    有 bench_pin 時對每個可用的後端跑 benchmark()，用 report 印出結果並挑最好的
+    bench_pin / loopback_pin 沒有指定時讀取環境變數 RPI_PIN_BENCH_PIN / RPI_PIN_LOOPBACK_PIN
+    mock 只在其他後端都不能用時才會被選上，這時會印出警告 (不會輸出任何實際訊號)
+    """
+    name = name or os.environ.get('RPI_PIN_BACKEND', 'auto')
+    if bench_pin is None:
+        bench_pin = _env_pin('RPI_PIN_BENCH_PIN')
+    if loopback_pin is None:
+        loopback_pin = _env_pin('RPI_PIN_LOOPBACK_PIN')
+    if name != 'auto':
+        return open_pin_backend(name, **options)
+
+    hardware = [c for c in candidates if c != 'mock']
+    fallback = [c for c in candidates if c == 'mock']
+    for group in (hardware, fallback):
+        backend = _select_from(group, bench_pin, loopback_pin, report, **options)
+        if backend is None:
+            continue
+        if group is fallback and hardware:
+            print(f"⚠️ 沒有可用的 GPIO 後端 ({', '.join(hardware)})，改用 mock：腳位不會輸出任何訊號 "
+                  "(設定 RPI_PIN_BACKEND=mock 可以明確指定並略過這個警告)")
+        return backend
+    raise RuntimeError("沒有可用的 GPIO 後端")
+
+
+def _select_from(group, bench_pin, loopback_pin, report, **options):
+    """從一組候選中開啟第一個可用的 (或 benchmark 最好的) 後端，都不能用時回傳 None"""
+    if bench_pin is None:
+        for candidate in group:
+            try:
+                return open_pin_backend(candidate, **options)
+            except (ImportError, OSError, RuntimeError):
+                continue
+        return None
+
+    pairs = benchmark_backends(group, bench_pin, loopback_pin, **options)
+    best_name = report_benchmark(pairs, report or (lambda line: None))
+    best = None
+    for result, backend in pairs:
+        if backend is None:
+            continue
+        if result.name == best_name:
+            best = backend
+        else:
+            backend.close()
+    return best
+
+
+def _env_pin(variable):
+    value = os.environ.get(variable)
+    return int(value) if value else None
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="GPIO / PWM 後端微基準測試")
+    parser.add_argument('--bench-pin', type=int, default=21, help="測試用的輸出腳 (BCM，預設 21，不要接馬達)")
+    parser.add_argument('--loopback-pin', type=int, default=None, help="和測試腳接在一起的輸入腳 (量 PWM 抖動)")
+    parser.add_argument('--backends', default=','.join(BACKENDS), help=f"要測試的後端 (預設 {','.join(BACKENDS)})")
+    parser.add_argument('--fake-pigpiod', action='store_true', help="啟動本機的假 pigpiod 給 pigpio 後端使用")
+    return parser.parse_args()
+
+
+# 主程式區塊
+if __name__ == '__main__':
+    args = parse_args()
+    options = {}
+    fake = None
+    loopback_pin = args.loopback_pin
+    if args.fake_pigpiod:
+        from .fake_pigpiod import FakePigpiod
+        loopback_pin = 20 if loopback_pin is None else loopback_pin
+        fake = FakePigpiod(loopback={args.bench_pin: loopback_pin})
+        options.update(host='127.0.0.1', port=fake.start())
+    if loopback_pin is not None:
+        options['loopback'] = {args.bench_pin: loopback_pin}
+
+    print(f"📏 GPIO 後端微基準測試 (輸出 GPIO {args.bench_pin}，loopback {loopback_pin})")
+    candidates = [name.strip() for name in args.backends.split(',') if name.strip()]
+    pairs = benchmark_backends(candidates, args.bench_pin, loopback_pin, **options)
+    try:
+        report_benchmark(pairs)
+    finally:
+        for _, backend in pairs:
+            if backend is not None:
+                backend.close()
+        if fake is not None:
+            fake.stop()
@@ -0,0 +1,45 @@
+"""
+七段顯示器與 LED 的接線 (BCM 腳位編號)
+display daemon 與所有 client 程式共用這一份定義，改接線時只需要改這裡
+"""
+
+# 定義第一個七段顯示器 a~g 對應到的 GPIO 腳位 (左邊那個)
+SEG_PINS_1 = {
+    'a': 11,   # 紅色線
+    'b': 0,    # 綠色線
+    'c': 5,    # 咖啡色線
+    'd': 6,    # 紫色線
+    'e': 13,   # 黃色線
+    'f': 19,   # 白色線
+    'g': 26,   # 橘色線
+    'dp': 21,  # 灰色線，控制小數點
+}
+
+# 定義第二個七段顯示器 a~g 對應到的 GPIO 腳位 (右邊那個)
+SEG_PINS_2 = {
+    'a': 25,   # 藍色線
+    'b': 8,   # 綠色線
+    'c': 7,   # 咖啡色線
+    'd': 1,   # 紫色線
+    'e': 12,  # 黃色線
+    'f': 16,  # 白色線
+    'g': 20,  # 橘色線
+}
+
+# 定義LED的GPIO腳位
+LED_PIN = 14  # LED接在GPIO14
+
+
+def wiring_mismatches(expected, actual):
+    """比對兩組接線 (seg_pins_1, seg_pins_2, led_pin)，回傳不一致的說明列表
+
+    expected 只需要列出自己用到的段位 (例如只用左邊顯示器、沒有 dp)，led_pin 為 None 時不比對 LED
+    """
+    mismatches = []
+    for monitor, (pins, other) in enumerate(zip(expected[:2], actual[:2]), 1):
+        for seg, pin in pins.items():
+            if other.get(seg) != pin:
+                mismatches.append(f"顯示器 {monitor} 的 {seg} 段: 指定 GPIO{pin}，實際 GPIO{other.get(seg)}")
+    if expected[2] is not None and expected[2] != actual[2]:
+        mismatches.append(f"LED: 指定 GPIO{expected[2]}，實際 GPIO{actual[2]}")
+    return mismatches
@@ -0,0 +1,299 @@
+"""
+PWM 時序抖動量測
+把 PWM 輸出接回一個輸入腳 (loopback)，或用不接硬體的 MockPwm 直接記錄每次電位變化的時間，
+在有 / 沒有背景負載的情況下比較週期與脈寬的誤差百分位數，用來挑選部署板子上的 PWM 後端
+
+邊緣時間存在預先配置的 array 中 (EdgeBuffer)，記錄時不會配置新物件，
+分析時再用 NumPy 直接讀取同一塊記憶體
+
+用法: python -m rpi_drivers.pwm_jitter --backend mock --freq 50 --duty 7.5 --load threads
+      python -m rpi_drivers.pwm_jitter --backend rpigpio --out-pin 18 --in-pin 23  (18 與 23 用杜邦線接起來)
+"""
+
+import argparse
+import multiprocessing
+import os
+import threading
+import time
+from array import array
+
+import numpy as np
+
+BACKENDS = ('mock', 'rpigpio', 'gpiozero')
+LOADS = ('none', 'threads', 'processes')
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+class EdgeBuffer:
+    """固定容量的邊緣紀錄 (時間 ns, 電位)，滿了之後的邊緣只計入 dropped"""
+
+    def __init__(self, capacity=200_000):
+        self.capacity = capacity
+        self.times = array('q', bytes(8 * capacity))
+        self.levels = array('b', bytes(capacity))
+        self.count = 0
+        self.dropped = 0
+
+    def record(self, level, t_ns=None):
+        """記錄一個邊緣 (由單一執行緒呼叫：MockPwm 的執行緒或 RPi.GPIO 的事件執行緒)"""
+        if t_ns is None:
+            t_ns = time.perf_counter_ns()
+        i = self.count
+        if i >= self.capacity:
+            self.dropped += 1
+            return
+        self.times[i] = t_ns
+        self.levels[i] = level
+        self.count = i + 1
+
+    def clear(self):
+        self.count = 0
+        self.dropped = 0
+
+    def edges(self):
+        """回傳 (時間, 電位) 兩個 NumPy 陣列，與 array 共用記憶體 (不複製)"""
+        times = np.frombuffer(self.times, dtype=np.int64, count=self.count)
+        levels = np.frombuffer(self.levels, dtype=np.int8, count=self.count)
+        return times, levels
+
+
+def analyze(buffer, frequency, duty):
+    """計算週期與脈寬 (µs) 以及與設定值的誤差百分位數"""
+    times, levels = buffer.edges()
+    if len(times):
+        # loopback 可能漏掉或重複記錄邊緣，只保留電位真的有變化的紀錄
+        keep = np.concatenate(([True], levels[1:] != levels[:-1]))
+        times, levels = times[keep], levels[keep]
+    rising = np.flatnonzero(levels == 1)
+    periods = np.diff(times[rising]) / 1000
+    rising = rising[rising + 1 < len(times)]
+    widths = (times[rising + 1] - times[rising]) / 1000
+
+    nominal_period = 1e6 / frequency
+    nominal_width = nominal_period * duty / 100
+    return {
+        'edges': buffer.count,
+        'dropped': buffer.dropped,
+        'period': _summary(periods, nominal_period),
+        'width': _summary(widths, nominal_width),
+    }
+
+
+def _summary(values, nominal):
+    if len(values) == 0:
+        return None
+    error = np.abs(values - nominal)
+    return {
+        'nominal': nominal,
+        'mean': float(values.mean()),
+        'count': len(values),
+        'percentiles': dict(zip(PERCENTILES, np.percentile(error, PERCENTILES).tolist())),
+        'max': float(error.max()),
+    }
+
+
+def format_result(label, result):
+    """把 analyze() 的結果排成文字"""
+    lines = [f"{label}: 邊緣 {result['edges']} 個" + (f"，遺失 {result['dropped']} 個" if result['dropped'] else "")]
+    for key, name in (('period', '週期'), ('width', '脈寬')):
+        summary = result[key]
+        if summary is None:
+            lines.append(f"  {name}: 沒有資料")
+            continue
+        percentiles = "  ".join(f"p{p:g} {v:.1f}" for p, v in summary['percentiles'].items())
+        lines.append(f"  {name} {summary['nominal']:.0f} µs (平均 {summary['mean']:.1f})，"
+                     f"誤差 µs: {percentiles}  max {summary['max']:.1f}")
+    return "\n".join(lines)
+
+
+class MockPwm:
+    """不接硬體的軟體 PWM，介面與 RPi.GPIO 的 PWM 物件相同
+
+    和 RPi.GPIO 一樣由一條執行緒以 sleep 切換電位，每次切換呼叫 sink(level, t_ns)，
+    所以量到的是 Python 執行緒排程造成的抖動
+    """
+
+    def __init__(self, sink, frequency):
+        self.sink = sink
+        self.frequency = frequency
+        self.duty = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self, duty):
+        self.duty = duty
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def ChangeDutyCycle(self, duty):
+        self.duty = duty
+
+    def ChangeFrequency(self, frequency):
+        self.frequency = frequency
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            period = 1.0 / self.frequency
+            on = period * self.duty / 100
+            if on > 0:
+                self.sink(1, time.perf_counter_ns())
+                time.sleep(on)
+            if on < period:
+                self.sink(0, time.perf_counter_ns())
+                time.sleep(period - on)
+
+
+class _GpiozeroPwm:
+    """讓 gpiozero 的 PWMOutputDevice 有和 RPi.GPIO PWM 相同的 start / stop 介面"""
+
+    def __init__(self, pin, frequency):
+        from gpiozero import PWMOutputDevice
+        self.device = PWMOutputDevice(pin, frequency=frequency)
+
+    def start(self, duty):
+        self.device.value = duty / 100
+
+    def ChangeDutyCycle(self, duty):
+        self.device.value = duty / 100
+
+    def stop(self):
+        self.device.value = 0
+
+
+class LoopbackCapture:
+    """以 RPi.GPIO 的邊緣事件記錄輸入腳的每次變化"""
+
+    def __init__(self, gpio, pin, buffer):
+        self.gpio = gpio
+        self.pin = pin
+        self.buffer = buffer
+        gpio.setup(pin, gpio.IN, pull_up_down=gpio.PUD_DOWN)
+        gpio.add_event_detect(pin, gpio.BOTH, callback=self._edge)
+
+    def _edge(self, channel):
+        t_ns = time.perf_counter_ns()
+        self.buffer.record(self.gpio.input(channel), t_ns)
+
+    def close(self):
+        self.gpio.remove_event_detect(self.pin)
+
+
+def _spin(stop):
+    """背景負載：一直做運算直到 stop 被設定"""
+    x = 0
+    while not stop.is_set():
+        for _ in range(10_000):
+            x = (x * 31 + 7) & 0xFFFF
+
+
+class BackgroundLoad:
+    """背景 CPU 負載
+
+    threads:   同一行程的執行緒，會和軟體 PWM 搶 GIL
+    processes: 獨立行程，會和軟體 PWM 搶 CPU 核心
+    """
+
+    def __init__(self, kind='threads', workers=None):
+        if kind not in LOADS:
+            raise ValueError(f"kind 必須是 {', '.join(LOADS)} 其中之一")
+        self.kind = kind
+        self.workers = workers or os.cpu_count() or 1
+        self._stop = None
+        self._workers = []
+
+    def __enter__(self):
+        if self.kind == 'threads':
+            self._stop = threading.Event()
+            self._workers = [threading.Thread(target=_spin, args=(self._stop,), daemon=True)
+                             for _ in range(self.workers)]
+        elif self.kind == 'processes':
+            self._stop = multiprocessing.Event()
+            self._workers = [multiprocessing.Process(target=_spin, args=(self._stop,), daemon=True)
+                             for _ in range(self.workers)]
+        for worker in self._workers:
+            worker.start()
+        return self
+
+    def __exit__(self, *exc):
+        if self._stop is not None:
+            self._stop.set()
+        for worker in self._workers:
+            worker.join()
+        self._workers = []
+
+    def describe(self):
+        return "無背景負載" if self.kind == 'none' else f"背景負載 {self.kind} x{self.workers}"
+
+
+def measure(pwm, buffer, duty, seconds):
+    """啟動 PWM 跑 seconds 秒，邊緣記錄在 buffer 中"""
+    buffer.clear()
+    pwm.start(duty)
+    time.sleep(seconds)
+    pwm.stop()
+
+
+def run(pwm, buffer, frequency, duty, seconds, load='threads', workers=None):
+    """先在無負載下量一次，再在背景負載下量一次，回傳 [(說明, 結果), ...]"""
+    results = []
+    loads = [BackgroundLoad('none')]
+    if load != 'none':
+        loads.append(BackgroundLoad(load, workers))
+    for background in loads:
+        with background:
+            measure(pwm, buffer, duty, seconds)
+        results.append((background.describe(), analyze(buffer, frequency, duty)))
+    return results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="PWM 時序抖動量測")
+    parser.add_argument('--backend', choices=BACKENDS, default='mock', help="PWM 後端 (預設 mock)")
+    parser.add_argument('--out-pin', type=int, default=18, help="PWM 輸出腳位 (BCM，預設 18)")
+    parser.add_argument('--in-pin', type=int, default=23, help="loopback 輸入腳位 (BCM，預設 23)")
+    parser.add_argument('--freq', type=float, default=50, help="PWM 頻率 (預設 50 Hz)")
+    parser.add_argument('--duty', type=float, default=7.5, help="duty cycle %% (預設 7.5)")
+    parser.add_argument('--seconds', type=float, default=5, help="每個階段量測秒數 (預設 5)")
+    parser.add_argument('--load', choices=LOADS, default='threads', help="背景負載種類 (預設 threads)")
+    parser.add_argument('--workers', type=int, default=None, help="背景負載數量 (預設 CPU 核心數)")
+    return parser.parse_args()
+
+
+# 主程式區塊
+if __name__ == '__main__':
+    args = parse_args()
+    buffer = EdgeBuffer()
+    GPIO = None
+    capture = None
+    if args.backend == 'mock':
+        pwm = MockPwm(buffer.record, args.freq)
+    else:
+        import RPi.GPIO as GPIO
+        GPIO.setmode(GPIO.BCM)
+        capture = LoopbackCapture(GPIO, args.in_pin, buffer)
+        if args.backend == 'rpigpio':
+            GPIO.setup(args.out_pin, GPIO.OUT)
+            pwm = GPIO.PWM(args.out_pin, args.freq)
+        else:
+            pwm = _GpiozeroPwm(args.out_pin, args.freq)
+
+    print(f"📏 {args.backend} PWM {args.freq:g} Hz / {args.duty:g}%，每個階段 {args.seconds:g} 秒")
+    try:
+        for label, result in run(pwm, buffer, args.freq, args.duty, args.seconds, args.load, args.workers):
+            print(format_result(label, result))
+
+    # 捕捉 Ctrl+C 中斷，做清理
+    except KeyboardInterrupt:
+        print("\n程式被中斷")
+    finally:
+        if capture is not None:
+            capture.close()
+        if GPIO is not None:
+            GPIO.cleanup()   # 清理 GPIO 狀態
@@ -0,0 +1,95 @@
+"""
+亂數畫面產生與播放
+用 NumPy 一次產生一整塊亂數畫面 (打包好的 16-bit 段位遮罩)，播放迴圈只需要依序取出並寫到硬體，
+每一幀不再呼叫 random.randint / random.choice，轉速可以拉高到每秒數百幀
+"""
+
+import time
+
+import numpy as np
+
+from .segment_driver import DIGIT_MASKS, DP_BIT
+from .ticker import Ticker
+
+# 0~9 的段位遮罩，讓 NumPy 可以直接用數字陣列查表
+DIGIT_MASK_ARRAY = np.array([DIGIT_MASKS[n] for n in range(10)], dtype=np.uint16)
+
+
+def random_frame_block(rng, size, dp_left=True):
+    """產生 size 個亂數畫面 (uint16 陣列，低 8 bits 左邊，高 8 bits 右邊)
+
+    dp_left: 左邊顯示器的小數點是否也隨機 (只有第一個顯示器有小數點)
+    """
+    digits1 = rng.integers(0, 10, size=size)
+    digits2 = rng.integers(0, 10, size=size)
+    frames = DIGIT_MASK_ARRAY[digits1] | (DIGIT_MASK_ARRAY[digits2] << 8)
+    if dp_left:
+        frames |= rng.integers(0, 2, size=size, dtype=np.uint16) * np.uint16(DP_BIT)
+    return frames
+
+
+class RandomFrameSource:
+    """無限的亂數畫面來源，每次用完一塊就再產生下一塊"""
+
+    def __init__(self, block_size=1024, seed=None, dp_left=True):
+        self.block_size = block_size
+        self.dp_left = dp_left
+        self.rng = np.random.default_rng(seed)
+        self.blocks = 0
+        self.generate_ns = 0  # 產生亂數塊的累計時間
+
+    def __iter__(self):
+        while True:
+            start = time.perf_counter_ns()
+            block = random_frame_block(self.rng, self.block_size, self.dp_left)
+            # 轉成 Python int 列表，播放時取值不需要經過 NumPy scalar
+            frames = block.tolist()
+            self.generate_ns += time.perf_counter_ns() - start
+            self.blocks += 1
+            yield from frames
+
+
+class FramePlayer:
+    """以固定幀率把畫面來源播放到 FrameBuffer
+
+    fps:     每秒幾幀，由 Ticker 依絕對時間排程，來不及時略過錯過的幀
+    source:  可迭代的 16-bit 畫面，預設為 RandomFrameSource()
+    """
+
+    def __init__(self, framebuffer, fps=200.0, source=None):
+        self.framebuffer = framebuffer
+        self.fps = fps
+        self.source = source if source is not None else RandomFrameSource()
+        self.ticker = None
+
+        # 統計
+        self.frames = 0
+        self.cpu_ns = 0  # 播放執行緒實際使用的 CPU 時間 (time.thread_time_ns)
+
+    def run(self, stop_event):
+        """播放直到 stop_event 被設定或 framebuffer 被凍結"""
+        self.ticker = Ticker(1.0 / self.fps)
+        driver = self.framebuffer.driver
+        frames = iter(self.source)
+        cpu_start = time.thread_time_ns()
+        try:
+            while self.ticker.wait(stop_event=stop_event) is not None:
+                if self.framebuffer.flip_frame(next(frames)) is None:  # 已經凍結
+                    break
+                driver.end_frame()  # 統計這一幀實際寫入的腳位數
+                self.frames += 1
+        finally:
+            self.cpu_ns += time.thread_time_ns() - cpu_start
+
+    def cpu_us_per_frame(self):
+        """平均每幀使用的 CPU 時間 (µs)，包含亂數產生、寫入 GPIO 與排程"""
+        if not self.frames:
+            return 0.0
+        return self.cpu_ns / self.frames / 1000
+
+    def report(self):
+        """統計摘要"""
+        text = f"播放 {self.frames} 幀 ({self.fps:g} fps)，每幀 CPU {self.cpu_us_per_frame():.1f} µs"
+        if self.ticker is not None:
+            text += f"，{self.ticker.report()}"
+        return text
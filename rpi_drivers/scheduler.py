@@ -0,0 +1,168 @@
+"""
+單一執行緒的截止時間排程器
+所有計時工作放在同一個 min-heap，依 time.monotonic() 的絕對截止時間執行，
+不論排了多少工作都只有一個背景執行緒
+"""
+
+import heapq
+import itertools
+import threading
+import time
+
+
+class TimerHandle:
+    """排程工作的控制代碼，可以取消或重新排程"""
+
+    __slots__ = ('deadline', 'callback', 'args', 'cancelled', '_seq', '_scheduler')
+
+    def __init__(self, scheduler, deadline, callback, args):
+        self._scheduler = scheduler
+        self.deadline = deadline
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+        self._seq = None  # 目前在 heap 中有效項目的序號，None 表示沒有在排程中
+
+    @property
+    def active(self):
+        """是否還在等待執行"""
+        return self._seq is not None
+
+    def cancel(self):
+        """取消這個工作"""
+        self._scheduler.cancel(self)
+
+    def reschedule(self, delay):
+        """改成 delay 秒後執行 (已執行或已取消的工作也可以重新排入)"""
+        self._scheduler.reschedule(self, delay)
+
+
+class DeadlineScheduler:
+    """以 min-heap 管理截止時間的排程器
+
+    heap 內放 (deadline, 序號, handle)，取消或重新排程時不從 heap 中刪除，
+    而是更新 handle 記錄的有效序號讓舊項目失效 (lazy deletion)，兩者都是 O(log n) 以內
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+        self._stale = 0  # heap 中已失效的項目數
+
+    # ---- 排程 API ----
+
+    def call_at(self, deadline, callback, *args):
+        """在 time.monotonic() 到達 deadline 時執行 callback"""
+        handle = TimerHandle(self, deadline, callback, args)
+        with self._cond:
+            self._push(handle)
+        return handle
+
+    def call_later(self, delay, callback, *args):
+        """delay 秒後執行 callback"""
+        return self.call_at(time.monotonic() + delay, callback, *args)
+
+    def reschedule(self, handle, delay):
+        """把工作改到 delay 秒後執行"""
+        with self._cond:
+            if handle.active:
+                self._stale += 1
+            handle.cancelled = False
+            handle.deadline = time.monotonic() + delay
+            self._push(handle)
+            self._maybe_compact()
+
+    def cancel(self, handle):
+        """取消工作"""
+        with self._cond:
+            if not handle.active:
+                return
+            handle.cancelled = True
+            handle._seq = None
+            self._stale += 1
+            self._maybe_compact()
+
+    def pending(self):
+        """還在等待執行的工作數"""
+        with self._cond:
+            return len(self._heap) - self._stale
+
+    # ---- 執行緒 ----
+
+    def start(self):
+        """啟動排程執行緒 (第一次排入工作時也會自動啟動)"""
+        with self._cond:
+            self._start_locked()
+
+    def stop(self):
+        """停止排程執行緒，尚未執行的工作全部丟棄"""
+        with self._cond:
+            self._running = False
+            for _, seq, handle in self._heap:
+                if seq == handle._seq:
+                    handle._seq = None
+            self._heap.clear()
+            self._stale = 0
+            self._cond.notify()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def _start_locked(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _push(self, handle):
+        handle._seq = next(self._counter)
+        entry = (handle.deadline, handle._seq, handle)
+        heapq.heappush(self._heap, entry)
+        self._start_locked()
+        # 新工作排在最前面時叫醒執行緒重新計算等待時間
+        if self._heap[0] is entry:
+            self._cond.notify()
+
+    def _compact(self):
+        self._heap = [entry for entry in self._heap if entry[1] == entry[2]._seq]
+        heapq.heapify(self._heap)
+        self._stale = 0
+
+    def _maybe_compact(self):
+        # 失效項目超過一半時重建 heap，避免大量取消或改期後 heap 一直長大
+        if self._stale > 64 and self._stale * 2 > len(self._heap):
+            self._compact()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                handle = None
+                while self._running:
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    deadline, seq, candidate = self._heap[0]
+                    if seq != candidate._seq:
+                        heapq.heappop(self._heap)  # 已取消或已重新排程的舊項目
+                        self._stale -= 1
+                        continue
+                    remaining = deadline - time.monotonic()
+                    if remaining > 0:
+                        self._cond.wait(remaining)
+                        continue
+                    heapq.heappop(self._heap)
+                    candidate._seq = None  # 標記為已執行
+                    handle = candidate
+                    break
+                if handle is None:
+                    return
+
+            # 在鎖外執行 callback，callback 裡可以再排程或取消其他工作
+            try:
+                handle.callback(*handle.args)
+            except Exception as e:
+                print(f"排程工作發生錯誤: {e}")
@@ -0,0 +1,224 @@
+"""
+七段顯示器驅動 (共陰極：HIGH=亮)
+每個顯示器保留一份影子暫存器 (shadow register)，只寫入電位有改變的腳位
+"""
+
+import threading
+import time
+
+# 段位順序：bit 0~7 依序對應 a, b, c, d, e, f, g, dp
+SEGMENTS = ('a', 'b', 'c', 'd', 'e', 'f', 'g', 'dp')
+SEGMENT_BITS = {seg: 1 << i for i, seg in enumerate(SEGMENTS)}
+DP_BIT = SEGMENT_BITS['dp']
+
+# 定義 0~9 ，每個元組代表 a~g 七段的亮滅狀態
+# True/1 = 點亮，False/0 = 熄滅（共陰極：HIGH=亮）
+DIGITS = {
+    0: (1,1,1,1,1,1,0),  # 顯示 0
+    1: (0,1,1,0,0,0,0),  # 顯示 1
+    2: (1,1,0,1,1,0,1),  # 顯示 2
+    3: (1,1,1,1,0,0,1),  # 顯示 3
+    4: (0,1,1,0,0,1,1),  # 顯示 4
+    5: (1,0,1,1,0,1,1),  # 顯示 5
+    6: (1,0,1,1,1,1,1),  # 顯示 6
+    7: (1,1,1,0,0,0,0),  # 顯示 7
+    8: (1,1,1,1,1,1,1),  # 顯示 8
+    9: (1,1,1,1,0,1,1),  # 顯示 9
+}
+
+def pattern_to_mask(pattern, dp=False):
+    """將 a~g 的亮滅元組轉換為位元遮罩"""
+    mask = 0
+    for i, val in enumerate(pattern):
+        if val:
+            mask |= 1 << i
+    if dp:
+        mask |= DP_BIT
+    return mask
+
+# 由 DIGITS 預先算好 0~9 的位元遮罩表
+DIGIT_MASKS = {n: pattern_to_mask(pattern) for n, pattern in DIGITS.items()}
+
+def segments_to_mask(segments):
+    """將段位名稱字串 (例如 'abcefg') 轉換為位元遮罩"""
+    mask = 0
+    for seg in segments:
+        mask |= SEGMENT_BITS[seg]
+    return mask
+
+# 可顯示的字元 (數字、十六進位字母、負號、空白)
+CHAR_MASKS = {str(n): mask for n, mask in DIGIT_MASKS.items()}
+CHAR_MASKS.update({
+    'A': segments_to_mask('abcefg'),
+    'b': segments_to_mask('cdefg'),
+    'C': segments_to_mask('adef'),
+    'd': segments_to_mask('bcdeg'),
+    'E': segments_to_mask('adefg'),
+    'F': segments_to_mask('aefg'),
+    'H': segments_to_mask('bcefg'),
+    'L': segments_to_mask('def'),
+    '-': segments_to_mask('g'),
+    ' ': 0,
+})
+# 十六進位字母大小寫共用同一個字形
+for upper, lower in zip('ABCDEF', 'abcdef'):
+    glyph = CHAR_MASKS.get(upper, CHAR_MASKS.get(lower))
+    CHAR_MASKS[upper] = CHAR_MASKS[lower] = glyph
+
+def pack_frame(mask1, mask2):
+    """把兩個顯示器的段位遮罩打包成 16-bit 畫面 (低 8 bits 左邊，高 8 bits 右邊)"""
+    return (mask1 & 0xFF) | ((mask2 & 0xFF) << 8)
+
+def unpack_frame(frame):
+    """把 16-bit 畫面拆回 (左邊遮罩, 右邊遮罩)"""
+    return frame & 0xFF, (frame >> 8) & 0xFF
+
+
+def build_bank_table(pins):
+    """預先算好 256 種段位遮罩對應的 BCM 腳位遮罩 (bit n = GPIO n)"""
+    # pins: {'a': 11, 'b': 0, ...}，沒接線的段位 (例如右邊顯示器的 dp) 直接省略
+    pin_bits = [(SEGMENT_BITS[seg], 1 << pin) for seg, pin in pins.items()]
+    table = []
+    for mask in range(256):
+        word = 0
+        for bit, pin_bit in pin_bits:
+            if mask & bit:
+                word |= pin_bit
+        table.append(word)
+    return table
+
+
+class SegmentDisplay:
+    """兩位數顯示器的共用介面 (左邊 monitor 1 有 dp，右邊 monitor 2 沒有)
+
+    子類別只需要實作 _apply(mask1, mask2)，把畫面送出並回傳這次改變的段位數；
+    顯示數字、逐幀統計等功能都建立在 write_masks() 上。
+    """
+
+    def __init__(self):
+        self.masks = {1: 0, 2: 0}
+        self._lock = threading.Lock()
+        # 累計統計：改變的腳位數、寫入耗時
+        self.pin_writes = 0
+        self.write_ns = 0
+        # 每幀的寫入統計
+        self.frames = 0
+        self.last_frame_writes = 0
+        self.last_frame_write_ns = 0
+        self._frame_start = (0, 0)
+        self._stats_base = (0, 0)
+
+    def _apply(self, mask1, mask2):
+        raise NotImplementedError
+
+    def write_masks(self, mask1, mask2):
+        """一次寫入兩個顯示器的段位遮罩，回傳這次改變的腳位數"""
+        # 主執行緒與計時器執行緒都可能寫入，影子暫存器與硬體必須一起更新
+        with self._lock:
+            return self._write_locked(mask1 & 0xFF, mask2 & 0xFF)
+
+    def _write_one(self, monitor_number, mask):
+        """只換掉一個顯示器的遮罩；另一個顯示器的遮罩在同一把鎖內讀取，不會蓋掉其他執行緒剛寫入的畫面"""
+        with self._lock:
+            masks = dict(self.masks)
+            masks[monitor_number] = mask & 0xFF
+            return self._write_locked(masks[1], masks[2])
+
+    def _write_locked(self, mask1, mask2):
+        self.masks[1] = mask1
+        self.masks[2] = mask2
+        start = time.perf_counter_ns()
+        writes = self._apply(mask1, mask2)
+        if writes:
+            self.write_ns += time.perf_counter_ns() - start
+            self.pin_writes += writes
+        return writes
+
+    def show_mask(self, monitor_number, mask):
+        """直接寫入某個顯示器的段位遮罩"""
+        if monitor_number in (1, 2):
+            return self._write_one(monitor_number, mask)
+        return 0
+
+    def set_segments(self, monitor_number, a, b, c, d, e, f, g, dp):
+        """與舊版 set_segments() 相同的參數"""
+        return self.show_mask(monitor_number, pattern_to_mask((a, b, c, d, e, f, g), dp))
+
+    def show_digit(self, monitor_number, n, dp=False):
+        """顯示某個數字 (0~9)，查不到的數字全部熄滅"""
+        mask = DIGIT_MASKS.get(n, 0)
+        if dp:
+            mask |= DP_BIT  # monitor 2 沒有 dp 腳位，查表時會自動忽略
+        return self.show_mask(monitor_number, mask)
+
+    def show_pair(self, n1, n2, dp=False):
+        """同時更新兩個顯示器，n 為 None 表示該顯示器熄滅"""
+        mask1 = DIGIT_MASKS.get(n1, 0)
+        if dp:
+            mask1 |= DP_BIT
+        return self.write_masks(mask1, DIGIT_MASKS.get(n2, 0))
+
+    def show_frame(self, frame):
+        """寫入打包好的 16-bit 畫面"""
+        return self.write_masks(frame & 0xFF, (frame >> 8) & 0xFF)
+
+    def all_off(self):
+        """熄滅所有段位"""
+        return self.write_masks(0, 0)
+
+    def end_frame(self):
+        """結束一幀，回傳這一幀實際寫入的腳位數"""
+        writes, write_ns = self._frame_start
+        self.last_frame_writes = self.pin_writes - writes
+        self.last_frame_write_ns = self.write_ns - write_ns
+        self._frame_start = (self.pin_writes, self.write_ns)
+        self.frames += 1
+        return self.last_frame_writes
+
+    def average_writes_per_frame(self):
+        """平均每幀寫入的腳位數"""
+        if self.frames == 0:
+            return 0.0
+        return (self._frame_start[0] - self._stats_base[0]) / self.frames
+
+    def average_write_us_per_frame(self):
+        """平均每幀花在後端寫入的時間 (微秒)"""
+        if self.frames == 0:
+            return 0.0
+        return (self._frame_start[1] - self._stats_base[1]) / self.frames / 1000
+
+    def reset_stats(self):
+        """重置每幀統計"""
+        self.frames = 0
+        self.last_frame_writes = 0
+        self.last_frame_write_ns = 0
+        self._frame_start = (self.pin_writes, self.write_ns)
+        self._stats_base = self._frame_start
+
+
+class DualSegmentDriver(SegmentDisplay):
+    """兩個七段顯示器的 GPIO 驅動
+
+    backend 只需要提供 write(set_mask, clear_mask)，遮罩以 BCM 腳位編號為 bit。
+    影子暫存器記錄所有段位腳目前的電位，每次只送出有變化的腳位。
+    """
+
+    def __init__(self, backend, seg_pins_1, seg_pins_2):
+        super().__init__()
+        self.backend = backend
+        self.bank_tables = {
+            1: build_bank_table(seg_pins_1),
+            2: build_bank_table(seg_pins_2),
+        }
+        # 假設腳位已用 GPIO.setup(..., initial=GPIO.LOW) 初始化，所以影子暫存器從 0 開始
+        self.state = 0
+
+    def _apply(self, mask1, mask2):
+        tables = self.bank_tables
+        word = tables[1][mask1] | tables[2][mask2]
+        changed = word ^ self.state
+        if not changed:
+            return 0
+        self.backend.write(word & changed, self.state & changed)
+        self.state = word
+        return bin(changed).count('1')
@@ -0,0 +1,223 @@
+"""
+多工掃描七段顯示器 (N 位數，共陰極)
+所有位數共用 a~g、dp 段位線，每一位數有自己的選擇腳 (digit select)
+背景執行緒依絕對時間輪流點亮每一位數，每位數分到相同的點亮時間
+"""
+
+import threading
+import time
+
+from .segment_driver import CHAR_MASKS, DIGIT_MASKS, DP_BIT, build_bank_table
+
+
+def text_to_masks(text, digit_count):
+    """把數字字串轉成每一位數的段位遮罩 (靠右對齊)，小數點併入前一位數"""
+    masks = []
+    for ch in text:
+        if ch == '.':
+            if not masks or masks[-1] & DP_BIT:
+                masks.append(0)  # 開頭或連續的小數點自己佔一位
+            masks[-1] |= DP_BIT
+        elif ch in CHAR_MASKS:
+            masks.append(CHAR_MASKS[ch])
+        else:
+            raise ValueError(f"無法顯示的字元: {ch!r}")
+
+    if len(masks) > digit_count:
+        raise ValueError(f"{text} 超出 {digit_count} 位數的顯示範圍")
+    return [0] * (digit_count - len(masks)) + masks
+
+
+class MultiplexedDisplay:
+    """N 位數多工掃描顯示器
+
+    backend 與 DualSegmentDriver 相同，只需要提供 write(set_mask, clear_mask)
+    refresh_hz 是整個顯示器每秒完整掃描的次數，每一位數的點亮時間為 1 / (refresh_hz * N)
+    select_active_high: 選擇腳透過 NPN 電晶體驅動時為 True，直接接共陰極時為 False
+    """
+
+    def __init__(self, backend, segment_pins, digit_pins, refresh_hz=1000,
+                 select_active_high=True, spin_us=150):
+        self.backend = backend
+        self.digit_count = len(digit_pins)
+        self.refresh_hz = refresh_hz
+        self.spin_ns = spin_us * 1000  # 最後這段時間改用忙碌等待，time.sleep 的誤差太大
+
+        self.segment_table = build_bank_table(segment_pins)
+        self.segment_word = self.segment_table[0xFF]
+
+        # 每一位數的 (選擇時 set, 選擇時 clear)、(取消時 set, 取消時 clear)
+        self._select = []
+        self._deselect = []
+        for pin in digit_pins:
+            bit = 1 << pin
+            if select_active_high:
+                self._select.append((bit, 0))
+                self._deselect.append((0, bit))
+            else:
+                self._select.append((0, bit))
+                self._deselect.append((bit, 0))
+        # 所有位數都取消選擇 (active-low 時為 HIGH)
+        self._deselect_all = (sum(s for s, _ in self._deselect), sum(c for _, c in self._deselect))
+
+        # framebuffer：每一位數的段位遮罩，以及換算好的 BCM 腳位遮罩
+        # 整份 list 一次替換，掃描執行緒不需要上鎖也不會看到寫一半的畫面
+        self.masks = [0] * self.digit_count
+        self._words = [0] * self.digit_count
+
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        # 掃描統計
+        self.scans = 0
+        self.late_slots = 0
+        self.max_lag_ns = 0
+        self._started_ns = 0
+
+    # ---- framebuffer ----
+
+    def set_masks(self, masks):
+        """一次更新所有位數的段位遮罩 (由左到右)"""
+        if len(masks) != self.digit_count:
+            raise ValueError(f"需要 {self.digit_count} 位數的遮罩")
+        masks = [mask & 0xFF for mask in masks]
+        words = [self.segment_table[mask] for mask in masks]
+        self.masks = masks
+        self._words = words
+
+    def show_mask(self, monitor_number, mask):
+        """設定某一位數 (由左到右，從 1 開始) 的段位遮罩"""
+        if not 1 <= monitor_number <= self.digit_count:
+            return
+        masks = list(self.masks)
+        masks[monitor_number - 1] = mask
+        self.set_masks(masks)
+
+    def show_digit(self, monitor_number, n, dp=False):
+        """顯示某個數字 (0~9)，查不到的數字全部熄滅"""
+        mask = DIGIT_MASKS.get(n, 0)
+        if dp:
+            mask |= DP_BIT
+        self.show_mask(monitor_number, mask)
+
+    def display_number(self, number, decimals=None):
+        """顯示任意位數的數字，例如 1234、-5.2、"3.14" """
+        if isinstance(number, str):
+            text = number.strip()
+        elif decimals is not None:
+            text = f"{number:.{decimals}f}"
+        else:
+            text = str(number)
+        self.set_masks(text_to_masks(text, self.digit_count))
+
+    def all_off(self):
+        """熄滅所有位數"""
+        self.set_masks([0] * self.digit_count)
+
+    # ---- 掃描執行緒 ----
+
+    def start(self):
+        """啟動背景掃描執行緒"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._scan_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止掃描並關閉所有位數"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _scan_loop(self):
+        slot_ns = int(1_000_000_000 / (self.refresh_hz * self.digit_count))
+        write = self.backend.write
+        segment_word = self.segment_word
+        stop_event = self._stop_event
+        spin_ns = self.spin_ns
+
+        # 選擇腳的初始電位不一定是「未選擇」，先全部關掉，否則第一輪掃描時其他位數也會亮 (殘影)
+        write(*self._deselect_all)
+
+        self._started_ns = time.monotonic_ns()
+        deadline = self._started_ns
+        previous = None
+
+        while not stop_event.is_set():
+            words = self._words
+            for index in range(self.digit_count):
+                # 1. 先關掉上一位數，避免段位切換時出現殘影
+                if previous is not None:
+                    write(*self._deselect[previous])
+
+                # 2. 寫入這一位數的段位並選擇這一位數 (backend 會先清除再設定)
+                word = words[index]
+                select_set, select_clear = self._select[index]
+                write(word | select_set, (segment_word & ~word) | select_clear)
+                previous = index
+
+                # 3. 等到這一格的絕對截止時間，讓每一位數的點亮時間一致
+                deadline += slot_ns
+                now = time.monotonic_ns()
+                lag = now - deadline
+                if lag > 0:
+                    # 已經落後一整格以上就直接從現在重新對齊，不補掃
+                    self.late_slots += 1
+                    self.max_lag_ns = max(self.max_lag_ns, lag)
+                    if lag > slot_ns:
+                        deadline = now
+                    continue
+                if -lag > spin_ns:
+                    time.sleep((-lag - spin_ns) / 1_000_000_000)
+                while time.monotonic_ns() < deadline:
+                    pass
+
+            self.scans += 1
+
+        # 結束時關閉目前位數與所有段位
+        if previous is not None:
+            write(*self._deselect[previous])
+        write(0, segment_word)
+
+    def measured_refresh_hz(self):
+        """實際量到的完整掃描頻率"""
+        elapsed = time.monotonic_ns() - self._started_ns
+        if self.scans == 0 or elapsed <= 0:
+            return 0.0
+        return self.scans * 1_000_000_000 / elapsed
+
+
+if __name__ == '__main__':
+    import RPi.GPIO as GPIO
+    from .gpio_bank import open_backend
+
+    GPIO.setmode(GPIO.BCM)
+
+    # 共用的段位線 (沿用左邊顯示器的接線)
+    SEG_PINS = {'a': 11, 'b': 0, 'c': 5, 'd': 6, 'e': 13, 'f': 19, 'g': 26, 'dp': 21}
+    # 每一位數的選擇腳 (由左到右)
+    DIGIT_PINS = [22, 23, 24, 27]
+    # 選擇腳透過 NPN 電晶體驅動為 True，直接接共陰極 (LOW=選擇) 為 False
+    SELECT_ACTIVE_HIGH = True
+
+    for pin in SEG_PINS.values():
+        GPIO.setup(pin, GPIO.OUT, initial=GPIO.LOW)
+    # 選擇腳一開始就設在「未選擇」的電位，避免所有位數同時點亮
+    for pin in DIGIT_PINS:
+        GPIO.setup(pin, GPIO.OUT, initial=GPIO.LOW if SELECT_ACTIVE_HIGH else GPIO.HIGH)
+
+    mux = MultiplexedDisplay(open_backend(GPIO), SEG_PINS, DIGIT_PINS, refresh_hz=1000,
+                             select_active_high=SELECT_ACTIVE_HIGH)
+    mux.start()
+    try:
+        for n in range(10000):
+            mux.display_number(n)
+            time.sleep(0.05)
+    except KeyboardInterrupt:
+        print("\n程式被中斷")
+    finally:
+        mux.stop()
+        print(f"掃描頻率: {mux.measured_refresh_hz():.0f} Hz，落後 {mux.late_slots} 格")
+        GPIO.cleanup()
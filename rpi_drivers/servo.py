@@ -0,0 +1,137 @@
+"""
+SG90 伺服馬達的角度換算
+web_control.py、servo_control_gpiozero.py 與 test_calibration.py 共用的校準表與換算，不需要硬體
+
+ServoMapping 把三層換算合成一個載入時預先展開的轉換：
+  校準表 (角度 -> 實測 duty cycle -> 脈衝寬度)
+  個別角度的微調 (gpiozero servo 值的偏移量，校準點之間線性內插)
+  gpiozero Servo 的脈衝範圍 (脈衝寬度 -> -1 ~ +1 的 servo 值)
+角度可以是純量或 NumPy 陣列，整條軌跡一次換算
+"""
+
+from array import array
+
+from .calibration import CalibrationTable
+
+# 伺服馬達校準表 (根據實際測試結果)
+SERVO_CALIBRATION = {
+    0: 12.60,
+    45: 11.00,
+    90: 7.30,
+    135: 4.50,
+    180: 2.20,
+}
+
+# 載入時展開成 0.1° 解析度的查表 (分段線性，和逐點掃描插值的結果相同)
+CALIBRATION_TABLE = CalibrationTable(SERVO_CALIBRATION, resolution=0.1)
+
+# SG90 在 gpiozero Servo 使用的脈衝範圍 (秒)
+MIN_PULSE_WIDTH = 0.5 / 1000
+MAX_PULSE_WIDTH = 2.5 / 1000
+
+
+class ServoMapping:
+    """角度 -> gpiozero servo 值 / 脈衝寬度的合成轉換
+
+    calibration: CalibrationTable (角度 -> duty cycle %)，None 表示依脈衝範圍線性換算
+                 (0度 = max_pulse_width = +1，180度 = min_pulse_width = -1)
+    offsets: {角度: servo 值偏移量}，None 表示不微調
+    min_pulse_width / max_pulse_width: gpiozero Servo 的脈衝範圍 (秒)
+    period: PWM 週期 (秒)，校準表的 duty cycle 以這個週期換算成脈衝寬度
+    超出範圍的結果固定在 -1 ~ +1 (也就是脈衝範圍的兩端)
+    """
+
+    def __init__(self, calibration=None, offsets=None, min_pulse_width=MIN_PULSE_WIDTH,
+                 max_pulse_width=MAX_PULSE_WIDTH, period=0.02, resolution=0.1):
+        if max_pulse_width <= min_pulse_width:
+            raise ValueError("max_pulse_width 必須大於 min_pulse_width")
+        if calibration is None:
+            calibration = CalibrationTable({0: max_pulse_width / period * 100,
+                                            180: min_pulse_width / period * 100}, resolution)
+        self.calibration = calibration
+        self.offsets = CalibrationTable(offsets, calibration.resolution) if offsets else None
+        self.min_pulse_width = min_pulse_width
+        self.max_pulse_width = max_pulse_width
+        self.period = period
+
+        self.start = calibration.start
+        self.stop = calibration.stop
+        self.resolution = calibration.resolution
+        self._scale = 1.0 / self.resolution
+        self._value_scale = 2.0 / (max_pulse_width - min_pulse_width)
+        # 每個格點的 servo 值 (已經套用微調並限制在 -1 ~ +1)
+        self.table = array('d', (self._compute(self.start + i * self.resolution)
+                                 for i in range(len(calibration))))
+        self._np_table = None
+
+    def _compute(self, angle):
+        duty = self.calibration.duty(angle)
+        offset = self.offsets.duty(angle) if self.offsets is not None else 0.0
+        value = (duty / 100 * self.period - self.min_pulse_width) * self._value_scale - 1 + offset
+        return max(-1.0, min(1.0, value))
+
+    def value(self, angle):
+        """角度對應的 gpiozero servo 值 (-1 ~ +1)，純量回傳 float，陣列回傳 NumPy 陣列"""
+        if not isinstance(angle, (int, float)):
+            return self._value_array(angle)
+        angle = min(max(angle, self.start), self.stop)
+        position = (angle - self.start) * self._scale
+        index = int(position + 0.5)
+        if abs(position - index) < 1e-6:
+            return self.table[index]
+        return self._compute(angle)
+
+    __call__ = value
+
+    def _value_array(self, angles):
+        """格點上的角度查表，其他角度以校準表的 duty_array 向量化計算"""
+        import numpy as np
+
+        if self._np_table is None:
+            self._np_table = np.frombuffer(self.table, dtype=np.float64)
+        angles = np.clip(np.asarray(angles, dtype=np.float64), self.start, self.stop)
+        position = (angles - self.start) * self._scale
+        index = np.rint(position).astype(np.intp)
+        result = self._np_table[index]
+
+        off_grid = np.abs(position - index) >= 1e-6
+        if off_grid.any():
+            between = angles[off_grid]
+            value = ((self.calibration.duty_array(between) / 100 * self.period - self.min_pulse_width)
+                     * self._value_scale - 1)
+            if self.offsets is not None:
+                value += self.offsets.duty_array(between)
+            result[off_grid] = np.clip(value, -1.0, 1.0)
+        return result
+
+    def pulse_width(self, angle):
+        """角度實際輸出的脈衝寬度 (秒)"""
+        return self.min_pulse_width + (self.value(angle) + 1) / self._value_scale
+
+    def duty_cycle(self, angle):
+        """角度實際輸出的 duty cycle (%)"""
+        return self.pulse_width(angle) / self.period * 100
+
+
+# web_control 等使用的預設轉換：SG90 校準表 + gpiozero 0.5~2.5ms 脈衝範圍
+SERVO_MAPPING = ServoMapping(CALIBRATION_TABLE)
+
+
+def get_calibrated_duty_cycle(target_angle):
+    """根據校準資料獲取角度對應的 duty cycle (查預先展開的 CALIBRATION_TABLE)"""
+    return CALIBRATION_TABLE.duty(target_angle)
+
+
+def angle_to_servo_value(angle):
+    """將角度轉換為 gpiozero Servo 的值 (依校準表)，角度可以是 NumPy 陣列"""
+    return SERVO_MAPPING.value(angle)
+
+
+def open_servo(pin, min_pulse_width=MIN_PULSE_WIDTH, max_pulse_width=MAX_PULSE_WIDTH, pin_factory=None):
+    """建立 gpiozero Servo (gpiozero 也是在這時才匯入)
+
+    pin_factory: pin_backends 後端的 pin_factory()，None 時使用 gpiozero 的預設值
+    """
+    from gpiozero import Servo
+    return Servo(pin, min_pulse_width=min_pulse_width, max_pulse_width=max_pulse_width,
+                 pin_factory=pin_factory)
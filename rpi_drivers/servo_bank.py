@@ -0,0 +1,263 @@
+"""
+多顆伺服馬達的 frame 同步輸出
+每顆馬達的 MotionController 只把脈衝寬度寫進 ServoBank 的緩衝，
+ServoBank 的執行緒每個 frame 把所有變更一次交給後端：
+  PCA9685ServoBackend  每顆 PCA9685 一筆 auto-increment I2C 交易 (16 個通道一起更新)
+  GpiozeroServoBackend 每個通道一個 gpiozero Servo (原本 GPIO 13 的做法，通道就是 BCM 腳位)
+同一個 frame 內同一通道寫了好幾次時只送最後一次
+
+用法: python -m rpi_drivers.servo_bank --fake --servos 16  (記憶體中的 I2C bus，不接硬體)
+"""
+
+import argparse
+import threading
+import time
+
+from .pca9685 import CHANNELS, DEFAULT_ADDRESS, PCA9685
+from .servo import MAX_PULSE_WIDTH, MIN_PULSE_WIDTH, open_servo
+
+SERVO_BACKENDS = ('gpiozero', 'pca9685')
+
+
+class PCA9685ServoBackend:
+    """一或多顆 PCA9685，通道編號 = 第幾顆 * 16 + 晶片上的通道"""
+
+    name = 'pca9685'
+
+    def __init__(self, bus, addresses=(DEFAULT_ADDRESS,), frequency=50):
+        self.bus = bus
+        self.chips = [PCA9685(bus, address, frequency) for address in addresses]
+        # 每個通道目前的脈衝寬度，寫入連續範圍時補上沒有變更的通道
+        self.pulse_widths = [None] * (CHANNELS * len(self.chips))
+
+    @property
+    def channels(self):
+        return len(self.pulse_widths)
+
+    def write_frame(self, changes):
+        """changes: {通道: 脈衝寬度 (秒) 或 None}，每顆晶片只送一筆交易"""
+        chips = {}
+        for channel, pulse_width in changes.items():
+            if not 0 <= channel < self.channels:
+                raise ValueError(f"通道必須在 0-{self.channels - 1} 之間")
+            self.pulse_widths[channel] = pulse_width
+            chips.setdefault(channel // CHANNELS, []).append(channel % CHANNELS)
+        for index, local in chips.items():
+            first, last = min(local), max(local)
+            base = index * CHANNELS
+            self.chips[index].write_channels(first, self.pulse_widths[base + first:base + last + 1])
+
+    def close(self):
+        for chip in self.chips:
+            chip.sleep()
+        self.bus.close()
+
+
+class GpiozeroServoBackend:
+    """每個通道 (BCM 腳位) 一個 gpiozero Servo，第一次寫入時才建立"""
+
+    name = 'gpiozero'
+
+    def __init__(self, pin_factory=None, min_pulse_width=MIN_PULSE_WIDTH, max_pulse_width=MAX_PULSE_WIDTH):
+        self.pin_factory = pin_factory
+        self.min_pulse_width = min_pulse_width
+        self.max_pulse_width = max_pulse_width
+        self.servos = {}
+
+    def write_frame(self, changes):
+        for pin, pulse_width in changes.items():
+            servo = self.servos.get(pin)
+            if servo is None:
+                servo = self.servos[pin] = open_servo(pin, self.min_pulse_width, self.max_pulse_width,
+                                                      pin_factory=self.pin_factory)
+            if pulse_width is None:
+                servo.value = None
+                continue
+            value = (pulse_width - self.min_pulse_width) / (self.max_pulse_width - self.min_pulse_width) * 2 - 1
+            servo.value = max(-1.0, min(1.0, value))
+
+    def close(self):
+        for servo in self.servos.values():
+            servo.close()
+        self.servos.clear()
+
+
+def open_servo_backend(name, pin_factory=None, bus=1, addresses=(DEFAULT_ADDRESS,), frequency=50):
+    """依名稱建立後端；pca9685 的 I2C bus 也是在這時才開啟"""
+    if name == 'gpiozero':
+        return GpiozeroServoBackend(pin_factory)
+    if name == 'pca9685':
+        from .pca9685 import I2CBus
+        return PCA9685ServoBackend(I2CBus(bus), addresses, frequency)
+    raise ValueError(f"未知的伺服馬達後端 {name!r}，可用: {', '.join(SERVO_BACKENDS)}")
+
+
+def parse_channels(text):
+    """把 'pan:0,tilt:1' 轉成 {'pan': 0, 'tilt': 1} (伺服馬達 ID -> 通道)"""
+    channels = {}
+    for item in filter(None, text.split(',')):
+        servo_id, channel = item.split(':')
+        channels[servo_id.strip()] = int(channel)
+    return channels
+
+
+class ServoBank:
+    """多顆伺服馬達共用的 frame 緩衝
+
+    backend: 有 write_frame({通道: 脈衝寬度}) 的後端 (可以是 LazyDevice，第一次送出時才開啟硬體)
+    frame_time: 兩次送出的最小間隔 (秒)
+    retry_time: 送出失敗 (例如 I2C 錯誤) 後等多久再重送 (秒)
+    送出的執行緒在第一次 write() 時才啟動，沒有變更時不會醒來
+    """
+
+    def __init__(self, backend, frame_time=0.02, retry_time=1.0):
+        self.backend = backend
+        self.frame_time = frame_time
+        self.retry_time = retry_time
+        self._cond = threading.Condition()
+        self._pending = {}
+        self._last_flush = 0.0
+        self._retry_at = 0.0
+        self._stopping = False
+        self._thread = None
+
+        # 統計
+        self.writes = 0
+        self.frames = 0
+        self.coalesced = 0   # 還沒送出就被同一通道的新值取代的次數
+        self.errors = 0      # 送出失敗的 frame 數
+        self.last_error = None
+
+    def write(self, channel, pulse_width):
+        """把通道的脈衝寬度 (秒) 放進緩衝，None 表示停止送脈衝"""
+        with self._cond:
+            if self._stopping:
+                raise RuntimeError("ServoBank 已經關閉")
+            if channel in self._pending:
+                self.coalesced += 1
+            self._pending[channel] = pulse_width
+            self.writes += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def release(self, channel):
+        """停止送脈衝"""
+        self.write(channel, None)
+
+    def writer(self, channel):
+        """給 MotionController 的 apply：寫入固定通道"""
+        return lambda pulse_width: self.write(channel, pulse_width)
+
+    def flush(self):
+        """立即送出緩衝中的所有變更，回傳送出的通道數
+
+        後端發生錯誤時，沒送出的變更放回緩衝 (之後寫入的新值優先)，例外交給呼叫端
+        """
+        with self._cond:
+            changes, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        if changes:
+            try:
+                self.backend.write_frame(changes)
+            except Exception as e:
+                with self._cond:
+                    changes.update(self._pending)
+                    self._pending = changes
+                    self.errors += 1
+                    self.last_error = e
+                raise
+            with self._cond:
+                self.frames += 1
+        return len(changes)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopping:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                while not self._stopping:
+                    wait = max(self._last_flush + self.frame_time, self._retry_at) - time.monotonic()
+                    if wait <= 0:
+                        break
+                    self._cond.wait(wait)
+            try:
+                self.flush()
+            except Exception as e:
+                # 執行緒繼續運作，retry_time 秒後重送還沒送出的變更
+                print(f"❌ 伺服馬達 frame 送出失敗 ({self.retry_time:g} 秒後重試): {e}")
+                with self._cond:
+                    self._retry_at = time.monotonic() + self.retry_time
+
+    def close(self, timeout=None):
+        """停止執行緒，緩衝中的變更會先送出"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        self.flush()
+
+    def report(self):
+        """統計摘要"""
+        summary = f"寫入 {self.writes} 次，送出 {self.frames} 個 frame，合併 {self.coalesced} 次同一通道的更新"
+        if self.errors:
+            summary += f"，送出失敗 {self.errors} 次 (最後: {self.last_error})"
+        return summary
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="多顆伺服馬達同步掃描 (PCA9685)")
+    parser.add_argument('--servos', type=int, default=16, help="伺服馬達數量 (預設 16，超過 16 顆時使用多顆晶片)")
+    parser.add_argument('--bus', type=int, default=1, help="I2C bus 編號 (預設 1)")
+    parser.add_argument('--fake', action='store_true', help="使用記憶體中的 FakeI2CBus")
+    return parser.parse_args()
+
+
+# 主程式區塊
+if __name__ == '__main__':
+    from .kinematics import SG90
+    from .motion import MotionController
+    from .pca9685 import FakeI2CBus, I2CBus
+    from .servo import SERVO_MAPPING
+    from .trajectory import TrajectoryPlanner
+
+    args = parse_args()
+    chips = (args.servos + CHANNELS - 1) // CHANNELS
+    bus = FakeI2CBus() if args.fake else I2CBus(args.bus)
+    backend = PCA9685ServoBackend(bus, [DEFAULT_ADDRESS + i for i in range(chips)])
+    planner = TrajectoryPlanner(rate=50)
+    bank = ServoBank(backend, frame_time=planner.frame_time)
+    motions = [MotionController(bank.writer(channel), model=SG90, frame_time=planner.frame_time,
+                                planner=planner, transform=SERVO_MAPPING.pulse_width)
+               for channel in range(args.servos)]
+    print(f"🤖 {args.servos} 顆伺服馬達，{chips} 顆 PCA9685 ({backend.chips[0].frequency:.2f}Hz)")
+
+    try:
+        started = time.monotonic()
+        transfers = sum(chip.transfers for chip in backend.chips)
+        for angles in ([90] * args.servos,
+                       [i * 180 / max(1, args.servos - 1) for i in range(args.servos)],
+                       [180 - i * 180 / max(1, args.servos - 1) for i in range(args.servos)],
+                       [90] * args.servos):
+            for motion, angle in zip(motions, angles):
+                motion.move_to(angle)
+            for motion in motions:
+                motion.wait()
+        transfers = sum(chip.transfers for chip in backend.chips) - transfers
+        print(f"⏱️  {time.monotonic() - started:.2f} 秒，{bank.report()}")
+        print(f"📨 I2C 交易 {transfers} 筆 (每個 frame 每顆晶片一筆)")
+        if args.fake:
+            sizes = sorted({len(t.data) for t in bus.writes()})
+            print(f"📦 寫入大小: {', '.join(f'{size} bytes' for size in sizes)}")
+    except KeyboardInterrupt:
+        print("\n程式被中斷")
+    finally:
+        for motion in motions:
+            motion.close()
+        bank.close()
+        backend.close()
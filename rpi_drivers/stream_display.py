@@ -0,0 +1,127 @@
+"""
+串流顯示：從管線或檔案一行一行讀值，以固定速率送到顯示器
+讀取端與顯示端之間用有上限的佇列隔開，生產者太快時依 policy 處理：
+  block:    佇列滿了就讓讀取端等待 (背壓)
+  drop:     佇列滿了就丟掉新讀到的值
+  coalesce: 佇列滿了就丟掉最舊的值，顯示器永遠追最新的值
+"""
+
+import queue
+import threading
+import time
+
+from .ticker import Ticker
+
+POLICIES = ('block', 'drop', 'coalesce')
+
+_END = object()  # 串流結束的標記
+
+
+class StreamDisplay:
+    """串流顯示器
+
+    show(value):     把驗證過的值顯示出來
+    validate(text):  回傳 (是否有效, 值)，與 hw_task.validate_input 相同
+    """
+
+    def __init__(self, show, validate, rate=5.0, queue_size=16, policy='block'):
+        if policy not in POLICIES:
+            raise ValueError(f"policy 必須是 {', '.join(POLICIES)} 其中之一")
+        self.show = show
+        self.validate = validate
+        self.rate = rate
+        self.policy = policy
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+
+        # 統計
+        self.lines_read = 0
+        self.invalid = 0
+        self.shown = 0
+        self.dropped = 0     # drop：新值被丟掉
+        self.coalesced = 0   # coalesce：舊值被新值取代
+        self.started = None
+        self.finished = None
+
+    # ---- 讀取端 ----
+
+    def _enqueue(self, value):
+        if self.policy == 'block':
+            while not self._stop.is_set():
+                try:
+                    self._queue.put(value, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+        elif self.policy == 'drop':
+            try:
+                self._queue.put_nowait(value)
+            except queue.Full:
+                self.dropped += 1
+        else:
+            while True:
+                try:
+                    self._queue.put_nowait(value)
+                    return
+                except queue.Full:
+                    try:
+                        self._queue.get_nowait()  # 丟掉最舊的值
+                        self.coalesced += 1
+                    except queue.Empty:
+                        pass
+
+    def _produce(self, stream):
+        """逐行讀取 (不會一次讀入整個檔案)，驗證後放入佇列"""
+        try:
+            for line in stream:
+                if self._stop.is_set():
+                    break
+                text = line.strip()
+                if not text:
+                    continue
+                self.lines_read += 1
+                is_valid, value = self.validate(text)
+                if not is_valid:
+                    self.invalid += 1
+                    continue
+                self._enqueue(value)
+        finally:
+            # 結束標記一定要送到，顯示端才知道可以停止
+            while True:
+                try:
+                    self._queue.put(_END, timeout=0.1)
+                    break
+                except queue.Full:
+                    if self._stop.is_set():
+                        break
+
+    # ---- 顯示端 ----
+
+    def run(self, stream):
+        """開始串流顯示，直到串流結束或被中斷"""
+        self.started = time.monotonic()
+        producer = threading.Thread(target=self._produce, args=(stream,), daemon=True)
+        producer.start()
+
+        ticker = Ticker(1.0 / self.rate)
+        try:
+            while ticker.wait() is not None:
+                value = self._queue.get()
+                if value is _END:
+                    break
+                self.show(value)
+                self.shown += 1
+        finally:
+            self._stop.set()
+            self.finished = time.monotonic()
+
+    def report(self):
+        """輸出吞吐量與丟棄統計"""
+        elapsed = (self.finished or time.monotonic()) - (self.started or time.monotonic())
+        throughput = self.shown / elapsed if elapsed > 0 else 0.0
+        print("=" * 50)
+        print(f"📊 串流統計 (policy={self.policy}, {self.rate:g} 筆/秒)")
+        print(f"  讀取: {self.lines_read} 行，無效: {self.invalid}")
+        print(f"  顯示: {self.shown} 筆，耗時 {elapsed:.2f} 秒，吞吐量 {throughput:.2f} 筆/秒")
+        print(f"  丟棄: {self.dropped}，合併: {self.coalesced}")
+        print("=" * 50)
@@ -0,0 +1,82 @@
+"""
+不漂移的週期性 tick
+每個 tick 的截止時間都是 start + n * period (time.monotonic)，
+工作本身花的時間不會累積成誤差；落後太多時可以選擇補上或直接略過
+"""
+
+import threading
+import time
+
+
+class Ticker:
+    """週期性 tick 產生器
+
+    catch_up=False: 落後超過一個週期時略過錯過的 tick，直接對齊到現在 (計入 missed)
+    catch_up=True:  錯過的 tick 立即連續補上，直到追上時間表
+    """
+
+    def __init__(self, period, catch_up=False, late_tolerance=0.005):
+        self.period = period
+        self.catch_up = catch_up
+        self.late_tolerance = late_tolerance  # 超過這個秒數才算延遲
+        self._start = None
+        self._index = 0
+        self._first = True
+        self._sleeper = threading.Event()
+
+        # 統計
+        self.ticks = 0
+        self.late = 0
+        self.missed = 0
+        self.max_lag = 0.0
+
+    def start(self, at=None):
+        """設定第 0 個 tick 的時間 (預設為現在)"""
+        self._start = time.monotonic() if at is None else at
+        self._index = 0
+        self._first = True
+
+    def deadline(self, index):
+        """第 index 個 tick 的絕對截止時間"""
+        return self._start + index * self.period
+
+    def wait(self, periods=1, stop_event=None):
+        """等到下一個 tick (往後 periods 個週期)，回傳 tick 編號
+
+        沒有先呼叫 start() 時，第一次呼叫才開始計時並立即回傳 0；
+        stop_event 被設定時回傳 None
+        """
+        if self._start is None:
+            self.start()
+        if self._first:
+            self._first = False
+        else:
+            self._index += periods
+        deadline = self.deadline(self._index)
+        sleeper = stop_event if stop_event is not None else self._sleeper
+
+        remaining = deadline - time.monotonic()
+        if remaining > 0 and sleeper.wait(remaining):
+            return None
+
+        lag = time.monotonic() - deadline
+        if lag > self.late_tolerance:
+            self.late += 1
+            self.max_lag = max(self.max_lag, lag)
+        if lag >= self.period and not self.catch_up:
+            # 略過已經錯過的 tick，維持原本的時間表
+            skipped = int(lag // self.period)
+            self._index += skipped
+            self.missed += skipped
+
+        self.ticks += 1
+        return self._index
+
+    def __iter__(self):
+        while True:
+            yield self.wait()
+
+    def report(self):
+        """統計摘要"""
+        return (f"tick {self.ticks} 次，延遲 {self.late} 次 (最大 {self.max_lag * 1000:.1f} ms)，"
+                f"略過 {self.missed} 次")
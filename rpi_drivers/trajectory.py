@@ -0,0 +1,113 @@
+"""
+伺服馬達軌跡規劃
+在速度與加速度限制下，把一次移動規劃成依時間取樣的位置序列 (NumPy 陣列)，
+取樣間隔和伺服馬達的 50Hz frame 相同，由 MotionController 的執行緒每個 frame 寫入一個點
+
+trapezoid: 梯形速度曲線 (等加速 -> 等速 -> 等減速)，距離太短時變成三角形
+scurve:    把梯形速度曲線再和長度 jerk_time 的移動平均做捲積，加速度變成斜坡而不是突然跳變 (限制 jerk)，
+           起步與停止更柔和，電源上的電流突波也比較小
+"""
+
+import math
+
+import numpy as np
+
+PROFILES = ('trapezoid', 'scurve')
+
+
+class TrajectoryPlanner:
+    """速度 / 加速度限制的軌跡規劃
+
+    v_max: 最大角速度 (度/秒)，SG90 空載約 0.1 秒 / 60° (600 度/秒)，預設留一些餘裕
+    a_max: 最大角加速度 (度/秒²)
+    jerk_time: scurve 加速度爬升的時間 (秒)
+    rate: 取樣頻率 (Hz)，和伺服馬達的 frame 頻率相同
+    """
+
+    def __init__(self, v_max=360.0, a_max=1800.0, jerk_time=0.06, rate=50, profile='scurve'):
+        if profile not in PROFILES:
+            raise ValueError(f"profile 必須是 {', '.join(PROFILES)} 其中之一")
+        self.v_max = v_max
+        self.a_max = a_max
+        self.jerk_time = jerk_time
+        self.rate = rate
+        self.profile = profile
+
+    @property
+    def frame_time(self):
+        return 1.0 / self.rate
+
+    def _timing(self, distance):
+        """回傳 (加速時間, 等速時間, 最高速度)"""
+        if distance * self.a_max >= self.v_max ** 2:
+            t_acc = self.v_max / self.a_max
+            return t_acc, (distance - self.v_max * t_acc) / self.v_max, self.v_max
+        v_peak = math.sqrt(distance * self.a_max)
+        return v_peak / self.a_max, 0.0, v_peak
+
+    def _jerk_samples(self):
+        return max(1, round(self.jerk_time * self.rate)) if self.profile == 'scurve' else 1
+
+    def samples(self, start, end):
+        """從 start 移動到 end 需要的取樣點數"""
+        distance = abs(end - start)
+        if distance == 0:
+            return 1
+        t_acc, t_flat, _ = self._timing(distance)
+        n = math.ceil((2 * t_acc + t_flat) * self.rate)
+        if n <= 1:
+            return 1  # 不到一個 frame 的移動直接寫入終點
+        return n + self._jerk_samples() - 1
+
+    def duration(self, start, end):
+        """從 start 移動到 end 需要的秒數 (以 frame 為單位)"""
+        return self.samples(start, end) / self.rate
+
+    def plan(self, start, end):
+        """規劃一次停止到停止的移動，回傳每個 frame 的位置 (不含 start，最後一點剛好是 end)"""
+        distance = abs(end - start)
+        if distance == 0:
+            return np.array([float(end)])
+        t_acc, t_flat, v_peak = self._timing(distance)
+        total = 2 * t_acc + t_flat
+        n = math.ceil(total * self.rate)
+        if n <= 1:
+            # 不到一個 frame 的移動 (例如中斷後留下的小數角度)：唯一的中點速度會被截成 0
+            return np.array([float(end)])
+        # 每個 frame 中點的速度
+        t = (np.arange(n) + 0.5) / self.rate
+        velocity = v_peak * np.clip(np.minimum(t, total - t) / t_acc, 0.0, 1.0)
+
+        jerk_samples = self._jerk_samples()
+        if jerk_samples > 1:
+            velocity = np.convolve(velocity, np.full(jerk_samples, 1.0 / jerk_samples))
+
+        # 取樣造成的距離誤差按比例修正，讓最後一點剛好落在 end
+        travelled = np.cumsum(velocity)
+        if travelled[-1] <= 0:
+            return np.array([float(end)])
+        travelled *= distance / travelled[-1]
+        return start + math.copysign(1.0, end - start) * travelled
+
+    def plan_path(self, waypoints, start=None, dwell=0.0):
+        """依序經過每個路徑點 (每點停下，停留 dwell 秒)，回傳串接的位置陣列
+
+        start 為目前位置，None 時從第一個路徑點開始
+        """
+        waypoints = [float(w) for w in waypoints]
+        if start is None:
+            start, waypoints = waypoints[0], waypoints[1:]
+        hold = round(dwell * self.rate)
+        segments = []
+        for point in waypoints:
+            segments.append(self.plan(start, point))
+            if hold:
+                segments.append(np.full(hold, point))
+            start = point
+        return np.concatenate(segments) if segments else np.array([float(start)])
+
+
+def derivatives(positions, rate):
+    """由位置序列計算速度與加速度 (度/秒、度/秒²)，用來檢查規劃結果"""
+    velocity = np.diff(positions) * rate
+    return velocity, np.diff(velocity) * rate
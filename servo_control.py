@@ -1,11 +1,21 @@
-import RPi.GPIO as GPIO
 import time
+from rpi_drivers.idle import PROCESS_CPU, IdleDetacher
+from rpi_drivers.kinematics import SG90, ServoTracker
+from rpi_drivers.lazy import LazyDevice
+from rpi_drivers.pin_backends import select_pin_backend
 
 servoPIN = 13
-GPIO.setmode(GPIO.BCM)
-GPIO.setup(servoPIN, GPIO.OUT)
 
-p = GPIO.PWM(servoPIN, 50) # GPIO 13 for PWM with 50Hz
+# GPIO 後端 (pigpio / lgpio / RPi.GPIO / mock) 由環境變數 RPI_PIN_BACKEND 選擇 (預設 auto)
+# 後端與 PWM 在第一次使用時才初始化，匯入本模組不會碰到硬體；PWM 從置中位置 (7.5%) 開始
+pin_backend = LazyDevice(select_pin_backend)
+p = LazyDevice(lambda: pin_backend.start_pwm(servoPIN, 50, 7.5)) # GPIO 13 for PWM with 50Hz
+
+# 記錄馬達目前的角度，依移動距離決定等待時間
+tracker = ServoTracker(SG90)
+
+# 到位後 0.5 秒沒有新命令就停止送脈衝 (duty 0)，省 CPU 也避免馬達抖動
+idle = IdleDetacher(lambda: p.ChangeDutyCycle(0), hold_time=0.5)
 
 # 伺服馬達角度控制函數
 def set_servo_angle(angle):
@@ -16,15 +26,16 @@ def set_servo_angle(angle):
     # 將角度轉換為duty cycle
     # 0度 = 2.5%, 90度 = 7.5%, 180度 = 12.5%
     duty_cycle = 2.5 + (angle / 180.0) * 10
+    idle.before_command()
     p.ChangeDutyCycle(duty_cycle)
-    time.sleep(0.1)  # 給馬達時間移動
+    tracker.wait_for(angle)  # 給馬達時間移動 (SG90 約 0.1 秒 / 60°)
+    idle.after_command()
 
 # 馬達置中函數
 def center_servo():
     """將伺服馬達設定為置中位置 (90度)"""
     print("設定馬達置中位置 (90度)...")
-    set_servo_angle(90)
-    time.sleep(1)  # 等待馬達到達位置
+    set_servo_angle(90)  # 會等到馬達到達位置
     print("馬達已置中！")
 
 # 獲取最小pulse width函數
@@ -55,49 +66,59 @@ def get_max_pulse_width():
     max_pulse_width = (max_duty_cycle / 100) * period_ms
     return max_pulse_width
 
-# 初始化並置中
-p.start(7.5)  # 從置中位置開始 (90度)
-print("伺服馬達初始化...")
-time.sleep(1)
+# 主程式區塊
+if __name__ == '__main__':
+    # 初始化並置中
+    idle.before_command()
+    p.ChangeDutyCycle(7.5)  # 從置中位置開始 (90度)
+    print(f"伺服馬達初始化... (GPIO 後端: {pin_backend.name})")
+    tracker.wait_for(90)  # 開機時角度未知，以完整行程估計
+    idle.after_command()
 
-# 先設定馬達置中
-center_servo()
+    # 先設定馬達置中
+    center_servo()
 
-# 顯示pulse width資訊
-print(f"最小 Pulse Width (0度): {get_min_pulse_width():.2f} ms")
-print(f"最大 Pulse Width (180度): {get_max_pulse_width():.2f} ms")
-print(f"範圍: {get_min_pulse_width():.2f} - {get_max_pulse_width():.2f} ms")
-print()
+    # 顯示pulse width資訊
+    print(f"最小 Pulse Width (0度): {get_min_pulse_width():.2f} ms")
+    print(f"最大 Pulse Width (180度): {get_max_pulse_width():.2f} ms")
+    print(f"範圍: {get_min_pulse_width():.2f} - {get_max_pulse_width():.2f} ms")
+    print()
 
-try:
-    print("開始馬達測試...")
-    print("按 Ctrl+C 停止程式")
+    try:
+        print("開始馬達測試...")
+        print("按 Ctrl+C 停止程式")
     
-    while True:
-        # 測試動作：左-中-右-中
-        print("移動到 0度...")
-        set_servo_angle(0)
-        time.sleep(1)
+        while True:
+            # 測試動作：左-中-右-中
+            print("移動到 0度...")
+            set_servo_angle(0)
+            time.sleep(1)
         
-        print("移動到 90度 (置中)...")
-        set_servo_angle(90)
-        time.sleep(1)
+            print("移動到 90度 (置中)...")
+            set_servo_angle(90)
+            time.sleep(1)
         
-        print("移動到 180度...")
-        set_servo_angle(180)
-        time.sleep(1)
+            print("移動到 180度...")
+            set_servo_angle(180)
+            time.sleep(1)
         
-        print("回到 90度 (置中)...")
-        set_servo_angle(90)
-        time.sleep(1)
+            print("回到 90度 (置中)...")
+            set_servo_angle(90)
+            time.sleep(1)
         
-        print("---")
+            print("---")
         
-except KeyboardInterrupt:
-    print("\n程式被中斷")
-finally:
-    print("馬達回到置中位置...")
-    center_servo()  # 結束前先置中
-    p.stop()
-    GPIO.cleanup()
-    print("清理完成")
\ No newline at end of file
+    except KeyboardInterrupt:
+        print("\n程式被中斷")
+    finally:
+        # 只清理真的初始化過的硬體，沒用到的不要為了清理而初始化
+        if p.acquired:
+            print("馬達回到置中位置...")
+            center_servo()  # 結束前先置中
+        idle.close()
+        print(f"📊 {idle.report()}")
+        print(f"📊 {PROCESS_CPU.report()}")
+        if p.acquired:
+            p.stop()
+        pin_backend.close()
+        print("清理完成")
\ No newline at end of file
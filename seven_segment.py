@@ -1,7 +1,9 @@
 
 import time
-import RPi.GPIO as GPIO
-GPIO.setmode(GPIO.BCM)
+from rpi_drivers.ticker import Ticker
+from rpi_drivers.display_client import lazy_display
+from rpi_drivers.pins import SEG_PINS_1
+from rpi_drivers.segment_driver import SEGMENT_BITS, pattern_to_mask
 
 # a 紅色線
 # d 綠色線
@@ -12,20 +14,11 @@ GPIO.setmode(GPIO.BCM)
 # g 橘色線
 
 
-# 定義七段顯示器 a~g 七個段位對應到的 GPIO 腳位
-SEG_PINS = {
-    'a': 11,   # GPIO11 控制 a 段
-    'b': 0,    # GPIO0 控制 b 段
-    'c': 5,
-    'd': 6,
-    'e': 13,
-    'f': 19,
-    'g': 26,
-}
+# 七段顯示器 a~g 七個段位對應到的 GPIO 腳位 (左邊那個顯示器，接線定義在 rpi_drivers/pins.py)
+SEG_PINS = {seg: pin for seg, pin in SEG_PINS_1.items() if seg != 'dp'}
 
-# 初始化所有段位腳為輸出模式，預設 LOW（共陰極：LOW=熄滅）
-for pin in SEG_PINS.values():
-    GPIO.setup(pin, GPIO.OUT, initial=GPIO.LOW)
+# 第一次顯示時才取得顯示器：有 display daemon 時直接連線 (只用左邊的顯示器)，沒有 daemon 時才在本機初始化腳位
+display = lazy_display(SEG_PINS, {})
 
 # 定義 0~9 的段碼資料，每個元組代表 a~g 七段的亮滅狀態
 # True/1 = 點亮，False/0 = 熄滅（共陰極：HIGH=亮）
@@ -44,11 +37,8 @@ DIGITS = {
 
 # 控制每一段 a~g 是否要點亮
 def set_segments(a,b,c,d,e,f,g):
-    # 建立一個 dict 將每段對應到狀態
-    states = {'a':a,'b':b,'c':c,'d':d,'e':e,'f':f,'g':g}
-    # 對每一段的腳位設定 HIGH（亮）或 LOW（滅）
-    for seg, val in states.items():
-        GPIO.output(SEG_PINS[seg], GPIO.HIGH if val else GPIO.LOW)
+    # a~g 的狀態轉成段位遮罩，一次寫入 (只有狀態改變的腳位會被寫入)
+    display.show_mask(1, pattern_to_mask((a, b, c, d, e, f, g)))
 
 # 顯示某個數字 (0~9)
 def show_digit(n):
@@ -62,26 +52,31 @@ def all_off():
 # 每段依序點亮，用來測試段是否正常
 def segment_walk(delay=0.25):
     for seg in ['a','b','c','d','e','f','g']:
-        all_off()  # 每次先全部熄滅
-        GPIO.output(SEG_PINS[seg], GPIO.HIGH)  # 點亮當前這一段（共陰極：HIGH=亮）
+        display.show_mask(1, SEGMENT_BITS[seg])  # 只點亮當前這一段，其餘段位同時熄滅（共陰極：HIGH=亮）
         time.sleep(delay)  # 停留一段時間再換下一段
     all_off()
 
 # 主程式區塊
-try:
-    segment_walk(0.3)  # 先跑一次每段測試（每段亮 0.3 秒）
+if __name__ == '__main__':
+    ticker = None
+    try:
+        segment_walk(0.3)  # 先跑一次每段測試（每段亮 0.3 秒）
 
-    while True:
-        # 依序顯示 0 到 9
-        for n in range(10):
-            show_digit(n)  # 顯示當前數字
-            time.sleep(0.8)  # 每個數字顯示 0.8 秒
-        all_off()          # 間隔前先全部熄滅
-        time.sleep(0.3)
+        # 以 0.1 秒為單位依絕對時間排程，GPIO 寫入時間不會累積成漂移
+        ticker = Ticker(0.1)
+        while True:
+            # 依序顯示 0 到 9
+            for n in range(10):
+                ticker.wait(8 if n > 0 else 3)  # 前一個數字顯示 0.8 秒 (第一個數字前是熄滅 0.3 秒)
+                show_digit(n)  # 顯示當前數字
+            ticker.wait(8)
+            all_off()          # 間隔前先全部熄滅
 
-# 捕捉 Ctrl+C 中斷，做清理
-except KeyboardInterrupt:
-    pass
-finally:
-    all_off()        # 關掉所有段位
-    GPIO.cleanup()   # 清理 GPIO 狀態
+    # 捕捉 Ctrl+C 中斷，做清理
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if ticker is not None:
+            print(ticker.report())
+        all_off()        # 關掉所有段位
+        display.close()  # 清理 GPIO 狀態 (連線到 daemon 時只關閉連線)
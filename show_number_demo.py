@@ -1,151 +1,88 @@
 import time
-import RPi.GPIO as GPIO
-GPIO.setmode(GPIO.BCM)
+from rpi_drivers.ticker import Ticker
+from rpi_drivers.display_client import lazy_display
+from rpi_drivers.pins import LED_PIN, SEG_PINS_1, SEG_PINS_2
+from rpi_drivers.segment_driver import SEGMENT_BITS
 
-# 定義第一個七段顯示器 a~g 對應到的 GPIO 腳位 (左邊那個)
-SEG_PINS_1 = {
-    'a': 11,   # 紅色線
-    'b': 0,    # 綠色線
-    'c': 5,    # 咖啡色線
-    'd': 6,    # 紫色線
-    'e': 13,   # 黃色線
-    'f': 19,   # 白色線
-    'g': 26,   # 橘色線
-    'dp': 21,  # 灰色線，控制小數點
-}
 
-# 定義第二個七段顯示器 a~g 對應到的 GPIO 腳位 (右邊那個)
-SEG_PINS_2 = {
-    'a': 25,   # 藍色線
-    'b': 8,   # 綠色線
-    'c': 7,   # 咖啡色線
-    'd': 1,   # 紫色線
-    'e': 12,  # 黃色線
-    'f': 16,  # 白色線
-    'g': 20,  # 橘色線
-}
-
-# 定義LED的GPIO腳位
-LED_PIN = 14  # LED接在GPIO14
-
-
-# 初始化所有段位腳為輸出模式，預設 LOW（共陰極：LOW=熄滅）
-for pin in SEG_PINS_1.values():
-    GPIO.setup(pin, GPIO.OUT, initial=GPIO.LOW)
-
-for pin in SEG_PINS_2.values():
-    GPIO.setup(pin, GPIO.OUT, initial=GPIO.LOW)
-
-# 初始化LED為輸出模式
-GPIO.setup(LED_PIN, GPIO.OUT, initial=GPIO.LOW) 
-
-
-# 定義 0~9 ，每個元組代表 a~g 七段的亮滅狀態
-# True/1 = 點亮，False/0 = 熄滅（共陰極：HIGH=亮）
-DIGITS = {
-    0: (1,1,1,1,1,1,0),  # 顯示 0
-    1: (0,1,1,0,0,0,0),  # 顯示 1
-    2: (1,1,0,1,1,0,1),  # 顯示 2
-    3: (1,1,1,1,0,0,1),  # 顯示 3
-    4: (0,1,1,0,0,1,1),  # 顯示 4
-    5: (1,0,1,1,0,1,1),  # 顯示 5
-    6: (1,0,1,1,1,1,1),  # 顯示 6
-    7: (1,1,1,0,0,0,0),  # 顯示 7
-    8: (1,1,1,1,1,1,1),  # 顯示 8
-    9: (1,1,1,1,0,1,1),  # 顯示 9
-}
+# 第一次顯示時才取得顯示器：有 display daemon 時直接連線，沒有 daemon 時才在本機初始化腳位
+# (本機模式優先透過 /dev/gpiomem 一次寫入整組腳位，無法使用時退回 RPi.GPIO)
+display = lazy_display(SEG_PINS_1, SEG_PINS_2, LED_PIN)
 
 # 控制七顯示器每一段 a~g 是否要點亮
 def set_segments(monitor_number,a,b,c,d,e,f,g,dp):
-    # 建立一個 dict 將每段對應到狀態
-    states_1 = {'a':a,'b':b,'c':c,'d':d,'e':e,'f':f,'g':g, 'dp':dp}
-    states_2 = {'a':a,'b':b,'c':c,'d':d,'e':e,'f':f,'g':g}
-
-    # 對每一段的腳位設定 HIGH（亮）或 LOW（滅）
-
-    # 左邊的顯示器
-    if monitor_number == 1: 
-        for seg, val in states_1.items():
-            GPIO.output(SEG_PINS_1[seg], GPIO.HIGH if val else GPIO.LOW)
+    display.set_segments(monitor_number, a, b, c, d, e, f, g, dp)
 
-    # 右邊的顯示器
-    if monitor_number == 2: 
-        for seg, val in states_2.items():
-            GPIO.output(SEG_PINS_2[seg], GPIO.HIGH if val else GPIO.LOW)
-
-# 顯示某個數字 (0~9)
+# 顯示某個數字 (0~9)，monitor 2 沒有 dp 腳位
 def show_digit(monitor_number, n, dp=False):
-    pattern = DIGITS.get(n, (0,0,0,0,0,0,0))  # 取出對應段碼，預設全部熄滅
-    if monitor_number == 1:
-        set_segments(1, *pattern, dp)  # 為monitor 1添加dp參數
-    elif monitor_number == 2:
-        set_segments(2, *pattern, False)  # monitor 2沒有dp，固定為False 
+    display.show_digit(monitor_number, n, dp)
 
 # 熄滅所有段位（全部 LOW）
 def all_off():
-    set_segments(1, 0, 0, 0, 0, 0, 0, 0, False)  # monitor 1，包含dp
-    set_segments(2, 0, 0, 0, 0, 0, 0, 0, False)  # monitor 2，dp參數會被忽略
+    display.all_off()
 
 # LED控制函數
 def led_on():
-    GPIO.output(LED_PIN, GPIO.HIGH)
+    display.set_led(1)
 
 def led_off():
-    GPIO.output(LED_PIN, GPIO.LOW)
+    display.set_led(0)
 
 def led_toggle():
-    current_state = GPIO.input(LED_PIN)
-    GPIO.output(LED_PIN, not current_state)
+    display.set_led(not display.led_level)
 
 # 每段依序點亮，用來測試段是否正常
 def segment_walk(delay=0.25):
     for seg in ['a','b','c','d','e','f','g']:
-        all_off()  # 每次先全部熄滅
-        GPIO.output(SEG_PINS_1[seg], GPIO.HIGH)
-        GPIO.output(SEG_PINS_2[seg], GPIO.HIGH)
+        # 整個顯示器寫入只亮這一段的遮罩，其餘段位自動熄滅
+        display.show_mask(1, SEGMENT_BITS[seg])
+        display.show_mask(2, SEGMENT_BITS[seg])
         time.sleep(delay)  # 停留一段時間再換下一段
     all_off()
 
 
 # 主程式區塊
-try:
-    # 測試LED
-    print("測試LED...")
-    led_on()
-    time.sleep(1)
-    led_off()
-    time.sleep(1)
+if __name__ == '__main__':
+    ticker = None
+    try:
+        # 測試LED
+        print("測試LED...")
+        led_on()
+        time.sleep(1)
+        led_off()
+        time.sleep(1)
     
-    # 測試七段顯示器
-    print("測試七段顯示器...")
-    segment_walk(0.3)
-
-    while True:
-        # 同步顯示 0 到 9，每隔兩位顯示一次小數點
-        for n in range(10):
-
-            show_dp = (n % 2 == 0 and n > 0)
+        # 測試七段顯示器
+        print("測試七段顯示器...")
+        segment_walk(0.3)
+
+        # 每 0.5 秒一個 tick，依絕對時間對齊不會漂移：
+        # tick 0~9 顯示數字，tick 10~11 全部熄滅 (間隔 1 秒)
+        ticker = Ticker(0.5)
+        for tick in ticker:
+            n = tick % 12
+            if n < 10:
+                # 同步顯示 0 到 9，每隔兩位顯示一次小數點
+                show_dp = (n % 2 == 0 and n > 0)
             
-            show_digit(1, n, dp=show_dp)
-            show_digit(2, n)             
+                display.show_pair(n, n, dp=show_dp)  # 兩個顯示器同時更新
             
-            # 每5個數字亮一次LED
-            if n % 5 == 0:
-                led_on()
-            else:
-                led_off()
-
-            time.sleep(0.5)  # 每個數字顯示 0.5 秒
-
-        all_off()          # 間隔前先全部熄滅
-        led_off()          # 關閉LED
-        time.sleep(1)
-
-# 捕捉 Ctrl+C 中斷，做清理
-except KeyboardInterrupt:
-    print("\n程式被中斷")
-finally:
-    all_off()        # 關掉所有段位
-    led_off()        # 關閉LED
-    GPIO.cleanup()   # 清理 GPIO 狀態
-    print("GPIO清理完成")
\ No newline at end of file
+                # 每5個數字亮一次LED
+                if n % 5 == 0:
+                    led_on()
+                else:
+                    led_off()
+            elif n == 10:
+                all_off()          # 間隔前先全部熄滅
+                led_off()          # 關閉LED
+
+    # 捕捉 Ctrl+C 中斷，做清理
+    except KeyboardInterrupt:
+        print("\n程式被中斷")
+    finally:
+        if ticker is not None:
+            print(ticker.report())
+        all_off()        # 關掉所有段位
+        led_off()        # 關閉LED
+        display.close()  # 清理 GPIO 狀態 (連線到 daemon 時只關閉連線)
+        print("GPIO清理完成")
\ No newline at end of file
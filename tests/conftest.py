@@ -0,0 +1,6 @@
+"""測試直接從原始碼目錄匯入 rpi_drivers (和 Motor_Web_Control 的腳本一樣把上層目錄加入 sys.path)"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
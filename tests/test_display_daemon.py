@@ -0,0 +1,107 @@
+"""display daemon 與 client 透過 Unix socket 的來回測試 (MockGpioBackend，不接硬體)"""
+
+import threading
+
+import pytest
+
+from rpi_drivers.display_client import DisplayClient, open_display
+from rpi_drivers.display_daemon import DisplayDaemon, DisplayServer
+from rpi_drivers.display_protocol import OP_FRAME, encode, encode_number, iter_records
+from rpi_drivers.frame_table import FRAME_TABLE
+from rpi_drivers.gpio_bank import MockGpioBackend
+from rpi_drivers.pins import LED_PIN, SEG_PINS_1, SEG_PINS_2
+from rpi_drivers.segment_driver import DIGIT_MASKS, build_bank_table
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    """在暫存目錄的 socket 上啟動 daemon，回傳 (DisplayDaemon, socket 路徑)"""
+    path = str(tmp_path / 'display.sock')
+    display_daemon = DisplayDaemon(MockGpioBackend())
+    server = DisplayServer(path, display_daemon)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield display_daemon, path
+    server.shutdown()
+    server.server_close()
+    display_daemon.close()
+
+
+def levels_for(mask1, mask2):
+    return build_bank_table(SEG_PINS_1)[mask1] | build_bank_table(SEG_PINS_2)[mask2]
+
+
+def test_protocol_records_round_trip():
+    data = encode_number(42) + encode_number("4.5") + encode(OP_FRAME, 0, 0x1234)
+    records, rest = iter_records(data + b'\x01')
+    assert rest == b'\x01'
+    assert records[2] == (OP_FRAME, 0, 0x1234)
+
+
+def test_number_round_trip_updates_gpio(daemon):
+    display_daemon, path = daemon
+    client = open_display(SEG_PINS_1, SEG_PINS_2, LED_PIN, path)
+    try:
+        assert isinstance(client, DisplayClient)
+        with client.batch():
+            client.show_number(17)
+            client.show_number("4.5")
+        assert client.sync() == 0
+        frame = FRAME_TABLE["4.5"].frame
+        assert display_daemon.backend.read_levels() == levels_for(frame & 0xFF, frame >> 8)
+        assert client.masks == display_daemon.display.masks
+    finally:
+        client.close()
+
+
+def test_invalid_commands_are_counted_in_sync(daemon):
+    display_daemon, path = daemon
+    client = DisplayClient.connect(path)
+    try:
+        client._send(encode(0x7F))
+        client._send(encode_number(250))
+        assert client.sync() == 2
+        assert client.sync() == 0
+    finally:
+        client.close()
+    assert display_daemon.errors == 2
+
+
+def test_backend_error_keeps_connection_alive(daemon):
+    display_daemon, path = daemon
+
+    def broken(set_mask, clear_mask):
+        raise OSError(5, "I/O error")
+
+    display_daemon.backend.write = broken
+    client = DisplayClient.connect(path)
+    try:
+        client.show_number(88)
+        assert client.sync() == 1
+    finally:
+        client.close()
+        del display_daemon.backend.write
+    assert display_daemon.backend_errors == 1
+
+
+def test_single_display_client_leaves_other_display_alone(daemon):
+    display_daemon, path = daemon
+    owner = open_display(SEG_PINS_1, SEG_PINS_2, LED_PIN, path)
+    left = open_display({seg: pin for seg, pin in SEG_PINS_1.items() if seg != 'dp'}, {}, path=path)
+    try:
+        owner.show_number(42)
+        owner.sync()
+        left.show_digit(1, 7)
+        left.sync()
+        assert display_daemon.display.masks == {1: DIGIT_MASKS[7], 2: DIGIT_MASKS[2]}
+    finally:
+        left.close()
+        owner.close()
+
+
+def test_wiring_mismatch_is_refused(daemon):
+    _, path = daemon
+    with pytest.raises(RuntimeError):
+        open_display(dict(SEG_PINS_1, a=3), SEG_PINS_2, LED_PIN, path)
+    with pytest.raises(RuntimeError):
+        open_display(SEG_PINS_1, SEG_PINS_2, LED_PIN + 1, path)
@@ -0,0 +1,50 @@
+"""FakeGpioMemBank：以檔案模擬 /dev/gpiomem，驗證整組腳位的暫存器寫入"""
+
+from rpi_drivers.gpio_bank import GPCLR0, GPFSEL0, GPSET0, FakeGpioMemBank
+from rpi_drivers.pins import SEG_PINS_1, SEG_PINS_2
+from rpi_drivers.segment_driver import DIGIT_MASKS, DualSegmentDriver, build_bank_table
+
+
+def open_bank(tmp_path):
+    return FakeGpioMemBank(str(tmp_path / 'gpiomem'))
+
+
+def test_write_sets_and_clears_levels(tmp_path):
+    bank = open_bank(tmp_path)
+    try:
+        bank.write(0b1011, 0)
+        bank.write(0b0100, 0b0011)
+        assert bank.read_levels() == 0b1100
+        assert bank.read_register(GPSET0) == 0b0100
+        assert bank.read_register(GPCLR0) == 0b0011
+        assert bank.writes == 3
+    finally:
+        bank.close()
+
+
+def test_setup_outputs_only_touches_its_own_fsel_bits(tmp_path):
+    bank = open_bank(tmp_path)
+    try:
+        bank.write_register(GPFSEL0 + 4, 0b111 << 27)   # GPIO 19 是其他功能
+        bank.setup_outputs([11, 13])
+        assert bank.read_register(GPFSEL0 + 4) == (0b111 << 27) | (0b001 << 3) | (0b001 << 9)
+    finally:
+        bank.close()
+
+
+def test_driver_writes_each_frame_with_at_most_two_register_writes(tmp_path):
+    bank = open_bank(tmp_path)
+    try:
+        driver = DualSegmentDriver(bank, SEG_PINS_1, SEG_PINS_2)
+        table1, table2 = build_bank_table(SEG_PINS_1), build_bank_table(SEG_PINS_2)
+        for n1, n2 in ((8, 8), (4, 2), (1, 7), (None, None)):
+            before = bank.writes
+            driver.show_pair(n1, n2)
+            assert bank.writes - before <= 2
+            assert bank.read_levels() == table1[DIGIT_MASKS.get(n1, 0)] | table2[DIGIT_MASKS.get(n2, 0)]
+        # 畫面沒變時不寫暫存器
+        before = bank.writes
+        assert driver.show_pair(None, None) == 0
+        assert bank.writes == before
+    finally:
+        bank.close()
@@ -0,0 +1,92 @@
+"""FakePigpiod 的 socket 命令處理與 MockPinBackend / select_pin_backend 的後端選擇"""
+
+import socket
+import struct
+
+import pytest
+
+from rpi_drivers.fake_pigpiod import (CMD_GPW, CMD_HP, CMD_HWVER, CMD_MODES, CMD_READ,
+                                      CMD_SERVO, CMD_WRITE, COMMAND, OUTPUT, PI_BAD_GPIO,
+                                      FakePigpiod)
+from rpi_drivers import pin_backends
+from rpi_drivers.pin_backends import MockPinBackend, select_pin_backend
+from rpi_drivers.pwm_jitter import EdgeBuffer
+
+
+@pytest.fixture
+def pigpiod():
+    with FakePigpiod() as daemon:
+        sock = socket.create_connection((daemon.host, daemon.port), timeout=5)
+        yield daemon, sock
+        sock.close()
+
+
+def command(sock, cmd, p1=0, p2=0, extension=b''):
+    """送出一個 pigpio 命令，回傳有號的結果"""
+    sock.sendall(COMMAND.pack(cmd, p1, p2, len(extension)) + extension)
+    reply = b''
+    while len(reply) < COMMAND.size:
+        reply += sock.recv(COMMAND.size - len(reply))
+    return struct.unpack_from('i', reply, 12)[0]
+
+
+def test_hardware_revision(pigpiod):
+    daemon, sock = pigpiod
+    assert command(sock, CMD_HWVER) == daemon.hw_revision
+
+
+def test_write_and_read_back(pigpiod):
+    daemon, sock = pigpiod
+    assert command(sock, CMD_MODES, 18, OUTPUT) == 0
+    assert command(sock, CMD_WRITE, 18, 1) == 0
+    assert command(sock, CMD_READ, 18) == 1
+    assert daemon.levels & (1 << 18)
+    assert command(sock, CMD_WRITE, 18, 0) == 0
+    assert command(sock, CMD_READ, 18) == 0
+
+
+def test_servo_and_hardware_pwm(pigpiod):
+    daemon, sock = pigpiod
+    assert command(sock, CMD_SERVO, 13, 1500) == 0
+    assert command(sock, CMD_GPW, 13) == 1500
+    assert command(sock, CMD_HP, 12, 1000, struct.pack('I', 250_000)) == 0
+    assert daemon.hardware[12] == (1000, 250_000)
+    # 改成一般輸出時停止產生脈衝
+    assert command(sock, CMD_WRITE, 13, 0) == 0
+    assert 13 not in daemon.servo
+
+
+def test_bad_gpio_is_rejected(pigpiod):
+    _, sock = pigpiod
+    assert command(sock, CMD_WRITE, 60, 1) == PI_BAD_GPIO
+
+
+def test_mock_backend_loopback_capture():
+    backend = MockPinBackend(loopback={18: 23})
+    buffer = EdgeBuffer(capacity=8)
+    stop = backend.capture(23, buffer)
+    backend.setup_output(18)
+    backend.write(18, 1, t_ns=100)
+    backend.write(18, 0, t_ns=200)
+    stop()
+    backend.write(18, 1, t_ns=300)
+    times, levels = buffer.edges()
+    assert list(times) == [100, 200]
+    assert list(levels) == [1, 0]
+    assert backend.read(18) == 1
+
+
+def test_auto_warns_when_only_mock_is_available(monkeypatch, capsys):
+    open_backend = pin_backends.open_pin_backend
+
+    def only_mock(name, **options):
+        if name != 'mock':
+            raise ImportError(f"No module named {name!r}")
+        return open_backend(name, **options)
+
+    monkeypatch.setattr(pin_backends, 'open_pin_backend', only_mock)
+    backend = select_pin_backend('auto')
+    assert isinstance(backend, MockPinBackend)
+    assert "mock" in capsys.readouterr().out
+    select_pin_backend('mock')
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,90 @@
+"""PCA9685 與 ServoBank：在 FakeI2CBus 上驗證暫存器內容與每個 frame 的 I2C 交易數"""
+
+import pytest
+
+from rpi_drivers.pca9685 import (AUTO_INCREMENT, DEFAULT_ADDRESS, MODE1, PRESCALE, STEPS,
+                                 FakeI2CBus, PCA9685)
+from rpi_drivers.servo_bank import PCA9685ServoBackend, ServoBank
+
+
+def test_configure_sets_prescale_and_auto_increment():
+    bus = FakeI2CBus()
+    chip = PCA9685(bus, frequency=50)
+    registers = bus.registers[DEFAULT_ADDRESS]
+    assert registers[PRESCALE] == chip.prescale == 121
+    assert registers[MODE1] & AUTO_INCREMENT
+    assert chip.frequency == pytest.approx(50, rel=0.01)
+
+
+def test_write_channels_is_one_transaction():
+    bus = FakeI2CBus()
+    chip = PCA9685(bus)
+    before = len(bus.writes())
+    chip.write_channels(2, [0.0015, None, 0.001])
+    assert len(bus.writes()) == before + 1
+    on, off, full_off = bus.channel(DEFAULT_ADDRESS, 2)
+    assert on == chip.phase(2)
+    assert off == (on + chip.counts(0.0015)) % STEPS
+    assert bus.channel(DEFAULT_ADDRESS, 3)[2]
+    assert not full_off
+
+
+def test_backend_sends_one_transaction_per_chip():
+    bus = FakeI2CBus()
+    backend = PCA9685ServoBackend(bus, (DEFAULT_ADDRESS, DEFAULT_ADDRESS + 1))
+    before = len(bus.writes())
+    backend.write_frame({0: 0.001, 3: 0.002, 17: 0.0015})
+    writes = bus.writes()[before:]
+    assert sorted(t.address for t in writes) == [DEFAULT_ADDRESS, DEFAULT_ADDRESS + 1]
+    # 第一顆晶片寫入通道 0~3 的連續範圍：1 byte 暫存器 + 4 個通道 × 4 bytes
+    assert len(next(t for t in writes if t.address == DEFAULT_ADDRESS).data) == 17
+    with pytest.raises(ValueError):
+        backend.write_frame({32: 0.001})
+
+
+def test_bank_coalesces_writes_into_one_frame():
+    bus = FakeI2CBus()
+    backend = PCA9685ServoBackend(bus)
+    bank = ServoBank(backend, frame_time=60)
+    bank.flush()   # 從現在開始計算 frame 間隔，執行緒在測試期間不會自己送出
+    try:
+        bank.write(0, 0.001)
+        bank.write(0, 0.002)
+        bank.write(1, 0.0015)
+        before = len(bus.writes())
+        assert bank.flush() == 2
+        assert len(bus.writes()) == before + 1
+        assert bank.coalesced == 1
+        assert backend.pulse_widths[:2] == [0.002, 0.0015]
+    finally:
+        bank.close(timeout=1)
+
+
+class FlakyBackend:
+    """第一次送出時模擬 I2C 錯誤"""
+
+    def __init__(self):
+        self.frames = []
+        self.fail = True
+
+    def write_frame(self, changes):
+        if self.fail:
+            self.fail = False
+            raise OSError(121, "Remote I/O error")
+        self.frames.append(dict(changes))
+
+
+def test_failed_flush_keeps_changes_for_retry():
+    backend = FlakyBackend()
+    bank = ServoBank(backend, frame_time=60)
+    bank.flush()
+    try:
+        bank.write(0, 0.001)
+        with pytest.raises(OSError):
+            bank.flush()
+        bank.write(1, 0.002)
+        assert bank.flush() == 2
+        assert backend.frames == [{0: 0.001, 1: 0.002}]
+        assert bank.errors == 1
+    finally:
+        bank.close(timeout=1)